@@ -4,10 +4,71 @@ import sys
 import json
 import logging
 
-from os.path import dirname, abspath
+from os.path import dirname, abspath, exists
 
 logger = logging.getLogger("main.{}".format(__name__))
 
+TRACE_UNITS = {
+    "realtime": 0.001,
+    "%cpu": 0.1,
+    "%mem": 0.1,
+    "vmem": 1024,
+    "rss": 1024,
+    "peak_vmem": 1024,
+    "peak_rss": 1024
+}
+"""
+dict: Factor that converts the values of the .command.trace fields into
+seconds (realtime), percentages (%cpu and %mem) or bytes (memory fields).
+The remaining fields are kept as they are (bytes or counts).
+"""
+
+
+def parse_trace(trace_file):
+    """Parses the .command.trace file of a task into a dictionary with the
+    numeric value of each metric.
+
+    Both the ``nextflow.trace/v2`` format, with one ``key=value`` pair per
+    line, and the older format, with a line of field names, a line of
+    values and an optional line with the realtime, are supported.
+
+    Parameters
+    ----------
+    trace_file : str
+        Path to the .command.trace file.
+
+    Returns
+    -------
+    dict
+        Maps each field to its value, converted with :data:`TRACE_UNITS`.
+        Fields without a numeric value are skipped.
+    """
+
+    with open(trace_file) as fh:
+        lines = [x.strip() for x in fh if x.strip()]
+
+    if not lines:
+        return {}
+
+    if lines[0].startswith("nextflow.trace/"):
+        fields = [x.split("=", 1) for x in lines[1:] if "=" in x]
+    else:
+        fields = list(zip(lines[0].split(), lines[1].split())) \
+            if len(lines) > 1 else []
+        if len(lines) > 2:
+            fields.append(("realtime", lines[2]))
+
+    trace = {}
+    for key, value in fields:
+        try:
+            value = float(value)
+        except ValueError:
+            continue
+        value *= TRACE_UNITS.get(key, 1)
+        trace[key] = int(value) if value.is_integer() else round(value, 3)
+
+    return trace
+
 
 def write_json(report_json, version_json, trace_file, task_name,
                project_name, sample_name, pid, script_id, run_name):
@@ -34,8 +95,11 @@ def write_json(report_json, version_json, trace_file, task_name,
         versions = []
 
     logging.info("Parsing trace file")
-    with open(trace_file) as fh:
-        trace = fh.readlines()
+    try:
+        trace = parse_trace(trace_file)
+    except (OSError, UnicodeDecodeError):
+        logging.warning("Could not parse trace file: {}".format(trace_file))
+        trace = {}
 
     report = {
         "pipelineId": run_name,
@@ -60,10 +124,56 @@ def write_json(report_json, version_json, trace_file, task_name,
         report_fh.write(json.dumps(report, separators=(",", ":")))
 
 
+def staged_file(prefix, index):
+    """Returns the name of an input file of a batch, staged by nextflow with
+    the ``prefix*`` pattern. The wildcard is replaced by the index of the
+    file, or removed when the batch has a single report.
+    """
+
+    name = "{}{}".format(prefix, index)
+    if not exists(name) and exists(prefix):
+        return prefix
+
+    return name
+
+
+def write_batch(manifest, script_id, run_name):
+    """Writes the final report JSON files of a batch of reports.
+
+    Parameters
+    ----------
+    manifest : str
+        Path to a tab separated file with the sample name, task name and
+        process ID of each report of the batch. The report, versions and
+        trace files of the report in the line ``i`` (starting at 1) are
+        ``report_json_<i>``, ``version_json_<i>`` and ``trace_<i>``.
+    script_id : str
+        Nextflow script ID.
+    run_name : str
+        Nextflow run name.
+    """
+
+    with open(manifest) as fh:
+        rows = [x.rstrip("\n").split("\t") for x in fh if x.strip()]
+
+    logging.info("Preparing {} reports".format(len(rows)))
+
+    for i, (sample_name, task_name, pid) in enumerate(rows, 1):
+        write_json(staged_file("report_json_", i),
+                   staged_file("version_json_", i),
+                   staged_file("trace_", i),
+                   task_name, 1, sample_name, pid, script_id, run_name)
+
+
 def main():
 
     # Fetch arguments
     args = sys.argv[1:]
+
+    if args[0] == "--batch":
+        write_batch(*args[1:4])
+        return
+
     report_json = args[0]
     version_json = args[1]
     trace = args[2]
@@ -88,4 +198,5 @@ def main():
                project_name, sample_name, pid, script_id, run_name)
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ try:
     from __init__ import __version__, __build__
     from generator.engine import NextflowGenerator
     from generator.inspect import NextflowInspector
+    from generator.inspect_daemon import InspectDaemon
     from generator.report import FlowcraftReport
     from generator.process_collector import collect_process_map
     from generator.recipe import brew_innuendo, brew_recipe, list_recipes
@@ -25,6 +26,7 @@ except ImportError as e:
     from flowcraft import __version__, __build__
     from flowcraft.generator.engine import NextflowGenerator
     from flowcraft.generator.inspect import NextflowInspector
+    from flowcraft.generator.inspect_daemon import InspectDaemon
     from flowcraft.generator.report import FlowcraftReport
     from flowcraft.generator.recipe import brew_innuendo, \
         brew_recipe, list_recipes
@@ -38,6 +40,21 @@ except ImportError as e:
 logger = logging.getLogger("main")
 
 
+def positive_int(value):
+    """Argument type of the options that must be a positive integer."""
+
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            "must be a positive integer: {}".format(value))
+
+    return number
+
+
 def get_args(args=None):
 
     parser = argparse.ArgumentParser(
@@ -144,9 +161,15 @@ def get_args(args=None):
     )
     inspect_parser.add_argument(
         "-m", "--mode", dest="mode", default="overview",
-        choices=["overview", "broadcast"],
+        choices=["overview", "broadcast", "daemon"],
         help="Specify the inspection run mode."
     )
+    inspect_parser.add_argument(
+        "-d", "--directories", dest="directories", nargs="+",
+        default=["."],
+        help="Pipeline directories (or glob patterns) that are broadcast "
+             "in the daemon mode."
+    )
     inspect_parser.add_argument(
         "-u", "--url", dest="url", default="http://www.flowcraft.live:80/",
         help="Specify the URL to where the data should be broadcast"
@@ -155,6 +178,11 @@ def get_args(args=None):
         "--pretty", dest="pretty", action="store_const", const=True,
         help="Pretty inspection mode that removes usual reporting processes."
     )
+    inspect_parser.add_argument(
+        "--no-checkpoint", dest="checkpoint", action="store_false",
+        help="Do not resume the inspection from, or save it to, the "
+             "checkpoint file in the directory of the trace file."
+    )
 
     # REPORT MODE
     reports_parser = subparsers.add_parser("report",
@@ -185,6 +213,17 @@ def get_args(args=None):
              "generation of reports during the execution of the pipeline, "
              "allowing for the visualization of the reports in real-time"
     )
+    reports_parser.add_argument(
+        "--no-checkpoint", dest="checkpoint", action="store_false",
+        help="Do not resume the watch mode from, or save it to, the state "
+             "file in the directory of the trace file."
+    )
+    reports_parser.add_argument(
+        "--max-uploads", dest="max_uploads", type=positive_int,
+        default=4,
+        help="Maximum number of report batches uploaded at the same time in "
+             "watch mode."
+    )
 
     if len(sys.argv) == 1:
         parser.print_help()
@@ -380,9 +419,16 @@ def build(args):
 
 def inspect(args):
 
+    if args.mode == "daemon":
+        InspectDaemon(args.directories, args.trace_file, args.refresh_rate,
+                      args.pretty, args.url,
+                      checkpoint=args.checkpoint).run()
+        return
+
     try:
         nf_inspect = NextflowInspector(args.trace_file, args.refresh_rate,
-                                       args.pretty, args.url)
+                                       args.pretty, args.url,
+                                       checkpoint=args.checkpoint)
         if args.mode == "overview":
             nf_inspect.display_overview()
 
@@ -407,7 +453,9 @@ def report(args):
             trace_file=args.trace_file,
             log_file=args.log_file,
             watch=args.watch,
-            ip_addr=args.url)
+            ip_addr=args.url,
+            checkpoint=args.checkpoint,
+            max_uploads=args.max_uploads)
 
         fc_report.broadcast_report()
 
@@ -0,0 +1,151 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+CHECKPOINT_VERSION = 1
+"""
+int: Version of the checkpoint format. Checkpoints with a different version
+are ignored.
+"""
+
+HEAD_SIZE = 4096
+"""
+int: Number of bytes at the start of a file that are hashed to verify its
+identity.
+"""
+
+
+def _head_hash(path, size):
+    """Returns the md5 hash of the first ``size`` bytes of a file."""
+
+    with open(path, "rb") as fh:
+        return hashlib.md5(fh.read(size)).hexdigest()
+
+
+def file_identity(path, offset):
+    """Returns the identity of a file that was read up to ``offset``.
+
+    The identity is made of the device and inode of the file, the offset
+    and a hash of the first bytes of the file (up to the offset), so that a
+    file that was replaced or rewritten can be detected.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    offset : int
+        Byte offset up to which the file was read.
+
+    Returns
+    -------
+    dict
+        Identity of the file.
+    """
+
+    st = os.stat(path)
+    head_size = min(offset, HEAD_SIZE)
+
+    return {
+        "dev": st.st_dev,
+        "ino": st.st_ino,
+        "offset": offset,
+        "head_size": head_size,
+        "head_md5": _head_hash(path, head_size)
+    }
+
+
+def identity_matches(path, identity):
+    """Checks whether a file still matches an identity retrieved by
+    :func:`file_identity`, and whether it can be read from the saved
+    offset.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    identity : dict
+        Identity of the file, as retrieved from :func:`file_identity`.
+
+    Returns
+    -------
+    bool
+    """
+
+    try:
+        st = os.stat(path)
+        if (st.st_dev, st.st_ino) != (identity["dev"], identity["ino"]):
+            return False
+        if st.st_size < identity["offset"]:
+            return False
+        return _head_hash(path, identity["head_size"]) == \
+            identity["head_md5"]
+    except (OSError, KeyError):
+        return False
+
+
+def write_checkpoint(path, state):
+    """Writes a checkpoint as a compressed JSON file.
+
+    The checkpoint is written to a temporary file that then replaces the
+    previous one, so that an interrupted write never leaves a corrupt
+    checkpoint.
+
+    Parameters
+    ----------
+    path : str
+        Path to the checkpoint file.
+    state : dict
+        JSON serializable state.
+
+    Returns
+    -------
+    bool
+        True if the checkpoint was written.
+    """
+
+    tmp_path = "{}.tmp".format(path)
+
+    try:
+        with gzip.open(tmp_path, "wt", compresslevel=1) as fh:
+            json.dump({"version": CHECKPOINT_VERSION, "state": state}, fh,
+                      separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug("Could not write checkpoint {}: {}".format(path, e))
+        return False
+
+    return True
+
+
+def read_checkpoint(path):
+    """Reads a checkpoint written by :func:`write_checkpoint`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the checkpoint file.
+
+    Returns
+    -------
+    dict or None
+        The saved state, or None if the checkpoint does not exist, is
+        corrupt or has a different format version.
+    """
+
+    try:
+        with gzip.open(path, "rt") as fh:
+            checkpoint = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError) as e:
+        logger.debug("Could not read checkpoint {}: {}".format(path, e))
+        return None
+
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return None
+
+    return checkpoint.get("state")
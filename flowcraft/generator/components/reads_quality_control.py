@@ -14,10 +14,13 @@ class IntegrityCoverage(Process):
         - ``output_type``: fastq
         - ``ptype``: pre_assembly
 
-    It contains two **secondary channel link starts**:
+    It contains three **secondary channel link starts**:
 
         - ``SIDE_phred``: Phred score of the FastQ files
         - ``SIDE_max_len``: Maximum read length
+        - ``SIDE_qc_sketch``: QC sketch of the FastQ files, with the read
+          length histogram and the per-cycle quality means and base
+          composition
     """
 
     def __init__(self, **kwargs):
@@ -40,10 +43,23 @@ class IntegrityCoverage(Process):
                 "description":
                     "Minimum coverage for a sample to proceed. By default it's set"
                     "to 0 to allow any coverage"
+            },
+            "coverageSampling": {
+                "default": "false",
+                "description":
+                    "Estimate the encoding and coverage from a sample of the "
+                    "reads instead of parsing the whole FastQ files"
+            }
+        }
+
+        self.directives = {
+            "integrity_coverage": {
+                "cpus": 2
             }
         }
 
-        self.link_start.extend(["SIDE_phred", "SIDE_max_len"])
+        self.link_start.extend(["SIDE_phred", "SIDE_max_len",
+                                "SIDE_qc_sketch"])
 
 
 class CheckCoverage(Process):
@@ -84,6 +100,12 @@ class CheckCoverage(Process):
             }
         }
 
+        self.directives = {
+            "integrity_coverage2": {
+                "cpus": 2
+            }
+        }
+
         self.link_start.extend(["SIDE_max_len"])
 
 
@@ -378,13 +400,17 @@ class FilterPoly(Process):
 
 
 class DownsampleFastq(Process):
-    """Downsamples FastQ file based on depth using seqtk
+    """Downsamples FastQ file based on depth
 
     This process is set with:
 
         - ``input_type``: fastq
         - ``output_type``: fastq
 
+    It contains one optional **secondary channel link end**:
+
+        - ``SIDE_qc_sketch`` (alias: ``SIDE_qc_sketch``): Receives the QC
+          sketch of the FastQ files, with their number of bases
     """
 
     def __init__(self, **kwargs):
@@ -409,9 +435,8 @@ class DownsampleFastq(Process):
             },
             "seed":{
                 "default": 100,
-                "description": "The seed number for seqtk. By default it is 100"
-                               "and should be equal for both pairs of "
-                               "reads."
+                "description": "The seed number for the read sampling. By "
+                               "default it is 100."
             },
             "clearInput": {
                 "default": "false",
@@ -423,8 +448,12 @@ class DownsampleFastq(Process):
             }
         }
 
+        self.link_end.append({"link": "SIDE_qc_sketch",
+                              "alias": "SIDE_qc_sketch",
+                              "optional": True})
+
         self.directives = {"downsample_fastq": {
-            "cpus": 1,
+            "cpus": 2,
             "memory": "{ 4.GB * task.attempt }",
             "container": "flowcraft/seqtk",
             "version": "1.3.0-3"
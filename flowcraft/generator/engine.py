@@ -742,16 +742,20 @@ class NextflowGenerator:
                     self._set_implicit_link(p, l)
                     continue
 
-                # Skip if there is no match for the current link in the
-                # secondary channels
-                if l["link"] not in self.secondary_channels:
-                    continue
-
+                # Link with the matching link starts in the parent lanes, if
+                # any
+                linked = False
                 for lane in parent_forks:
-                    if lane in self.secondary_channels[l["link"]]:
+                    if lane in self.secondary_channels.get(l["link"], {}):
                         self.secondary_channels[
                             l["link"]][lane]["end"].append("{}".format(
                                 "{}_{}".format(l["alias"], p.pid)))
+                        linked = True
+
+                # Optional links let the template know whether the secondary
+                # channel is available
+                if l.get("optional"):
+                    p.set_link_context(l["alias"], linked)
 
         logger.debug("[{}] Secondary links updated: {}".format(
             p.template, self.secondary_channels))
@@ -1,6 +1,8 @@
 import re
+import io
 import os
 import sys
+import math
 import uuid
 import time
 import curses
@@ -9,28 +11,192 @@ import locale
 import socket
 import logging
 import hashlib
-import requests
 import json
 
-from pympler import asizeof
-from os.path import join, abspath
-from time import gmtime, strftime, sleep
-from collections import defaultdict, OrderedDict
+from os.path import join, abspath, dirname
+from time import gmtime, strftime
+from itertools import islice
+from collections import defaultdict, deque, OrderedDict
 
 try:
     import generator.error_handling as eh
     from generator.process_details import colored_print
-    from generator.utils import get_nextflow_filepath
+    from generator.utils import get_nextflow_filepath, WorkdirResolver
+    from generator.checkpoint import file_identity, identity_matches, \
+        read_checkpoint, write_checkpoint
+    from generator.tail import FileTail, tail_lines
+    from generator.watcher import FileWatcher
+    from generator.inspect_stats import ProcessStats, TraceColumns, \
+        TagInfo, size_compress, NAN
+    from generator.transport import HttpTransport
 except ImportError:
     import flowcraft.generator.error_handling as eh
     from flowcraft.generator.process_details import colored_print
-    from flowcraft.generator.utils import get_nextflow_filepath
+    from flowcraft.generator.utils import get_nextflow_filepath, \
+        WorkdirResolver
+    from flowcraft.generator.checkpoint import file_identity, \
+        identity_matches, read_checkpoint, write_checkpoint
+    from flowcraft.generator.tail import FileTail, tail_lines
+    from flowcraft.generator.watcher import FileWatcher
+    from flowcraft.generator.inspect_stats import ProcessStats, \
+        TraceColumns, TagInfo, size_compress, NAN
+    from flowcraft.generator.transport import HttpTransport
 
 locale.setlocale(locale.LC_ALL, "")
 code = locale.getpreferredencoding()
 
 logger = logging.getLogger("main.{}".format(__name__))
 
+LOG_SIGNATURES = re.compile(
+    r"(?P<operator>Creating operator > )|"
+    r"(?P<launch>Launching `)|"
+    r"(?P<submission>(?:Re-s|S)ubmitted process > |Cached process > )|"
+    r"(?P<barrier><<< barrier arrive)|"
+    r"(?P<cmdrun>DEBUG nextflow\.cli\.CmdRun)|"
+    r"(?P<aborted>Session aborted)|"
+    r"(?P<complete>Execution complete -- Goodbye)"
+)
+"""
+re.Pattern: Single regular expression that matches all the relevant
+signatures of the .nextflow.log file. The name of the matched group is used
+to dispatch each log line to its parsing method in
+:func:`NextflowInspector._parse_log_line`.
+"""
+
+
+SUBMISSION_HASH = re.compile(
+    r"\[(\w{2}/\w+)\] (?:(?:Re-s|S)ubmitted|Cached) process > ")
+"""
+re.Pattern: Retrieves the abbreviated hash of the work directory from the
+submission lines of the nextflow log.
+"""
+
+TAG_STATES = [("submitted", "running"), ("finished", "complete"),
+              ("failed", "error"), ("retry", None)]
+"""
+list: Pairs of submission states of a process/tag with the corresponding
+tag list in the table data of the broadcast status. Retrying tags are only
+listed in the process info.
+"""
+
+
+def apply_status_delta(status_json, delta):
+    """Applies a status delta sent by the broadcast mode of the
+    :class:`NextflowInspector` to the previous status.
+
+    This is the reference implementation of the delta protocol for the
+    receiving server. A delta contains the global fields of the status
+    (overview, run status, times, etc.), which replace the previous ones,
+    and only the entries of the processes and tags that changed since the
+    base version:
+
+        - ``tableData``: Table rows of the changed processes, without the
+          tag lists.
+        - ``processInfo``: Barrier and resources of the changed processes.
+        - ``tagStatus``: Maps each changed process/tag to the list of
+          submission states where the tag currently is (see
+          :data:`TAG_STATES`).
+        - ``processTags``: Information of the changed process/tags.
+
+    Parameters
+    ----------
+    status_json : dict
+        Full status of the base version of the delta. It is updated in
+        place.
+    delta : dict
+        Status delta.
+
+    Returns
+    -------
+    dict
+        The updated status.
+    """
+
+    for key, value in delta.items():
+        if key not in ["tableData", "processInfo", "tagStatus",
+                       "processTags"]:
+            status_json[key] = value
+
+    rows = dict((row["process"], row) for row in status_json["tableData"])
+    for row in delta["tableData"]:
+        if row["process"] in rows:
+            rows[row["process"]].update(row)
+        else:
+            new_row = dict(row, running=[], complete=[], error=[])
+            status_json["tableData"].append(new_row)
+            rows[row["process"]] = new_row
+
+    for process, info in delta["processInfo"].items():
+        status_json["processInfo"].setdefault(
+            process, dict((state, []) for state, _ in TAG_STATES)
+        ).update(info)
+
+    for process, tags in delta["tagStatus"].items():
+        info = status_json["processInfo"][process]
+        for tag, states in tags.items():
+            for state, column in TAG_STATES:
+                tag_lists = [info[state]]
+                if column:
+                    tag_lists.append(rows[process][column])
+                for tag_list in tag_lists:
+                    if state in states and tag not in tag_list:
+                        tag_list.append(tag)
+                    elif state not in states and tag in tag_list:
+                        tag_list.remove(tag)
+
+    for process, tags in delta["processTags"].items():
+        status_json["processTags"].setdefault(process, {}).update(tags)
+
+    return status_json
+
+
+def merge_status_payloads(pending, new):
+    """Merges two status payloads of the broadcast mode that are waiting to
+    be sent, so that only one request is sent with the changes of both.
+
+    Parameters
+    ----------
+    pending : dict
+        Payload that was not sent yet.
+    new : dict
+        Newer payload of the same run.
+
+    Returns
+    -------
+    dict
+        Merged payload, with the version of the newer payload and, for
+        deltas, the base version of the pending one.
+    """
+
+    # A full snapshot supersedes any pending status
+    if "status_json" in new:
+        return new
+
+    if "status_json" in pending:
+        apply_status_delta(pending["status_json"], new["status_delta"])
+        pending["version"] = new["version"]
+        return pending
+
+    old_delta, new_delta = pending["status_delta"], new["status_delta"]
+
+    rows = dict((row["process"], row) for row in old_delta["tableData"])
+    for row in new_delta["tableData"]:
+        if row["process"] in rows:
+            rows[row["process"]].update(row)
+        else:
+            old_delta["tableData"].append(row)
+
+    for key, value in new_delta.items():
+        if key in ["processInfo", "tagStatus", "processTags"]:
+            for process, entries in value.items():
+                old_delta[key].setdefault(process, {}).update(entries)
+        elif key != "tableData":
+            old_delta[key] = value
+
+    pending["version"] = new["version"]
+
+    return pending
+
 
 def signal_handler(screen):
     """This function is bound to the SIGINT signal (like ctrl+c) to graciously
@@ -58,45 +224,132 @@ class NextflowInspector:
     error code after these retries.
     """
 
-    def __init__(self, trace_file, refresh_rate, pretty=False, ip_addr=None):
+    GOOD_STATUS = ["COMPLETED", "CACHED"]
+    """
+    list: Trace status of the tasks that completed successfully.
+    """
+
+    CHECKPOINT_INTERVAL = 60
+    """
+    int: Minimum interval in seconds between the writes of the inspection
+    checkpoint.
+    """
+
+    CHECKPOINT_FILE = ".inspect_checkpoint.json.gz"
+    """
+    str: Name of the inspection checkpoint file, which is written in the
+    directory of the trace file.
+    """
+
+    RESYNC_INTERVAL = 300
+    """
+    int: Maximum interval in seconds between full status snapshots in the
+    broadcast mode. Status deltas are sent in between.
+    """
+
+    LOG_EXCERPT_LINES = 300
+    """
+    int: Maximum number of lines of the log excerpts of failed tasks and of
+    the nextflow log that are kept and broadcast.
+    """
+
+    LOG_EXCERPT_BYTES = 64 * 1024
+    """
+    int: Maximum number of bytes read from the end of a log file for its
+    excerpt.
+    """
+
+    LOG_CACHE_SIZE = 256
+    """
+    int: Maximum number of log excerpts kept in :attr:`_log_cache`.
+    """
+
+    TABLE_MAPPINGS = {
+        "Barrier": "barrier",
+        "Process": "process",
+        "Running": "running",
+        "Complete": "complete",
+        "Error": "error",
+        "Avg Time": "avgTime",
+        "P50 Time": "p50Time",
+        "P95 Time": "p95Time",
+        "CPU/hour": "cpuhour",
+        "Max Mem": "maxMem",
+        "Avg Read": "avgRead",
+        "Avg Write": "avgWrite"
+    }
+    """
+    dict: Maps the headers of the broadcast table to the keys of the table
+    data.
+    """
+
+    def __init__(self, trace_file, refresh_rate, pretty=False, ip_addr=None,
+                 transport=None, checkpoint=True, workdir=None):
+
+        self.workdir = abspath(workdir) if workdir else os.getcwd()
+        """
+        str: Path to the pipeline work directory
+        """
+
+        self.trace_file = join(self.workdir, trace_file) if workdir \
+            else trace_file
+        """
+        str: Path to nextflow trace file. When a :attr:`workdir` is provided,
+        relative paths are relative to it.
+        """
 
-        self.trace_file = trace_file
+        self.trace_tail = FileTail(self.trace_file)
         """
-        str: Path to nextflow trace file.
+        :class:`~flowcraft.generator.tail.FileTail`: Incremental reader of
+        the trace file. Only the lines appended since the last parsing are
+        read in each refresh.
         """
 
-        self.trace_sizestamp = None
+        self.trace_header = None
         """
-        str: Stores the sizestamp of the last modification of the trace file.
-        This is used to parse the file only when it has changed.
+        dict: Mapping of the trace column IDs to their position, as
+        retrieved from :func:`_header_mapping`. It is set when the header of
+        the trace file is read and reset when the trace file is replaced.
         """
 
-        self.refresh_rate = refresh_rate
+        self.refresh_rate = float(refresh_rate)
         """
-        float: Frequency (in seconds) that the curses screen will be refreshed.
+        float: Frequency (in seconds) that the trace and log files are checked
+        for changes when file system events are not available.
         """
 
-        self.stored_ids = []
+        self.stored_ids = set()
         """
-        list: Stores the task_ids that have already been parsed. It is used
-        to skip them when parsing the trace files multiple times.
+        set: Stores the task hashes that have already been parsed. It is used
+        to skip them when the trace file is parsed again from the start.
         """
 
-        self.stored_log_ids = []
+        self.stored_log_ids = set()
         """
-        list: Stores the time stamps of the log file lines that were already
+        set: Stores the time stamps of the log file lines that were already
         parsed. It is used to skip parsing the log files multilpe times
         """
 
-        self.trace_info = defaultdict(list)
+        self.trace_store = defaultdict(TraceColumns)
         """
-        dict: Main object that stores the status information for each process
-        name in the trace file.
+        dict: Main object that stores the trace entries of each process
+        name in the trace file, in a
+        :class:`~flowcraft.generator.inspect_stats.TraceColumns` object.
         """
 
         self.process_stats = {}
         """
-        dict: Contains some statistics for each process.
+        dict: Maps each process with trace entries to its
+        :class:`~flowcraft.generator.inspect_stats.ProcessStats` object,
+        with the running statistics of the process.
+        """
+
+        self._unsuccessful_entries = defaultdict(dict)
+        """
+        dict: Stores the metrics of the unsuccessful trace entries of each
+        process/tag that are included in :attr:`process_stats`. These are
+        removed from the statistics when the tag is submitted again or
+        finishes successfully.
         """
 
         self.processes = OrderedDict()
@@ -104,14 +357,22 @@ class NextflowInspector:
         dict: Dictionary of processes from the pipeline with the status of the
         channel as the value. This information is retrieved from the
         .nextflow.log file in the :func:`_parser_pipeline_processes` method
-        and updated in the :func:`_update_barrier_status` and
+        and updated in the :func:`_update_barrier_status`,
         :func:`_update_process_stats` and :func:`_update_submission_status`.
         """
 
+        self.tag_totals = dict((state, 0) for state, _ in TAG_STATES)
+        """
+        dict: Total number of tags of all processes in each submission state
+        ('submitted', 'finished', 'failed' and 'retry'). It is updated as the
+        tags change state.
+        """
+
         self.process_tags = {}
         """
         dict: Dictionary of processes with summary information for each tag
-        it processes
+        it processes, in a :class:`~flowcraft.generator.inspect_stats.TagInfo`
+        object.
         """
 
         self.samples = []
@@ -119,23 +380,37 @@ class NextflowInspector:
         list: List of samples inferred from the pipeline.
         """
 
+        self._sample_names = set()
+        """
+        set: Names in :attr:`samples`, for fast lookups.
+        """
+
         self.skip_processes = ["status", "compile_status", "report",
                                "compile_reports", "fullConsensus",
-                               "compile_status_buffer"]
+                               "compile_status_buffer",
+                               "compile_reports_buffer"]
         """
         list: List of special processes that should be skipped for inspection
         purposes.
         """
 
-        self.log_file = ".nextflow.log"
+        self.log_file = join(self.workdir, ".nextflow.log") if workdir \
+            else ".nextflow.log"
         """
         str: Name of the nextflow log file.
         """
 
-        self.log_sizestamp = None
+        self.log_tail = FileTail(self.log_file)
         """
-        str: Stores the sizestamp of the last modification of the nextflow
-        log file. This is used to parse the file only when it has changed.
+        :class:`~flowcraft.generator.tail.FileTail`: Incremental reader of
+        the nextflow log file. Only the lines appended since the last parsing
+        are read in each refresh.
+        """
+
+        self._expect_version = False
+        """
+        bool: Set when the log line preceding the nextflow version line has
+        been parsed, so that the next log line is parsed for the version.
         """
 
         self.pipeline_tag = ""
@@ -173,9 +448,33 @@ class NextflowInspector:
         attribute is only set when the pipeline is not running.
         """
 
-        self.workdir = os.getcwd()
+        self.workdir_resolver = WorkdirResolver(join(self.workdir, "work"))
         """
-        str: Path to the pipeline work directory
+        :class:`~flowcraft.generator.utils.WorkdirResolver`: Resolves the
+        abbreviated task hashes into their work directories, caching the
+        listing of the work directory buckets.
+        """
+
+        self._log_cache = OrderedDict()
+        """
+        OrderedDict: Maps the path of a log file to its device and inode,
+        the offset up to which it was read and the excerpt up to that
+        offset. The least recently used entries are discarded after
+        :attr:`LOG_CACHE_SIZE` entries.
+        """
+
+        self.checkpoint_file = join(dirname(abspath(self.trace_file)),
+                                    self.CHECKPOINT_FILE) \
+            if checkpoint else None
+        """
+        str: Path to the inspection checkpoint file. When None, no
+        checkpoint is read or written.
+        """
+
+        self._checkpoint_stamp = None
+        self._last_checkpoint = time.time()
+        """
+        tuple/float: File offsets and time of the last checkpoint.
         """
 
         self.execution_command = None
@@ -227,6 +526,52 @@ class NextflowInspector:
         and set to True when there is a change in the inspection attributes.
         """
 
+        self._dirty_processes = set()
+        self._dirty_tags = defaultdict(set)
+        """
+        set/dict: Processes and process/tags that changed since the last
+        status sent to the broadcast server.
+        """
+
+        self.transport = transport or HttpTransport()
+        """
+        :class:`~flowcraft.generator.transport.HttpTransport`: Transport
+        used to send the status to the broadcast server.
+        """
+
+        self._status_version = 0
+        """
+        int: Version of the last status sent to the broadcast server.
+        """
+
+        self._sent_version = None
+        """
+        int: Version of the last status handed to the transport. Deltas are
+        based on this version. When None, the next status is sent as a full
+        snapshot.
+        """
+
+        self._last_resync = 0
+        """
+        float: Time of the last full snapshot sent to the broadcast server.
+        """
+
+        self._send_deltas = False
+        """
+        boolean: True when the broadcast server announced the support of
+        status deltas in the response to :func:`_establish_connection`.
+        Otherwise, only full snapshots are sent.
+        """
+
+        self._status_failures = deque()
+        """
+        deque: Version of each status that was not acknowledged by the
+        server, and whether it was refused because the server does not
+        support deltas. It is filled from the thread of the
+        :attr:`transport` and consumed by :func:`_send_status_info`, so that
+        the status versions are only changed by the main thread.
+        """
+
         # Skip these process names (they are check with the startswith()
         # method) when using the --pretty option
         if pretty:
@@ -248,13 +593,25 @@ class NextflowInspector:
         self.screen_lines = None
         self.max_width = 0
         self.content_lines = 0
+        # Persistent pad of the overview and the segments drawn in each of
+        # its lines in the previous frame
+        self._pad = None
+        self._frame = {}
+        # Formatted overview row of each process, with the state used to
+        # format it
+        self._row_cache = {}
 
         # Checks if nextflow log and trace files are available
         self._check_required_files()
-        # Gathers the complete list of processes from the nextflow log
-        self._get_pipeline_processes()
-        # Fetches the pipeline status from the nextflow log
-        self._update_pipeline_status()
+        # Resumes the inspection from the last checkpoint, if it matches the
+        # current log and trace files
+        self.load_checkpoint()
+        # Gathers the complete list of processes and the pipeline status
+        # from the nextflow log
+        self.log_parser()
+        if not self.time_start:
+            raise eh.InspectionError("Could not read .nextflow.log file. Is "
+                                     "file empty?")
 
         # Bind SIGINT to singal_handler function. This makes a clean exit
         # from the curses interface when exiting through ctrl+c.
@@ -297,8 +654,7 @@ class NextflowInspector:
             (x.strip(), pos) for pos, x in enumerate(header.split("\t"))
         )
 
-    @staticmethod
-    def _expand_path(hash_str):
+    def _expand_path(self, hash_str, workdir=None):
         """Expands the hash string of a process (ae/1dasjdm) into a full
         working directory
 
@@ -306,6 +662,9 @@ class NextflowInspector:
         ----------
         hash_str : str
             Nextflow process hash with the beggining of the work directory
+        workdir : str, optional
+            Full working directory, when available from the ``workdir``
+            field of the trace file.
 
         Returns
         -------
@@ -313,15 +672,7 @@ class NextflowInspector:
             Path to working directory of the hash string
         """
 
-        try:
-            first_hash, second_hash = hash_str.split("/")
-            first_hash_path = join(abspath("work"), first_hash)
-
-            for l in os.listdir(first_hash_path):
-                if l.startswith(second_hash):
-                    return join(first_hash_path, l)
-        except FileNotFoundError:
-            return None
+        return self.workdir_resolver.resolve(hash_str, workdir)
 
     @staticmethod
     def _hms(s):
@@ -395,150 +746,183 @@ class NextflowInspector:
         """Shortens a megabytes string.
         """
 
-        if s / 1024 > 1:
-            return "{}GB".format(round(s / 1024, 1))
-        else:
-            return "{}MB".format(s)
+        return size_compress(s)
+
+    def _mark_dirty(self, process, tag=None):
+        """Flags a process, and optionally one of its tags, as changed since
+        the last status sent to the broadcast server.
+        """
+
+        self._dirty_processes.add(process)
+        if tag is not None:
+            self._dirty_tags[process].add(tag)
 
     #########################
     # AUXILIARY PARSE METHODS
     #########################
 
-    def _get_pipeline_processes(self):
-        """Parses the .nextflow.log file and retrieves the complete list
-        of processes
+    def _get_pipeline_processes(self, line):
+        """Parses a .nextflow.log line with the creation of a process
+        operator and adds it to the :attr:`processes` attribute.
 
-        This method searches for specific signatures at the beginning of the
-        .nextflow.log file::
+        This method parses the lines with the following signature that
+        appear at the beginning of the .nextflow.log file::
 
              Apr-19 19:07:32.660 [main] DEBUG nextflow.processor
              TaskProcessor - Creating operator > report_corrupt_1_1 --
              maxForks: 4
 
-        When a line with the .*Creating operator.* signature is found, the
-        process name is retrieved and populates the :attr:`processes` attribute
-        """
-
-        with open(self.log_file) as fh:
-
-            for line in fh:
-                if re.match(".*Creating operator.*", line):
-                    # Retrieves the process name from the string
-                    match = re.match(".*Creating operator > (.*) --", line)
-                    process = match.group(1)
-
-                    if any([process.startswith(x) for x in self._blacklist]):
-                        continue
-
-                    if process not in self.skip_processes:
-                        self.processes[match.group(1)] = {
-                            "barrier": "W",
-                            "submitted": set(),
-                            "finished": set(),
-                            "failed": set(),
-                            "retry": set(),
-                            "cpus": None,
-                            "memory": None
-                        }
-                        self.process_tags[process] = {}
-
-                # Retrieves the pipeline name from the string
-                if re.match(".*Launching `.*` \[.*\] ", line):
-                    tag_match = re.match(".*Launching `.*` \[(.*)\] ", line)
-                    self.pipeline_tag = tag_match.group(1) if tag_match else \
-                        "?"
-                    name_match = re.match(".*Launching `(.*)` \[.*\] ", line)
-                    self.pipeline_name = name_match.group(1) if name_match \
-                        else "?"
+        Parameters
+        ----------
+        line : str
+            Log line with the .*Creating operator.* signature.
+        """
+
+        # Retrieves the process name from the string
+        match = re.match(".*Creating operator > (.*) --", line)
+        if not match:
+            return
+
+        process = match.group(1)
+
+        if any([process.startswith(x) for x in self._blacklist]):
+            return
+
+        if process not in self.skip_processes:
+            if process not in self.processes:
+                self.processes[process] = {
+                    "barrier": "W",
+                    "submitted": set(),
+                    "finished": set(),
+                    "failed": set(),
+                    "retry": set(),
+                    "cpus": None,
+                    "memory": None
+                }
+                self._mark_dirty(process)
+            self.process_tags.setdefault(process, {})
 
         self.content_lines = len(self.processes)
 
+    def _get_pipeline_name(self, line):
+        """Parses the .nextflow.log line with the launch of the pipeline
+        and retrieves the pipeline name and tag.
+
+        Parameters
+        ----------
+        line : str
+            Log line with the .*Launching.* signature.
+        """
+
+        if re.match(".*Launching `.*` \[.*\] ", line):
+            tag_match = re.match(".*Launching `.*` \[(.*)\] ", line)
+            self.pipeline_tag = tag_match.group(1) if tag_match else "?"
+            name_match = re.match(".*Launching `(.*)` \[.*\] ", line)
+            self.pipeline_name = name_match.group(1) if name_match else "?"
+
     def _clear_inspect(self):
         """Clears inspect attributes when re-executing a pipeline"""
 
-        self.trace_info = defaultdict(list)
-        self.process_tags = {}
+        self.trace_store = defaultdict(TraceColumns)
+        self.process_tags = dict((p, {}) for p in self.processes)
         self.process_stats = {}
+        self._unsuccessful_entries = defaultdict(dict)
         self.samples = []
-        self.stored_ids = []
-        self.stored_log_ids = []
+        self._sample_names = set()
+        self.stored_ids = set()
+        self.stored_log_ids = set()
+        self.trace_tail.reset()
+        self.trace_header = None
         self.time_start = None
         self.time_stop = None
         self.execution_command = None
         self.nextflow_version = None
         self.abort_cause = None
+        self._expect_version = False
         self._c = 0
+        # Force a full status snapshot in the broadcast mode
+        self._sent_version = None
+        self._dirty_processes = set()
+        self._dirty_tags = defaultdict(set)
         # Clean up of tag running status
         for p in self.processes.values():
             p["barrier"] = "W"
             for i in ["submitted", "finished", "failed", "retry"]:
                 p[i] = set()
+        self._reset_tag_totals()
 
-    def _update_pipeline_status(self):
-        """Parses the .nextflow.log file for signatures of pipeline status.
-        It sets the :attr:`status_info` attribute.
+    def _get_run_info(self, line):
+        """Retrieves the start time and execution command of the pipeline
+        from the first line of the .nextflow.log file.
+
+        Parameters
+        ----------
+        line : str
+            First line of the log file.
         """
 
-        with open(self.log_file) as fh:
+        time_str = " ".join(line.split()[:2])
+        self.time_start = time_str
 
+        if not self.execution_command:
             try:
-                first_line = next(fh)
-            except:
-                raise eh.InspectionError("Could not read .nextflow.log file. Is file empty?")
-            time_str = " ".join(first_line.split()[:2])
-            self.time_start = time_str
+                self.execution_command = re.match(
+                    ".*nextflow run (.*)", line).group(1)
+            except AttributeError:
+                self.execution_command = "Unknown"
 
-            if not self.execution_command:
-                try:
-                    self.execution_command = re.match(
-                        ".*nextflow run (.*)", first_line).group(1)
-                except AttributeError:
-                    self.execution_command = "Unknown"
-
-            for line in fh:
-
-                if "DEBUG nextflow.cli.CmdRun" in line:
-                    if not self.nextflow_version:
-                        try:
-                            vline = next(fh)
-                            self.nextflow_version = re.match(
-                                ".*Version: (.*)", vline).group(1)
-                        except AttributeError:
-                            self.nextflow_version = "Unknown"
-
-                if "Session aborted" in line:
-                    self.run_status = "aborted"
-                    # Get abort cause
-                    try:
-                        self.abort_cause = re.match(
-                            ".*Cause: (.*)", line).group(1)
-                    except AttributeError:
-                        self.abort_cause = "Unknown"
-                    # Get time of pipeline stop
-                    time_str = " ".join(line.split()[:2])
-                    self.time_stop = time_str
-                    self.send = True
-                    return
-                if "Execution complete -- Goodbye" in line:
-                    self.run_status = "complete"
-                    # Get time of pipeline stop
-                    time_str = " ".join(line.split()[:2])
-                    self.time_stop = time_str
-                    self.send = True
-                    return
-
-        if self.run_status not in ["running", ""]:
-            self._clear_inspect()
-            # Take a break to allow nextflow to restart before refreshing
-            # pipeine processes
-            sleep(5)
-            self._get_pipeline_processes()
+    def _get_nextflow_version(self, line):
+        """Retrieves the nextflow version from the log line that follows the
+        ``DEBUG nextflow.cli.CmdRun`` signature.
 
-        self.run_status = "running"
+        Parameters
+        ----------
+        line : str
+            Log line with the nextflow version.
+        """
 
-    def _update_tag_status(self, process, vals):
+        self._expect_version = False
+        try:
+            self.nextflow_version = re.match(
+                ".*Version: (.*)", line).group(1)
+        except AttributeError:
+            self.nextflow_version = "Unknown"
+
+    def _update_pipeline_status(self, line, status):
+        """Updates the :attr:`run_status` attribute from a log line with a
+        signature of the end of the pipeline.
+
+        Only the first of these signatures is taken into account for each
+        pipeline execution.
+
+        Parameters
+        ----------
+        line : str
+            Log line with the status signature.
+        status : str
+            Either 'aborted' or 'complete'.
+        """
+
+        if self.run_status in ["aborted", "complete"]:
+            return
+
+        self.run_status = status
+
+        if status == "aborted":
+            # Get abort cause
+            try:
+                self.abort_cause = re.match(".*Cause: (.*)", line).group(1)
+            except AttributeError:
+                self.abort_cause = "Unknown"
+
+        # Get time of pipeline stop
+        time_str = " ".join(line.split()[:2])
+        self.time_stop = time_str
+        self.send = True
+
+    def _update_tag_status(self, process, info):
         """ Updates the 'submitted', 'finished', 'failed' and 'retry' status
-        of each process/tag combination.
+        of a process/tag combination from a new trace entry.
 
         Process/tag combinations provided to this method already appear on
         the trace file, so their submission status is updated based on their
@@ -552,95 +936,258 @@ class NextflowInspector:
         ----------
         process : str
             Name of the current process. Must be present in attr:`processes`
-        vals : list
-            List of tags for this process that have been gathered in the
-            trace file.
-        """
-
-        good_status = ["COMPLETED", "CACHED"]
-
-        # Update status of each process
-        for v in list(vals)[::-1]:
-            p = self.processes[process]
-            tag = v["tag"]
-
-            # If the process/tag is in the submitted list, move it to the
-            # complete or failed list
-            if tag in p["submitted"]:
-                p["submitted"].remove(tag)
-                if v["status"] in good_status:
-                    p["finished"].add(tag)
-                elif v["status"] == "FAILED":
-                    if not v["work_dir"]:
-                        v["work_dir"] = ""
-                    self.process_tags[process][tag]["log"] = \
-                        self._retrieve_log(join(v["work_dir"], ".command.log"))
-                    p["failed"].add(tag)
-
-            # It the process/tag is in the retry list and it completed
-            # successfully, remove it from the retry and fail lists. Otherwise
-            # maintain it in the retry/failed lists
-            elif tag in p["retry"]:
-                if v["status"] in good_status:
-                    p["retry"].remove(tag)
-                    p["failed"].remove(tag)
-                    del self.process_tags[process][tag]["log"]
-                elif self.run_status == "aborted":
-                    p["retry"].remove(tag)
-
-            elif v["status"] in good_status:
-                p["finished"].add(tag)
-
-            # Filter tags without a successfull status.
-            if v["status"] not in good_status:
-                if v["tag"] in list(p["submitted"]) + list(p["finished"]):
-                    vals.remove(v)
-
-        return vals
-
-    def _update_barrier_status(self):
-        """Checks whether the channels to each process have been closed.
-        """
-
-        with open(self.log_file) as fh:
-
-            for line in fh:
-
-                # Exit barrier update after session abort signal
-                if "Session aborted" in line:
-                    return
-
-                if "<<< barrier arrive" in line:
-                    # Retrieve process name from string
-                    process_m = re.match(".*process: (.*)\)", line)
-                    if process_m:
-                        process = process_m.group(1)
-                        # Updates process channel to complete
-                        if process in self.processes:
-                            self.processes[process]["barrier"] = "C"
+        info : dict
+            Trace entry of the process/tag, as retrieved from
+            :func:`_update_trace_info`.
 
-    @staticmethod
-    def _retrieve_log(path):
-        """Method used to retrieve the contents of a log file into a list.
+        Returns
+        -------
+        bool
+            False if the trace entry is unsuccessful and the tag was already
+            submitted again or finished, in which case it should not be
+            included in the process statistics.
+        """
+
+        p = self.processes[process]
+        tag = info["tag"]
+
+        # If the process/tag is in the submitted list, move it to the
+        # complete or failed list
+        if tag in p["submitted"]:
+            self._update_tag_state(process, "submitted", tag, False)
+            if info["status"] in self.GOOD_STATUS:
+                self._set_tag_finished(process, tag)
+            elif info["status"] == "FAILED":
+                if not info["work_dir"]:
+                    info["work_dir"] = ""
+                self.process_tags[process][tag].log = \
+                    self._retrieve_log(join(info["work_dir"], ".command.log"))
+                self._update_tag_state(process, "failed", tag, True)
+
+        # It the process/tag is in the retry list and it completed
+        # successfully, remove it from the retry and fail lists. Otherwise
+        # maintain it in the retry/failed lists
+        elif tag in p["retry"]:
+            if info["status"] in self.GOOD_STATUS:
+                self._update_tag_state(process, "retry", tag, False)
+                self._update_tag_state(process, "failed", tag, False)
+                self.process_tags[process][tag].log = None
+                self._set_tag_finished(process, tag)
+            elif self.run_status == "aborted":
+                self._update_tag_state(process, "retry", tag, False)
+
+        elif info["status"] in self.GOOD_STATUS:
+            self._set_tag_finished(process, tag)
+
+        # Filter tags without a successfull status.
+        if info["status"] not in self.GOOD_STATUS:
+            if tag in p["submitted"] or tag in p["finished"]:
+                return False
+
+        return True
+
+    def _set_tag_finished(self, process, tag):
+        """Adds a tag to the 'finished' set of a process."""
+
+        self._update_tag_state(process, "finished", tag, True)
+        self._discard_unsuccessful_entries(process, tag)
+
+    def _update_tag_state(self, process, state, tag, value):
+        """Adds or removes a tag from one of the submission state sets of a
+        process ('submitted', 'finished', 'failed' or 'retry'), keeping the
+        totals of :attr:`tag_totals` up to date.
 
         Parameters
         ----------
-        path
+        process : str
+            Process name
+        state : str
+            Submission state.
+        tag : str
+            Tag name
+        value : bool
+            If True, the tag is added to the state set. Otherwise it is
+            removed.
+        """
+
+        tags = self.processes[process][state]
+
+        if value and tag not in tags:
+            tags.add(tag)
+            self.tag_totals[state] += 1
+        elif not value and tag in tags:
+            tags.remove(tag)
+            self.tag_totals[state] -= 1
+
+    def _reset_tag_totals(self):
+        """Counts the totals of :attr:`tag_totals` from the processes."""
+
+        self.tag_totals = dict(
+            (state, sum(len(p[state]) for p in self.processes.values()))
+            for state, _ in TAG_STATES)
+
+    def _discard_unsuccessful_entries(self, process, tag):
+        """Removes the unsuccessful trace entries of a process/tag from the
+        process statistics.
+
+        This is called when the tag is submitted again or finishes
+        successfully, so that the statistics only reflect the last
+        execution of each tag.
+        """
+
+        entries = self._unsuccessful_entries[process].pop(tag, None)
+        if entries and process in self.process_stats:
+            for metrics in entries:
+                self.process_stats[process].remove(metrics)
+
+    def _update_barrier_status(self, line):
+        """Checks whether the channel to a process has been closed from a log
+        line with the ``<<< barrier arrive`` signature.
+
+        Barrier signatures after the pipeline was aborted are ignored.
+
+        Parameters
+        ----------
+        line : str
+            Log line with the barrier signature.
+        """
+
+        # Ignore barrier updates after session abort signal
+        if self.run_status == "aborted":
+            return
+
+        # Retrieve process name from string
+        process_m = re.match(".*process: (.*)\)", line)
+        if process_m:
+            process = process_m.group(1)
+            # Updates process channel to complete
+            if process in self.processes:
+                self.processes[process]["barrier"] = "C"
+                self._mark_dirty(process)
+
+    def _retrieve_log(self, path):
+        """Method used to retrieve an excerpt with the last lines of a log
+        file into a list.
+
+        The excerpt is limited to :attr:`LOG_EXCERPT_LINES` lines and
+        :attr:`LOG_EXCERPT_BYTES` bytes, which are read from the end of the
+        file. Excerpts are cached with the inode of the file and the offset
+        up to which it was read, so that a log that grows (e.g.: the
+        nextflow log) only has its new bytes read and a log that does not
+        change is not read again.
+
+        Parameters
+        ----------
+        path : str
+            Path to the log file.
 
         Returns
         -------
         list or None
-            Contents of the provided file, each line as a list entry
+            Last lines of the provided file, each line as a list entry, or
+            None if the file does not exist.
         """
 
-        if not os.path.exists(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        identity = (st.st_dev, st.st_ino)
+        cached = self._log_cache.pop(path, None)
+
+        try:
+            if cached and cached[0] == identity and \
+                    0 <= st.st_size - cached[1] <= self.LOG_EXCERPT_BYTES:
+                lines = self._extend_log(path, cached[1], st.st_size,
+                                         cached[2])
+            else:
+                lines = tail_lines(path, self.LOG_EXCERPT_LINES,
+                                   self.LOG_EXCERPT_BYTES, end=st.st_size)
+        except OSError:
             return None
 
-        with open(path) as fh:
-            return fh.readlines()
+        self._log_cache[path] = (identity, st.st_size, lines)
+        if len(self._log_cache) > self.LOG_CACHE_SIZE:
+            self._log_cache.popitem(last=False)
+
+        return lines
+
+    def _extend_log(self, path, offset, end, lines):
+        """Adds the bytes of a log file between ``offset`` and ``end`` to an
+        excerpt of the file up to ``offset``, as retrieved by
+        :func:`_retrieve_log`.
+
+        Returns
+        -------
+        list
+            Last lines of the file up to ``end``.
+        """
+
+        if end == offset:
+            return lines
+
+        with open(path, "rb") as fh:
+            fh.seek(offset)
+            text = fh.read(end - offset).decode("utf8", errors="replace")
+
+        # The last line of the excerpt may have been incomplete
+        if lines and not lines[-1].endswith("\n"):
+            text = lines[-1] + text
+            lines = lines[:-1]
+
+        lines = (lines + io.StringIO(text).readlines())[
+            -self.LOG_EXCERPT_LINES:]
+
+        size = sum(len(x) for x in lines)
+        while lines and size > self.LOG_EXCERPT_BYTES:
+            size -= len(lines.pop(0))
+
+        return lines
+
+    def _parse_trace_values(self, info):
+        """Parses the numeric columns of a trace entry.
+
+        Parameters
+        ----------
+        info : dict
+            Trace entry with the string value of each column.
+
+        Returns
+        -------
+        dict
+            Maps each numeric column of
+            :attr:`~flowcraft.generator.inspect_stats.TraceColumns.NUMERIC_COLUMNS`
+            that is present in the entry to its value, or NaN when it is not
+            available.
+        """
+
+        values = {}
+
+        for column in TraceColumns.NUMERIC_COLUMNS:
+            if column not in info:
+                continue
+            value = info[column]
+            try:
+                if value == "-":
+                    values[column] = NAN
+                elif column == "realtime":
+                    values[column] = self._hms(value)
+                elif column == "cpus":
+                    values[column] = float(value)
+                elif column == "%cpu":
+                    values[column] = float(
+                        value.replace(",", ".").replace("%", ""))
+                else:
+                    values[column] = self._size_coverter(value)
+            except ValueError:
+                values[column] = NAN
+
+        return values
 
     def _update_trace_info(self, fields, hm):
-        """Parses a trace line and updates the :attr:`status_info` attribute.
+        """Parses a trace line and updates the :attr:`trace_store` and
+        :attr:`process_tags` attributes.
 
         Parameters
         ----------
@@ -649,6 +1196,12 @@ class NextflowInspector:
         hm : dict
             Maps the column IDs to their position in the fields argument.
             This dictionary object is retrieve from :func:`_header_mapping`.
+
+        Returns
+        -------
+        dict or None
+            The new trace entry, or None if the entry was skipped. The
+            parsed numeric values are stored in the 'values' key.
         """
 
         process = fields[hm["process"]]
@@ -658,41 +1211,40 @@ class NextflowInspector:
 
         # Get information from a single line of trace file
         info = dict((column, fields[pos]) for column, pos in hm.items())
+        values = self._parse_trace_values(info)
+        tag = info["tag"]
 
-        # The headers that will be used to populate the process
-        process_tag_headers = ["realtime", "rss", "rchar", "wchar"]
-        for h in process_tag_headers:
-
-            # In the rare occasion the tag is parsed first in the trace
-            # file than the log file, add the new tag.
-            if info["tag"] not in self.process_tags[process]:
-                # If the 'start' tag is present in the trace, use that
-                # information. If not, it will be parsed in the log file.
-                try:
-                    timestart = info["start"].split()[1]
-                except KeyError:
-                    timestart = None
-                self.process_tags[process][info["tag"]] = {
-                    "workdir": self._expand_path(info["hash"]),
-                    "start": timestart
-                }
+        self._mark_dirty(process, tag)
 
-            if h in info and info["tag"] != "-":
-                if h != "realtime" and info[h] != "-":
-                    self.process_tags[process][info["tag"]][h] = \
-                        round(self._size_coverter(info[h]), 2)
-                else:
-                    self.process_tags[process][info["tag"]][h] = info[h]
+        # In the rare occasion the tag is parsed first in the trace
+        # file than the log file, add the new tag.
+        if tag not in self.process_tags[process]:
+            # If the 'start' tag is present in the trace, use that
+            # information. If not, it will be parsed in the log file.
+            try:
+                timestart = info["start"].split()[1]
+            except KeyError:
+                timestart = None
+            self.process_tags[process][tag] = TagInfo(
+                self._expand_path(info["hash"], info.get("workdir")),
+                timestart)
+
+        # The headers that will be used to populate the process
+        if tag != "-":
+            tag_info = self.process_tags[process][tag]
+            if "realtime" in info:
+                tag_info.realtime = sys.intern(info["realtime"])
+            for h in ["rss", "rchar", "wchar"]:
+                if h in info:
+                    setattr(tag_info, h, "-" if math.isnan(values[h])
+                            else round(values[h], 2))
 
         # Set allocated cpu and memory information to process
         if "cpus" in info and not self.processes[process]["cpus"]:
             self.processes[process]["cpus"] = info["cpus"]
         if "memory" in info and not self.processes[process]["memory"]:
-            try:
-                self.processes[process]["memory"] = self._size_coverter(
-                    info["memory"])
-            except ValueError:
-                self.processes[process]["memory"] = None
+            self.processes[process]["memory"] = None \
+                if math.isnan(values["memory"]) else values["memory"]
 
         if info["hash"] in self.stored_ids:
             return
@@ -701,18 +1253,21 @@ class NextflowInspector:
         # and add a new entry
         if "hash" in info:
             hs = info["hash"]
-            info["work_dir"] = self._expand_path(hs)
+            info["work_dir"] = self._expand_path(hs, info.get("workdir"))
 
-        if "tag" in info:
-            tag = info["tag"]
-            if tag != "-" and tag not in self.samples and \
-                    tag.split()[0] not in self.samples:
-                self.samples.append(tag)
+        if tag != "-" and tag not in self._sample_names and \
+                tag.split()[0] not in self._sample_names:
+            self.samples.append(tag)
+            self._sample_names.add(tag)
 
-        self.trace_info[process].append(info)
-        self.stored_ids.append(info["hash"])
+        info["row"] = self.trace_store[process].append(
+            tag, info["status"], values)
+        info["values"] = values
+        self.stored_ids.add(info["hash"])
 
-    def _update_process_resources(self, process, vals):
+        return info
+
+    def _update_process_resources(self, process, info):
         """Updates the resources info in :attr:`processes` dictionary.
         """
 
@@ -721,7 +1276,7 @@ class NextflowInspector:
         for r in resources:
             if not self.processes[process][r]:
                 try:
-                    self.processes[process][r] = vals[0]["cpus"]
+                    self.processes[process][r] = info["cpus"]
                 # When the trace column is not present
                 except KeyError:
                     pass
@@ -750,15 +1305,16 @@ class NextflowInspector:
         except ValueError:
             return 0
 
-    def _assess_resource_warnings(self, process, vals):
+    def _assess_resource_warnings(self, process, rows=None):
         """Assess whether the cpu load or memory usage is above the allocation
 
         Parameters
         ----------
         process : str
             Process name
-        vals : vals
-            List of trace information for each tag of that process
+        rows : list, optional
+            Indexes of the trace entries of the process in
+            :attr:`trace_store`. By default, all entries are assessed.
 
         Returns
         -------
@@ -771,251 +1327,314 @@ class NextflowInspector:
         cpu_warnings = {}
         mem_warnings = {}
 
-        for i in vals:
-            try:
-                expected_load = float(i["cpus"]) * 100
-                cpu_load = float(i["%cpu"].replace(",", ".").replace("%", ""))
-
-                if expected_load * 0.9 > cpu_load > expected_load * 1.10:
-                    cpu_warnings[i["tag"]] = {
-                        "expected":  expected_load,
-                        "value": cpu_load
-                    }
-            except (ValueError, KeyError):
-                pass
-
-            try:
-                rss = self._size_coverter(i["rss"])
-                mem_allocated = self._size_coverter(i["memory"])
+        store = self.trace_store[process]
+        if rows is None:
+            rows = range(len(store))
+
+        cpus = store.columns["cpus"]
+        cpu_per = store.columns["%cpu"]
+        rss = store.columns["rss"]
+        memory = store.columns["memory"]
+
+        # Comparisons with NaN values (not available) are always False
+        for i in rows:
+            expected_load = cpus[i] * 100
+            cpu_load = cpu_per[i]
+            if expected_load * 0.9 > cpu_load > expected_load * 1.10:
+                cpu_warnings[store.tags[store.tag_ids[i]]] = {
+                    "expected": expected_load,
+                    "value": cpu_load
+                }
 
-                if rss > mem_allocated * 1.10:
-                    mem_warnings[i["tag"]] = {
-                        "expected": mem_allocated,
-                        "value": rss
-                    }
-            except (ValueError, KeyError):
-                pass
+            if rss[i] > memory[i] * 1.10:
+                mem_warnings[store.tags[store.tag_ids[i]]] = {
+                    "expected": memory[i],
+                    "value": rss[i]
+                }
 
         return cpu_warnings, mem_warnings
 
-    def _update_process_stats(self):
-        """Updates the process stats with the information from the processes
+    def _get_trace_metrics(self, process, info):
+        """Returns the metrics of a trace entry used by the
+        :class:`~flowcraft.generator.inspect_stats.ProcessStats` objects,
+        from the values parsed in :func:`_update_trace_info`.
 
-        This method is called at the end of each static parsing of the nextflow
-        trace file. It re-populates the :attr:`process_stats` dictionary
-        with the new stat metrics.
+        Parameters
+        ----------
+        process : str
+            Process name
+        info : dict
+            Trace entry, as retrieved from :func:`_update_trace_info`.
+
+        Returns
+        -------
+        dict
+            Metrics of the trace entry. The resource keys are only present
+            when the corresponding trace columns are available.
         """
 
-        good_status = ["COMPLETED", "CACHED"]
+        values = info["values"]
 
-        for process, vals in self.trace_info.items():
+        metrics = {
+            "tag": info["tag"],
+            "good": info["status"] in self.GOOD_STATUS
+        }
 
-            # Update submission status of tags for each process
-            vals = self._update_tag_status(process, vals)
+        if "realtime" in values:
+            metrics["realtime"] = 0 if math.isnan(values["realtime"]) \
+                else values["realtime"]
 
-            # Update process resources
-            self._update_process_resources(process, vals)
+        if all(x in values for x in ["realtime", "cpus", "%cpu"]):
+            cpuhour = values["%cpu"] / 100 * metrics["realtime"] / 60 / 24
+            metrics["cpuhour"] = 0 if math.isnan(cpuhour) or \
+                math.isnan(values["cpus"]) else cpuhour
 
-            self.process_stats[process] = {}
+        for column in ["rss", "rchar", "wchar"]:
+            if column in values:
+                metrics[column] = None if math.isnan(values[column]) \
+                    else values[column]
 
-            inst = self.process_stats[process]
+        cpu_warnings, mem_warnings = self._assess_resource_warnings(
+            process, [info["row"]])
+        metrics["cpu_warning"] = cpu_warnings.get(info["tag"])
+        metrics["mem_warning"] = mem_warnings.get(info["tag"])
 
-            # Get number of completed samples
-            inst["completed"] = "{}".format(
-                len([x for x in vals if x["status"] in good_status]))
+        return metrics
 
-            # Get average time
-            try:
-                time_array = [self._hms(x["realtime"]) for x in vals]
-                mean_time = round(sum(time_array) / len(time_array), 1)
-                mean_time_str = strftime('%H:%M:%S', gmtime(mean_time))
-                inst["realtime"] = mean_time_str
-            # When the realtime column is not present
-            except KeyError:
-                inst["realtime"] = "-"
+    def _update_process_stats(self, info):
+        """Updates the process stats with a new trace entry
 
-            # Get cumulative cpu/hours
-            try:
-                cpu_hours = [self._cpu_load_parser(
-                    x["cpus"], x["%cpu"], x["realtime"]) for x in vals]
-                inst["cpuhour"] = round(sum(cpu_hours), 2)
-            # When the realtime, cpus or %cpus column are not present
-            except KeyError:
-                inst["cpuhour"] = "-"
+        This method is called once for each new entry of the nextflow trace
+        file. It updates the submission status of the tag and adds the
+        entry metrics to the running statistics of the process in the
+        :attr:`process_stats` dictionary.
 
-            # Assess resource warnings
-            inst["cpu_warnings"], inst["mem_warnings"] = \
-                self._assess_resource_warnings(process, vals)
+        Parameters
+        ----------
+        info : dict
+            Trace entry, as retrieved from :func:`_update_trace_info`.
+        """
 
-            # Get maximum memory
-            try:
-                rss_values = [self._size_coverter(x["rss"]) for x in vals
-                              if x["rss"] != "-"]
-                if rss_values:
-                    max_rss = round(max(rss_values))
-                    rss_str = self._size_compress(max_rss)
-                else:
-                    rss_str = "-"
-                inst["maxmem"] = rss_str
-            except KeyError:
-                inst["maxmem"] = "-"
+        process = info["process"]
 
-            # Get read size
-            try:
-                rchar_values = [self._size_coverter(x["rchar"]) for x in vals
-                                if x["rchar"] != "-"]
-                if rchar_values:
-                    avg_rchar = round(sum(rchar_values) / len(rchar_values))
-                    rchar_str = self._size_compress(avg_rchar)
-                else:
-                    rchar_str = "-"
-            except KeyError:
-                rchar_str = "-"
-            inst["avgread"] = rchar_str
+        # Update submission status of the tag
+        keep = self._update_tag_status(process, info)
 
-            # Get write size
-            try:
-                wchar_values = [self._size_coverter(x["wchar"]) for x in vals
-                                if x["wchar"] != "-"]
-                if wchar_values:
-                    avg_wchar = round(sum(wchar_values) / len(wchar_values))
-                    wchar_str = self._size_compress(avg_wchar)
-                else:
-                    wchar_str = "-"
-            except KeyError:
-                wchar_str = "-"
-            inst["avgwrite"] = wchar_str
+        # Update process resources
+        self._update_process_resources(process, info)
+
+        if process not in self.process_stats:
+            self.process_stats[process] = ProcessStats()
+
+        if not keep:
+            return
+
+        metrics = self._get_trace_metrics(process, info)
+        self.process_stats[process].add(metrics)
+
+        if not metrics["good"]:
+            self._unsuccessful_entries[process].setdefault(
+                info["tag"], []).append(metrics)
 
     #################
     # PARSING METHODS
     #################
 
     def trace_parser(self):
-        """Method that parses the trace file once and updates the
+        """Method that parses the new lines of the trace file and updates the
         :attr:`status_info` attribute with the new entries.
+
+        Only the complete lines appended to the trace file since the previous
+        call are parsed (see :class:`~flowcraft.generator.tail.FileTail`).
+        When the trace file is truncated or replaced, the header is parsed
+        again from the start of the new file.
         """
 
-        # Check the timestamp of the tracefile. Only proceed with the parsing
-        # if it changed from the previous time.
-        size_stamp = os.path.getsize(self.trace_file)
+        lines = self.trace_tail.readlines()
         self.trace_retry = 0
-        if size_stamp and size_stamp == self.trace_sizestamp:
+
+        if self.trace_tail.rotated:
+            logger.debug("Trace file was replaced. Parsing new header")
+            self.trace_header = None
+
+        if not lines:
             return
-        else:
-            logger.debug("Updating trace size stamp to: {}".format(size_stamp))
-            self.trace_sizestamp = size_stamp
 
-        with open(self.trace_file) as fh:
+        logger.debug("Parsing {} new trace lines up to offset: {}".format(
+            len(lines), self.trace_tail.offset))
 
-            # Skip potential empty lines at the start of file
-            header = next(fh).strip()
-            while not header:
-                header = next(fh).strip()
+        rows = []
+        for line in lines:
 
-            # Get header mappings before parsing the file
-            hm = self._header_mapping(header)
+            # Skip empty lines
+            if line.strip() == "":
+                continue
 
-            for line in fh:
+            # The first non-empty line of the file is the header
+            if not self.trace_header:
+                self.trace_header = self._header_mapping(line.strip())
+                continue
 
-                # Skip empty lines
-                if line.strip() == "":
-                    continue
+            rows.append(line.strip().split("\t"))
 
-                fields = line.strip().split("\t")
+        # Read the listing of each work directory bucket of the new entries
+        # only once, unless the full work directories are in the trace file.
+        if rows and "workdir" not in self.trace_header:
+            pos = self.trace_header["hash"]
+            self.workdir_resolver.prefetch(
+                fields[pos] for fields in rows if len(fields) > pos)
 
-                # Skip if task ID was already processes
-                if fields[hm["task_id"]] in self.stored_ids:
-                    continue
+        for fields in rows:
 
-                # Parse trace entry and update status_info attribute
-                self._update_trace_info(fields, hm)
-                self.send = True
+            # Parse trace entry and update status_info attribute
+            info = self._update_trace_info(fields, self.trace_header)
+            if info:
+                self._update_process_stats(info)
+            self.send = True
 
-        self._update_process_stats()
-        self._update_barrier_status()
+    def _update_submission_status(self, line):
+        """Parses a log line with the submission, re-submission or caching
+        of a process/tag and updates its submission status.
 
-    def log_parser(self):
-        """Method that parses the nextflow log file once and updates the
-        submitted number of samples for each process
+        Parameters
+        ----------
+        line : str
+            Log line with the submission signature.
         """
 
-        # Check the timestamp of the log file. Only proceed with the parsing
-        # if it changed from the previous time.
-        size_stamp = os.path.getsize(self.log_file)
-        self.log_retry = 0
-        if size_stamp and size_stamp == self.log_sizestamp:
-            return
-        else:
-            logger.debug("Updating log size stamp to: {}".format(size_stamp))
-            self.log_sizestamp = size_stamp
-
         # Regular expression to catch four groups:
         # 1. Start timestamp
         # 2. Work directory hash
         # 3. Process name
         # 4. Tag name
-        r = ".* (.*) \[.*\].*\[(.*)\].*process > (.*) \((.*)\).*"
-
-        with open(self.log_file) as fh:
-
-            for line in fh:
-                if "Submitted process >" in line or \
-                        "Re-submitted process >" in line or \
-                        "Cached process >" in line:
-                    m = re.match(r, line)
-                    if not m:
-                        continue
-
-                    time_start = m.group(1)
-                    workdir = m.group(2)
-                    process = m.group(3)
-                    tag = m.group(4)
-
-                    # Skip if this line has already been parsed
-                    if time_start + tag not in self.stored_log_ids:
-                        self.stored_log_ids.append(time_start + tag)
-                    else:
-                        continue
-
-                    # For first time processes
-                    if process not in self.processes:
-                        continue
-                    p = self.processes[process]
-
-                    # Skip is process/tag combination has finished or is retrying
-                    if tag in list(p["finished"]) + list(p["retry"]):
-                        continue
-
-                    # Update failed process/tags when they have been re-submitted
-                    if tag in list(p["failed"]) and \
-                            "Re-submitted process >" in line:
-                        p["retry"].add(tag)
-                        self.send = True
-                        continue
-
-                    # Set process barrier to running. Check for barrier status
-                    # are performed at the end of the trace parsing in the
-                    # _update_barrier_status method.
-                    p["barrier"] = "R"
-                    if tag not in p["submitted"]:
-                        p["submitted"].add(tag)
-                        # Update the process_tags attribute with the new tag.
-                        # Update only when the tag does not exist. This may rarely
-                        # occur when the tag is parsed first in the trace file
-                        if tag not in self.process_tags[process]:
-                            self.process_tags[process][tag] = {
-                                "workdir": self._expand_path(workdir),
-                                "start": time_start
-                            }
-                            self.send = True
-                        # When the tag is filled in the trace file parsing,
-                        # the timestamp may not be present in the trace. In
-                        # those cases, fill that information here.
-                        elif not self.process_tags[process][tag]["start"]:
-                            self.process_tags[process][tag]["start"] = time_start
-                            self.send = True
-
-        self._update_pipeline_status()
+        m = re.match(r".* (.*) \[.*\].*\[(.*)\].*process > (.*) \((.*)\).*",
+                     line)
+        if not m:
+            return
+
+        time_start = m.group(1)
+        workdir = m.group(2)
+        process = m.group(3)
+        tag = m.group(4)
+
+        # Skip if this line has already been parsed
+        if time_start + tag in self.stored_log_ids:
+            return
+        self.stored_log_ids.add(time_start + tag)
+
+        # For first time processes
+        if process not in self.processes:
+            return
+        p = self.processes[process]
+
+        # Skip is process/tag combination has finished or is retrying
+        if tag in p["finished"] or tag in p["retry"]:
+            return
+
+        self._mark_dirty(process, tag)
+
+        # Update failed process/tags when they have been re-submitted
+        if tag in p["failed"] and "Re-submitted process >" in line:
+            self._update_tag_state(process, "retry", tag, True)
+            self.send = True
+            return
+
+        # Set process barrier to running, unless the barrier signature of
+        # the process was already found.
+        if p["barrier"] != "C":
+            p["barrier"] = "R"
+        if tag not in p["submitted"]:
+            self._update_tag_state(process, "submitted", tag, True)
+            self._discard_unsuccessful_entries(process, tag)
+            # Update the process_tags attribute with the new tag.
+            # Update only when the tag does not exist. This may rarely
+            # occur when the tag is parsed first in the trace file
+            if tag not in self.process_tags[process]:
+                self.process_tags[process][tag] = TagInfo(
+                    self._expand_path(workdir), time_start)
+                self.send = True
+            # When the tag is filled in the trace file parsing,
+            # the timestamp may not be present in the trace. In
+            # those cases, fill that information here.
+            elif not self.process_tags[process][tag].start:
+                self.process_tags[process][tag].start = time_start
+                self.send = True
+
+    def _parse_log_line(self, line):
+        """Dispatches a single line of the nextflow log to the method that
+        parses its signature.
+
+        All signatures are matched at once with the :data:`LOG_SIGNATURES`
+        regular expression.
+
+        Parameters
+        ----------
+        line : str
+            Line of the nextflow log file.
+        """
+
+        # The first line of the log contains the start time and the
+        # execution command
+        if not self.time_start:
+            self._get_run_info(line)
+
+        if self._expect_version:
+            self._get_nextflow_version(line)
+
+        m = LOG_SIGNATURES.search(line)
+        if not m:
+            return
+
+        signature = m.lastgroup
+
+        if signature == "submission":
+            self._update_submission_status(line)
+        elif signature == "barrier":
+            self._update_barrier_status(line)
+        elif signature == "operator":
+            self._get_pipeline_processes(line)
+        elif signature == "launch":
+            self._get_pipeline_name(line)
+        elif signature == "cmdrun":
+            if not self.nextflow_version:
+                self._expect_version = True
+        elif signature in ["aborted", "complete"]:
+            self._update_pipeline_status(line, signature)
+
+    def log_parser(self):
+        """Method that parses the new lines of the nextflow log file and
+        updates the processes, their submission and barrier status and the
+        pipeline status.
+
+        Only the complete lines appended to the log file since the previous
+        call are parsed (see :class:`~flowcraft.generator.tail.FileTail`),
+        and each one is parsed only once by :func:`_parse_log_line`. When the
+        log file is replaced, which happens when the pipeline is re-executed,
+        the inspection attributes are cleared and the new log is parsed from
+        the start.
+        """
+
+        lines = self.log_tail.readlines()
+        self.log_retry = 0
+
+        if self.log_tail.rotated:
+            logger.debug("Log file was replaced. Resetting inspection")
+            self._clear_inspect()
+            self.run_status = ""
+
+        if lines:
+            logger.debug("Parsing {} new log lines up to offset: {}".format(
+                len(lines), self.log_tail.offset))
+            # Read the listing of each work directory bucket of the new
+            # submissions only once
+            self.workdir_resolver.prefetch(
+                m.group(1) for m in map(SUBMISSION_HASH.search, lines) if m)
+
+        for line in lines:
+            self._parse_log_line(line)
+
+        if not self.run_status:
+            self.run_status = "running"
 
     def update_inspection(self):
         """Wrapper method that calls the appropriate main updating methods of
@@ -1042,6 +1661,164 @@ class NextflowInspector:
             if self.trace_retry == self.MAX_RETRIES:
                 raise e
 
+        if time.time() - self._last_checkpoint > self.CHECKPOINT_INTERVAL:
+            self.save_checkpoint()
+
+    ####################
+    # CHECKPOINT METHODS
+    ####################
+
+    def _get_checkpoint_state(self):
+        """Returns the JSON serializable inspection state that is saved in
+        the checkpoint."""
+
+        processes = []
+        for process, p in self.processes.items():
+            state = dict((x, list(p[x])) for x in
+                         ["submitted", "finished", "failed", "retry"])
+            state.update((x, p[x]) for x in ["barrier", "cpus", "memory"])
+            processes.append((process, state))
+
+        return {
+            "trace_file": abspath(self.trace_file),
+            "trace": file_identity(self.trace_file, self.trace_tail.offset),
+            "log": file_identity(self.log_file, self.log_tail.offset),
+            "trace_header": self.trace_header,
+            "info": dict((x, getattr(self, x)) for x in [
+                "pipeline_name", "pipeline_tag", "time_start", "time_stop",
+                "execution_command", "nextflow_version", "run_status",
+                "abort_cause", "_expect_version"]),
+            "processes": processes,
+            "process_tags": dict(
+                (process, dict((tag, info.as_dict())
+                               for tag, info in tags.items()))
+                for process, tags in self.process_tags.items()),
+            "process_stats": dict(
+                (process, stats.get_state())
+                for process, stats in self.process_stats.items()),
+            "unsuccessful_entries": self._unsuccessful_entries,
+            "trace_store": dict(
+                (process, store.get_state())
+                for process, store in self.trace_store.items()),
+            "stored_ids": list(self.stored_ids),
+            "stored_log_ids": list(self.stored_log_ids),
+            "samples": self.samples
+        }
+
+    def _restore_checkpoint_state(self, state):
+        """Restores the inspection state from a checkpoint."""
+
+        for k, v in state["info"].items():
+            setattr(self, k, v)
+        self.trace_header = state["trace_header"]
+
+        self.processes = OrderedDict()
+        for process, p in state["processes"]:
+            self.processes[process] = dict(
+                (k, set(v) if isinstance(v, list) else v)
+                for k, v in p.items())
+        self.content_lines = len(self.processes)
+        self._reset_tag_totals()
+
+        self.process_tags = dict(
+            (process, dict((tag, TagInfo.from_dict(info))
+                           for tag, info in tags.items()))
+            for process, tags in state["process_tags"].items())
+        self.process_stats = dict(
+            (process, ProcessStats.from_state(stats))
+            for process, stats in state["process_stats"].items())
+        self._unsuccessful_entries = defaultdict(
+            dict, state["unsuccessful_entries"])
+        self.trace_store = defaultdict(TraceColumns, (
+            (process, TraceColumns.from_state(store))
+            for process, store in state["trace_store"].items()))
+        self.stored_ids = set(state["stored_ids"])
+        self.stored_log_ids = set(state["stored_log_ids"])
+        self.samples = state["samples"]
+        self._sample_names = set(self.samples)
+
+        for tail, identity in [(self.trace_tail, state["trace"]),
+                               (self.log_tail, state["log"])]:
+            tail.offset = identity["offset"]
+            tail.inode = (identity["dev"], identity["ino"])
+
+    def load_checkpoint(self):
+        """Resumes the inspection from the checkpoint file.
+
+        The checkpoint is only used when the trace and log files are the
+        same files that were saved in the checkpoint (same inode and
+        contents up to the saved offsets). In that case, the parsing
+        continues from the saved offsets.
+
+        Returns
+        -------
+        bool
+            True if the inspection was resumed from the checkpoint.
+        """
+
+        if not self.checkpoint_file:
+            return False
+
+        state = read_checkpoint(self.checkpoint_file)
+        if not state:
+            return False
+
+        if state.get("trace_file") != abspath(self.trace_file) or \
+                not identity_matches(self.trace_file, state["trace"]) or \
+                not identity_matches(self.log_file, state["log"]):
+            logger.debug("Checkpoint does not match the current log and "
+                         "trace files")
+            return False
+
+        try:
+            self._restore_checkpoint_state(state)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug("Could not restore checkpoint: {}".format(e))
+            self.processes = OrderedDict()
+            self._clear_inspect()
+            self.pipeline_name = self.pipeline_tag = self.run_status = ""
+            return False
+
+        self._checkpoint_stamp = (self.trace_tail.offset,
+                                  self.log_tail.offset)
+        logger.debug("Resuming inspection from checkpoint at offsets: "
+                     "{}".format(self._checkpoint_stamp))
+
+        return True
+
+    def save_checkpoint(self):
+        """Writes the inspection state to the checkpoint file, if it changed
+        since the last checkpoint."""
+
+        self._last_checkpoint = time.time()
+
+        stamp = (self.trace_tail.offset, self.log_tail.offset)
+        if not self.checkpoint_file or stamp == self._checkpoint_stamp:
+            return
+
+        try:
+            state = self._get_checkpoint_state()
+        except OSError:
+            return
+
+        if write_checkpoint(self.checkpoint_file, state):
+            self._checkpoint_stamp = stamp
+            logger.debug("Inspection checkpoint saved at offsets: "
+                         "{}".format(stamp))
+
+    def _get_watcher(self):
+        """Returns a :class:`~flowcraft.generator.watcher.FileWatcher` for
+        the trace and log files and the work directory of the pipeline.
+
+        The watcher is used by the continuous inspection loops to parse
+        the files only when they change, instead of sleeping for
+        :attr:`refresh_rate` seconds between each parsing.
+        """
+
+        return FileWatcher([self.trace_file, self.log_file],
+                           directories=[join(self.workdir, "work")],
+                           poll_interval=self.refresh_rate)
+
     #################
     # CURSES METHODS
     #################
@@ -1063,6 +1840,8 @@ class NextflowInspector:
         self.screen_lines = self.screen.getmaxyx()[0]
         # self.screen_width = self.screen.getmaxyx()[1]
 
+        watcher = self._get_watcher()
+
         try:
             while stay_alive:
 
@@ -1073,7 +1852,9 @@ class NextflowInspector:
                 # Display curses interface
                 self.flush_overview()
 
-                sleep(self.refresh_rate)
+                # Wait for changes in the pipeline files or a key press.
+                # The timeout keeps the clock in the header up to date.
+                watcher.wait(timeout=1, fds=[sys.stdin])
         except FileNotFoundError:
             sys.stderr.write(colored_print(
                 "ERROR: nextflow log and/or trace files are no longer "
@@ -1081,6 +1862,8 @@ class NextflowInspector:
         except Exception as e:
             sys.stderr.write(str(e))
         finally:
+            watcher.close()
+            self.save_checkpoint()
             curses.nocbreak()
             self.screen.keypad(0)
             curses.echo()
@@ -1101,6 +1884,7 @@ class NextflowInspector:
         # Trigger screen size update on resize
         elif c == curses.KEY_RESIZE:
             self.screen_lines = self.screen.getmaxyx()[0]
+            self._pad = None
         # Exit interface when pressing q
         elif c == ord('q'):
             raise Exception
@@ -1126,10 +1910,57 @@ class NextflowInspector:
                 self.screen.getmaxyx()[1] + self.padding < self.max_width:
             self.padding += 1
 
-    def flush_overview(self):
-        """Displays the default overview of the pipeline execution from the
-        :attr:`status_info`, :attr:`processes` and :attr:`run_status`
-        attributes into stdout.
+    def _init_overview_pad(self):
+        """Creates the persistent pad of the overview with the height of the
+        screen.
+        """
+
+        curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
+        curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
+        curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)
+        curses.init_pair(4, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
+
+        self._pad = curses.newpad(self.screen.getmaxyx()[0], 2000)
+        self._frame = {}
+
+    def _draw_line(self, y, segments):
+        """Draws a line of the overview pad, only when it changed since the
+        previous frame.
+
+        Parameters
+        ----------
+        y : int
+            Line number.
+        segments : tuple
+            Tuple of (text, attribute) pairs drawn in sequence.
+        """
+
+        if self._frame.get(y) == segments:
+            return
+        self._frame[y] = segments
+
+        self._pad.move(y, 0)
+        self._pad.clrtoeol()
+        x = 0
+        for text, attr in segments:
+            self._pad.addstr(y, x, text, attr)
+            x += len(text)
+
+    def _get_overview_row(self, process):
+        """Returns the formatted overview row of a process.
+
+        The row is only formatted again when the submission state or the
+        statistics of the process changed.
+
+        Parameters
+        ----------
+        process : str
+            Process name
+
+        Returns
+        -------
+        tuple
+            Text and curses attribute of the row.
         """
 
         colors = {
@@ -1138,6 +1969,64 @@ class NextflowInspector:
             "C": 3
         }
 
+        proc = self.processes[process]
+        process_stats = self.process_stats.get(process)
+
+        state = (proc["barrier"], len(proc["submitted"]), len(proc["retry"]),
+                 len(proc["failed"]),
+                 process_stats.version if process_stats else None)
+        cached = self._row_cache.get(process)
+        if cached and cached[0] == state:
+            return cached[1]
+
+        stats = process_stats.summary() if process_stats else None
+        if stats is None:
+            vals = ["-"] * 8
+            txt_fmt = curses.A_NORMAL
+        else:
+            vals = [stats["completed"],
+                    len(proc["failed"]),
+                    stats["realtime"],
+                    stats["maxmem"], stats["avgread"],
+                    stats["avgwrite"]]
+            txt_fmt = curses.A_BOLD
+
+        if proc["retry"]:
+            completed = "{}({})".format(len(proc["submitted"]),
+                                        len(proc["retry"]))
+        else:
+            completed = "{}".format(len(proc["submitted"]))
+
+        row = ("{0: ^1} "
+               "{1:25.25}  "
+               "{2: ^7} "
+               "{3: ^7} "
+               "{4: ^7} "
+               "{5: ^10} "
+               "{6: ^10} "
+               "{7: ^10} "
+               "{8: ^10} ".format(
+                    proc["barrier"],
+                    process,
+                    completed,
+                    *vals),
+               curses.color_pair(colors[proc["barrier"]]) | txt_fmt)
+
+        self._row_cache[process] = (state, row)
+
+        return row
+
+    def flush_overview(self):
+        """Displays the default overview of the pipeline execution from the
+        :attr:`status_info`, :attr:`processes` and :attr:`run_status`
+        attributes into stdout.
+
+        The overview is drawn in a persistent pad, where only the lines that
+        changed since the previous frame are drawn again, and only the
+        process rows that fit the screen are formatted. The curses refresh
+        then only sends the changed cells to the terminal.
+        """
+
         pc = {
             "running": 3,
             "complete": 3,
@@ -1145,41 +2034,26 @@ class NextflowInspector:
             "error": 4
         }
 
-        curses.init_pair(1, curses.COLOR_WHITE, curses.COLOR_BLACK)
-        curses.init_pair(2, curses.COLOR_BLUE, curses.COLOR_BLACK)
-        curses.init_pair(3, curses.COLOR_GREEN, curses.COLOR_BLACK)
-        curses.init_pair(4, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
-
-        # self.screen.erase()
-
         height, width = self.screen.getmaxyx()
-        win = curses.newpad(height, 2000)
+        if self._pad is None:
+            self._init_overview_pad()
 
         # Add static header
         header = "Pipeline [{}] inspection at {}. Status: ".format(
             self.pipeline_tag, strftime("%Y-%m-%d %H:%M:%S", gmtime()))
 
-        win.addstr(0, 0, header)
-        win.addstr(0, len(header), self.run_status,
-                   curses.color_pair(pc[self.run_status]))
+        self._draw_line(0, ((header, curses.A_NORMAL),
+                            (self.run_status,
+                             curses.color_pair(pc[self.run_status]))))
+
         submission_str = "{0:23.23}  {1:23.23}  {2:23.23}  {3:23.23}".format(
-            "Running: {}".format(
-                sum([len(x["submitted"]) for x in self.processes.values()])
-            ),
-            "Failed: {}".format(
-                sum([len(x["failed"]) for x in self.processes.values()])
-            ),
-            "Retrying: {}".format(
-                sum([len(x["retry"]) for x in self.processes.values()])
-            ),
-            "Completed: {}".format(
-                sum([len(x["finished"]) for x in self.processes.values()])
-            )
+            "Running: {}".format(self.tag_totals["submitted"]),
+            "Failed: {}".format(self.tag_totals["failed"]),
+            "Retrying: {}".format(self.tag_totals["retry"]),
+            "Completed: {}".format(self.tag_totals["finished"])
         )
 
-        win.addstr(
-            1, 0, submission_str, curses.color_pair(1)
-        )
+        self._draw_line(1, ((submission_str, curses.color_pair(1)),))
 
         headers = ["", "Process", "Running", "Complete", "Error",
                    "Avg Time", "Max Mem", "Avg Read", "Avg Write"]
@@ -1193,53 +2067,25 @@ class NextflowInspector:
                      "{7: ^10} " \
                      "{8: ^10} ".format(*headers)
         self.max_width = len(header_str)
-        win.addstr(3, 0, header_str, curses.A_UNDERLINE | curses.A_REVERSE)
+        self._draw_line(3, ((header_str,
+                             curses.A_UNDERLINE | curses.A_REVERSE),))
 
         # Get display size
         top = self.top_line
         bottom = self.screen_lines - 4 + self.top_line
 
-        # Fetch process information
-        for p, process in enumerate(
-                list(self.processes.keys())[top:bottom]):
+        # Fetch process information of the visible rows
+        y = 4
+        for process in islice(self.processes, top, bottom):
+            self._draw_line(y, (self._get_overview_row(process),))
+            y += 1
 
-            if process not in self.process_stats:
-                vals = ["-"] * 8
-                txt_fmt = curses.A_NORMAL
-            else:
-                ref = self.process_stats[process]
-                vals = [ref["completed"],
-                        len(self.processes[process]["failed"]),
-                        ref["realtime"],
-                        ref["maxmem"], ref["avgread"],
-                        ref["avgwrite"]]
-                txt_fmt = curses.A_BOLD
+        # Clear the lines below the last process
+        for y in range(y, height):
+            self._draw_line(y, ())
 
-            proc = self.processes[process]
-            if proc["retry"]:
-                completed = "{}({})".format(len(proc["submitted"]),
-                                            len(proc["retry"]))
-            else:
-                completed = "{}".format(len(proc["submitted"]))
-
-            win.addstr(
-                4 + p, 0, "{0: ^1} "
-                          "{1:25.25}  "
-                          "{2: ^7} "
-                          "{3: ^7} "
-                          "{4: ^7} "
-                          "{5: ^10} "
-                          "{6: ^10} "
-                          "{7: ^10} "
-                          "{8: ^10} ".format(
-                                proc["barrier"],
-                                process,
-                                completed,
-                                *vals),
-                curses.color_pair(colors[proc["barrier"]]) | txt_fmt)
-
-        win.clrtoeol()
-        win.refresh(0, self.padding, 0, 0, height-1, width-1)
+        self._pad.noutrefresh(0, self.padding, 0, 0, height-1, width-1)
+        curses.doupdate()
 
     ###################
     # BROADCAST METHODS
@@ -1260,62 +2106,72 @@ class NextflowInspector:
 
         return d
 
-    def _prepare_table_data(self):
+    def _get_table_row(self, process, tag_lists=True):
+        """Returns the broadcast table data of a process.
+
+        Parameters
+        ----------
+        process : str
+            Process name
+        tag_lists : bool
+            If False, the lists of running, complete and error tags are
+            not included.
+
+        Returns
+        -------
+        dict
+            Table data of the process.
+        """
 
-        # Set data mappings
-        mappings = {
-            "Barrier": "barrier",
-            "Process": "process",
-            "Running": "running",
-            "Complete": "complete",
-            "Error": "error",
-            "Avg Time": "avgTime",
-            "CPU/hour": "cpuhour",
-            "Max Mem": "maxMem",
-            "Avg Read": "avgRead",
-            "Avg Write": "avgWrite"
+        table_headers = ["avgTime", "p50Time", "p95Time", "cpuhour", "maxMem",
+                         "avgRead", "avgWrite"]
+
+        proc = self.processes[process]
+        # Add general data that is always available for all processes
+        current_data = {
+            "process": process,
+            "barrier": proc["barrier"]
         }
+        if tag_lists:
+            current_data = {
+                **current_data,
+                **{"complete": list(proc["finished"]),
+                   "error": list(proc["failed"]),
+                   "running": list(proc["submitted"])}
+            }
 
-        # Set table data
-        data = []
-        table_headers = ["avgTime", "cpuhour", "maxMem", "avgRead", "avgWrite"]
-        for process in list(self.processes):
+        # Add stats data that is only available for processes that have
+        # finished once.
+        if process not in self.process_stats:
+            current_data = {
+                **current_data,
+                **dict((x, "-") for x in table_headers),
+                **{"cpuWarn": {}, "memWarn": {}}
+            }
 
-            proc = self.processes[process]
-            # Add general data that is always available for all processes
+        else:
+            ref = self.process_stats[process].summary()
             current_data = {
-                "process": process,
-                "barrier": proc["barrier"],
-                "complete": list(proc["finished"]),
-                "error": list(proc["failed"]),
-                "running": list(proc["submitted"])
+                **current_data,
+                **{"avgTime": ref["realtime"],
+                   "p50Time": ref["realtime_p50"],
+                   "p95Time": ref["realtime_p95"],
+                   "cpuhour": ref["cpuhour"],
+                   "maxMem": ref["maxmem"],
+                   "avgRead": ref["avgread"],
+                   "avgWrite": ref["avgwrite"],
+                   "cpuWarn": dict(ref["cpu_warnings"]),
+                   "memWarn": dict(ref["mem_warnings"])}
             }
 
-            # Add stats data that is only available for processes that have
-            # finished once.
-            if process not in self.process_stats:
-                current_data = {
-                    **current_data,
-                    **dict((x, "-") for x in table_headers),
-                    **{"cpuWarn": {}, "memWarn": {}}
-                }
+        return current_data
 
-            else:
-                ref = self.process_stats[process]
-                current_data = {
-                    **current_data,
-                    **{"avgTime": ref["realtime"],
-                       "cpuhour": ref["cpuhour"],
-                       "maxMem": ref["maxmem"],
-                       "avgRead": ref["avgread"],
-                       "avgWrite": ref["avgwrite"],
-                       "cpuWarn": ref["cpu_warnings"],
-                       "memWarn": ref["mem_warnings"]}
-                }
+    def _prepare_table_data(self):
 
-            data.append(current_data)
+        data = [self._get_table_row(process)
+                for process in list(self.processes)]
 
-        return mappings, data
+        return self.TABLE_MAPPINGS, data
 
     def _prepare_overview_data(self):
 
@@ -1353,13 +2209,9 @@ class NextflowInspector:
             }
         ]
 
-    def _get_log_lines(self, n=300):
-        """Returns a list with the last ``n`` lines of the nextflow log file
-
-        Parameters
-        ----------
-        n : int
-            Number of last lines from the log file
+    def _get_log_lines(self):
+        """Returns a list with the last lines of the nextflow log file, as
+        retrieved by :func:`_retrieve_log`.
 
         Returns
         -------
@@ -1367,10 +2219,7 @@ class NextflowInspector:
             List of strings with the nextflow log
         """
 
-        with open(self.log_file) as fh:
-            last_lines = fh.readlines()[-n:]
-
-        return last_lines
+        return self._retrieve_log(self.log_file)
 
     def _prepare_run_status_data(self):
 
@@ -1385,12 +2234,10 @@ class NextflowInspector:
             "logLines": log_lines
         }
 
-    def _send_status_info(self, run_id):
-
-        mappings, data = self._prepare_table_data()
-        overview_data = self._prepare_overview_data()
-        general_details = self._prepare_general_details()
-        status_data = self._prepare_run_status_data()
+    def _get_status_globals(self):
+        """Returns the fields of the broadcast status that are sent both
+        in the full snapshots and in the status deltas.
+        """
 
         # Add current year to start and stop dates
         time_start = "{} {}".format(time.strftime("%Y"), self.time_start)
@@ -1399,35 +2246,149 @@ class NextflowInspector:
         # Get enconding for proper parsing of time
         time_locale = locale.getlocale()[0]
 
-        status_json = {
-            "generalOverview": overview_data,
-            "generalDetails": general_details,
-            "tableData": data,
-            "tableMappings": mappings,
-            "processInfo": self._convert_process_dict(),
-            "processTags": self.process_tags,
-            "runStatus": status_data,
+        return {
+            "generalOverview": self._prepare_overview_data(),
+            "generalDetails": self._prepare_general_details(),
+            "tableMappings": self.TABLE_MAPPINGS,
+            "runStatus": self._prepare_run_status_data(),
             "timeStart": time_start,
             "timeStop": time_stop,
             "timeLocale": time_locale,
             "processes": list(self.processes)
         }
 
+    def _get_status_json(self):
+        """Returns the full snapshot of the broadcast status."""
+
+        mappings, data = self._prepare_table_data()
+
+        # The payload is serialized by the transport in the background, so
+        # it must not share the tag dictionaries that are being updated.
+        process_tags = dict(
+            (process, dict((tag, info.as_dict()) for tag, info in tags.items()))
+            for process, tags in self.process_tags.items())
+
+        return {
+            **self._get_status_globals(),
+            **{"tableData": data,
+               "processInfo": self._convert_process_dict(),
+               "processTags": process_tags}
+        }
+
+    def _get_status_delta(self):
+        """Returns the changes of the broadcast status since the last
+        acknowledged version.
+
+        Only the processes and process/tags flagged with
+        :func:`_mark_dirty` are included, so the size of the delta depends
+        on the rate of change of the pipeline and not on the number of
+        samples. The delta can be applied to the previous status with
+        :func:`apply_status_delta`.
+        """
+
+        processes = [x for x in self.processes if x in self._dirty_processes]
+
+        delta = {
+            **self._get_status_globals(),
+            **{"tableData": [], "processInfo": {}, "tagStatus": {},
+               "processTags": {}}
+        }
+
+        for process in processes:
+            proc = self.processes[process]
+
+            delta["tableData"].append(
+                self._get_table_row(process, tag_lists=False))
+            delta["processInfo"][process] = {
+                "barrier": proc["barrier"],
+                "cpus": proc["cpus"],
+                "memory": proc["memory"]
+            }
+
+            tags = self._dirty_tags.get(process, [])
+            delta["tagStatus"][process] = dict(
+                (tag, [state for state, _ in TAG_STATES if tag in proc[state]])
+                for tag in tags)
+            delta["processTags"][process] = dict(
+                (tag, self.process_tags[process][tag].as_dict()) for tag in tags
+                if tag in self.process_tags[process])
+
+        return delta
+
+    def _send_status_info(self, run_id):
+        """Sends the status of the pipeline to the broadcast server.
+
+        A full snapshot of the status is sent after establishing the
+        connection, every :attr:`RESYNC_INTERVAL` seconds, and whenever the
+        server could not apply a delta. Otherwise, only the changes since
+        the last status are sent.
+
+        The status is added to the queue of the :attr:`transport` and sent
+        in the background. A status that is still in the queue is merged
+        with the new one (see :func:`merge_status_payloads`).
+
+        Parameters
+        ----------
+        run_id : str
+            Identifier of the pipeline run.
+        """
+
+        while self._status_failures:
+            _, unsupported = self._status_failures.popleft()
+            if unsupported:
+                self._send_deltas = False
+            self._sent_version = None
+
+        full = not self._send_deltas or self._sent_version is None or \
+            time.time() - self._last_resync > self.RESYNC_INTERVAL
+
+        version = self._status_version + 1
+        if full:
+            payload = {"run_id": run_id, "version": version,
+                       "status_json": self._get_status_json()}
+            self._last_resync = time.time()
+        else:
+            payload = {"run_id": run_id, "version": version,
+                       "base_version": self._sent_version,
+                       "status_delta": self._get_status_delta()}
+
         self._c += 1
-        logger.debug("Payload [{}] sent with size: {}".format(
-            self._c,
-            asizeof.asizeof(json.dumps(status_json))
-        ))
+        logger.debug("Payload [{}] ({}) queued".format(
+            self._c, "full" if full else "delta"))
 
-        try:
-            requests.put(self.broadcast_address,
-                         json={"run_id": run_id, "status_json": status_json})
-        except requests.exceptions.ConnectionError:
-            logger.error(colored_print(
-                "ERROR: Could not establish connection with server. The server"
-                " may be down or there is a problem with your internet "
-                "connection.", "red_bold"))
-            sys.exit(1)
+        self.transport.send("PUT", self.broadcast_address, payload,
+                            key=("status", run_id),
+                            merge=merge_status_payloads,
+                            callback=self._status_sent)
+
+        self._status_version = self._sent_version = version
+        self._dirty_processes = set()
+        self._dirty_tags = defaultdict(set)
+
+    def _status_sent(self, response, payload):
+        """Callback of the transport with the response of the server to a
+        status payload.
+
+        When the payload was not acknowledged, the failure is handed to
+        :func:`_send_status_info`, which sends a full snapshot in the next
+        update.
+        """
+
+        if response is not None and 200 <= response.status_code < 300:
+            return
+
+        logger.debug("Status [{}] not acknowledged: {}".format(
+            payload["version"],
+            response.status_code if response is not None else None))
+
+        # A conflict means that the server does not have the base version
+        # of the delta. Any other error on a delta means that the server
+        # does not support them.
+        unsupported = response is not None and "status_delta" in payload \
+            and response.status_code != 409
+
+        self._status_failures.append((payload["version"], unsupported))
+        self.send = True
 
     def _prepare_static_info(self):
         """Prepares the first batch of information, containing static
@@ -1486,55 +2447,80 @@ class NextflowInspector:
         return dag_json
 
     def _establish_connection(self, run_id, dict_dag):
+        """Sends the static information of the pipeline to the server,
+        registering a new run.
 
-        try:
+        Parameters
+        ----------
+        run_id : str
+            Hash of the run, as retrieved from :func:`_get_run_hash`.
+        dict_dag : dict
+            DAG of the pipeline.
+
+        Returns
+        -------
+        bool
+            True if the server accepted the new run.
+        """
 
-            static_info = self._prepare_static_info()
+        static_info = self._prepare_static_info()
 
-            logger.debug("Sending initial data with run id: {}".format(run_id))
+        logger.debug("Sending initial data with run id: {}".format(run_id))
 
-            payload = {"run_id": run_id, "dag_json": dict_dag,
-                       "pipeline_files": static_info}
-            logger.debug("Connection payload size: {}".format(
-                asizeof.asizeof(payload)))
+        payload = {"run_id": run_id, "dag_json": dict_dag,
+                   "pipeline_files": static_info}
 
-            r = requests.post(self.broadcast_address,
-                              json=payload)
+        r = self.transport.request("POST", self.broadcast_address, payload)
 
-            logger.debug("Response received: {}".format(r.status_code))
-            if r.status_code != 201:
-                logger.error(colored_print(
-                    "ERROR: There was a problem sending data to the server"
-                    "with reason: {}".format(r.reason)))
-                sys.exit(1)
-        except requests.exceptions.ConnectionError:
+        if r is None:
             logger.error(colored_print(
                 "ERROR: Could not establish connection with server. The server"
                 " may be down or there is a problem with your internet "
                 "connection.", "red_bold"))
-            sys.exit(1)
+            return False
 
-    def _close_connection(self, run_id):
+        logger.debug("Response received: {}".format(r.status_code))
+        if r.status_code != 201:
+            logger.error(colored_print(
+                "ERROR: There was a problem sending data to the server"
+                "with reason: {}".format(r.reason)))
+            return False
+
+        # The first status of the new connection is a full snapshot
+        self._sent_version = None
 
+        # Deltas are only sent to servers that announce their support,
+        # since other servers would ignore them
         try:
-            r = requests.delete(self.broadcast_address,
-                                json={"run_id": run_id})
-            if r.status_code != 202:
-                logger.error(colored_print(
-                    "ERROR: There was a problem sending data to the server"
-                    "with reason: {}".format(r.reason)))
-        except requests.exceptions.ConnectionError:
+            self._send_deltas = r.json().get("status_delta") is True
+        except (ValueError, AttributeError):
+            self._send_deltas = False
+
+        return True
+
+    def _close_connection(self, run_id):
+
+        # Send the pending status before closing the connection
+        self.transport.flush(timeout=60)
+
+        r = self.transport.request("DELETE", self.broadcast_address,
+                                   {"run_id": run_id})
+        if r is None:
             logger.error(colored_print(
                 "ERROR: Could not establish connection with server. The server"
                 " may be down or there is a problem with your internet "
                 "connection.", "red_bold"))
-            sys.exit(1)
+        elif r.status_code != 202:
+            logger.error(colored_print(
+                "ERROR: There was a problem sending data to the server"
+                "with reason: {}".format(r.reason)))
 
     def _get_run_hash(self):
         """Gets the hash of the nextflow file"""
 
         # Get name and path of the pipeline from the log file
-        pipeline_path = get_nextflow_filepath(self.log_file)
+        pipeline_path = join(self.workdir,
+                             get_nextflow_filepath(self.log_file))
 
         # Get hash from the entire pipeline file
         pipeline_hash = hashlib.md5()
@@ -1565,7 +2551,10 @@ class NextflowInspector:
         dict_dag = self._dag_file_to_dict()
         _broadcast_sent = False
         logger.debug("Establishing connection...")
-        self._establish_connection(run_hash, dict_dag)
+        if not self._establish_connection(run_hash, dict_dag):
+            sys.exit(1)
+
+        watcher = self._get_watcher()
 
         stay_alive = True
         try:
@@ -1579,10 +2568,13 @@ class NextflowInspector:
                 self.update_inspection()
                 if self.send:
                     logger.debug("Updating inspection")
-                    self._send_status_info(run_hash)
                     self.send = False
+                    self._send_status_info(run_hash)
 
-                sleep(self.refresh_rate)
+                # Block until the trace or log files change. The timeout
+                # allows resending a status that the server did not
+                # acknowledge.
+                watcher.wait(timeout=1)
 
         except FileNotFoundError:
             logger.error(colored_print(
@@ -1591,5 +2583,8 @@ class NextflowInspector:
         except Exception:
             logger.exception("ERROR: " + str(sys.exc_info()[0]))
         finally:
+            watcher.close()
+            self.save_checkpoint()
             logger.info("Closing connection")
             self._close_connection(run_hash)
+            self.transport.close()
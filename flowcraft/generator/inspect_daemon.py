@@ -0,0 +1,386 @@
+import os
+import glob
+import time
+import logging
+
+from os.path import abspath, isdir, join
+
+try:
+    import generator.error_handling as eh
+    from generator.inspect import NextflowInspector
+    from generator.watcher import FileWatcher
+    from generator.transport import HttpTransport
+    from generator.process_details import colored_print
+except ImportError:
+    import flowcraft.generator.error_handling as eh
+    from flowcraft.generator.inspect import NextflowInspector
+    from flowcraft.generator.watcher import FileWatcher
+    from flowcraft.generator.transport import HttpTransport
+    from flowcraft.generator.process_details import colored_print
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class InspectDaemon:
+    """Broadcasts the status of several pipelines from a single process.
+
+    The pipeline directories are provided as a list of paths or glob
+    patterns, which are expanded again every :attr:`DISCOVERY_INTERVAL`
+    seconds to find new runs. Each run is inspected by its own
+    :class:`~flowcraft.generator.inspect.NextflowInspector`, identified by
+    the run hash of its directory, while all of them share a single
+    :class:`~flowcraft.generator.watcher.FileWatcher` over their trace and
+    log files and a single
+    :class:`~flowcraft.generator.transport.HttpTransport`.
+
+    Runs are removed as soon as their pipeline completes or is aborted. A
+    finished run is only inspected again when its nextflow log is replaced
+    (e.g.: when the pipeline is resumed).
+
+    Parameters
+    ----------
+    directories : list
+        Paths or glob patterns of the pipeline directories.
+    trace_file : str
+        Path of the trace file, relative to each pipeline directory.
+    refresh_rate : float
+        Interval in seconds between checks of the files when file system
+        events are not available.
+    pretty : bool
+        Pretty inspection mode that skips the usual reporting processes.
+    ip_addr : str
+        Address of the flowcraft web application.
+    checkpoint : bool
+        If False, the inspection checkpoints are not used.
+    """
+
+    DISCOVERY_INTERVAL = 10
+    """
+    float: Interval in seconds between searches for new pipeline
+    directories.
+    """
+
+    LOAD_INTERVAL = 60
+    """
+    float: Interval in seconds between reports of the aggregate load of all
+    runs.
+    """
+
+    def __init__(self, directories, trace_file, refresh_rate, pretty=False,
+                 ip_addr=None, checkpoint=True):
+
+        self.directories = directories
+        """
+        list: Paths or glob patterns of the pipeline directories.
+        """
+
+        self.trace_file = trace_file
+        self.refresh_rate = float(refresh_rate)
+        self.pretty = pretty
+        self.ip_addr = ip_addr
+        self.checkpoint = checkpoint
+
+        self.transport = HttpTransport()
+        """
+        :class:`~flowcraft.generator.transport.HttpTransport`: Transport
+        shared by the inspectors of all runs.
+        """
+
+        self.runs = {}
+        """
+        dict: Maps the absolute path of each pipeline directory under
+        inspection to its inspector and run hash.
+        """
+
+        self.finished = {}
+        """
+        dict: Maps the absolute path of the pipeline directories whose run
+        has finished to the device and inode of their nextflow log. These
+        directories are skipped until the log is replaced.
+        """
+
+        self.watcher = None
+        """
+        :class:`~flowcraft.generator.watcher.FileWatcher`: Watcher of the
+        trace and log files of all runs. It is created again when the set of
+        runs changes.
+        """
+
+        self._last_discovery = 0
+        self._last_load = 0
+
+    @staticmethod
+    def _log_identity(path):
+        """Returns the device and inode of the nextflow log of a pipeline
+        directory, or None if the log does not exist.
+        """
+
+        try:
+            st = os.stat(join(path, ".nextflow.log"))
+        except OSError:
+            return None
+
+        return st.st_dev, st.st_ino
+
+    def _expand_directories(self):
+        """Expands the glob patterns of :attr:`directories` into the
+        absolute paths of the existing directories.
+        """
+
+        paths = []
+        for pattern in self.directories:
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                path = abspath(path)
+                if isdir(path) and path not in paths:
+                    paths.append(path)
+
+        return paths
+
+    def _start_run(self, path, identity):
+        """Starts the inspection of a pipeline directory.
+
+        Parameters
+        ----------
+        path : str
+            Absolute path of the pipeline directory.
+        identity : tuple
+            Device and inode of the nextflow log of the directory.
+
+        Returns
+        -------
+        bool
+            True if the run was added.
+        """
+
+        try:
+            inspector = NextflowInspector(
+                self.trace_file, self.refresh_rate, self.pretty,
+                self.ip_addr, transport=self.transport,
+                checkpoint=self.checkpoint, workdir=path)
+        except (eh.InspectionError, OSError) as e:
+            logger.debug("Skipping directory {}: {}".format(path, e))
+            return False
+
+        inspector.update_inspection()
+        if inspector.run_status != "running":
+            logger.debug("Skipping finished run in {}".format(path))
+            self.finished[path] = identity
+            return False
+
+        try:
+            run_hash = inspector._get_run_hash()
+        except (eh.LogError, OSError) as e:
+            logger.debug("Skipping directory {}: {}".format(path, e))
+            return False
+
+        if not inspector._establish_connection(
+                run_hash, inspector._dag_file_to_dict()):
+            return False
+
+        inspector._print_msg(run_hash)
+        self.runs[path] = (inspector, run_hash)
+
+        return True
+
+    def discover(self):
+        """Starts the inspection of the new pipeline directories.
+
+        A directory is only inspected when it has both the trace and log
+        files and its pipeline is still running. Directories that fail to
+        start are skipped until the next discovery.
+
+        Returns
+        -------
+        bool
+            True if new runs were added.
+        """
+
+        self._last_discovery = time.time()
+        added = False
+
+        for path in self._expand_directories():
+
+            if path in self.runs:
+                continue
+
+            identity = self._log_identity(path)
+            if identity is None or self.finished.get(path) == identity:
+                continue
+            self.finished.pop(path, None)
+
+            try:
+                added = self._start_run(path, identity) or added
+            except Exception as e:
+                logger.warning(colored_print(
+                    "WARNING: Could not start the inspection of {}: "
+                    "{}".format(path, e), "red_bold"))
+
+        return added
+
+    def remove(self, path):
+        """Stops the inspection of a run, sending its last status and
+        closing its connection with the server.
+
+        Parameters
+        ----------
+        path : str
+            Absolute path of the pipeline directory.
+        """
+
+        inspector, run_hash = self.runs.pop(path)
+
+        if inspector.send:
+            inspector.send = False
+            inspector._send_status_info(run_hash)
+
+        inspector.save_checkpoint()
+        inspector._close_connection(run_hash)
+
+        logger.info(colored_print(
+            "Stopped inspection of {} ({})".format(path, inspector.run_status),
+            "green_bold"))
+
+    def _drop(self, path):
+        """Removes a run with :meth:`remove`, ignoring the errors of its
+        last status and closing requests.
+        """
+
+        try:
+            self.remove(path)
+        except Exception as e:
+            logger.debug("Could not close the inspection of {}: {}".format(
+                path, e))
+            self.runs.pop(path, None)
+
+    def update(self):
+        """Updates the inspection of all runs and sends the status of those
+        that changed. Runs that finished, or whose files are no longer
+        reachable, are removed. Runs whose inspection fails are also removed,
+        and skipped until their nextflow log is replaced.
+
+        Returns
+        -------
+        bool
+            True if runs were removed.
+        """
+
+        removed = False
+
+        for path in list(self.runs):
+
+            inspector, run_hash = self.runs[path]
+
+            try:
+                inspector.update_inspection()
+
+                if inspector.send:
+                    inspector.send = False
+                    inspector._send_status_info(run_hash)
+
+            except FileNotFoundError:
+                logger.error(colored_print(
+                    "ERROR: nextflow log and/or trace files of {} are no "
+                    "longer reachable!".format(path), "red_bold"))
+                self._drop(path)
+                removed = True
+                continue
+
+            except Exception as e:
+                logger.error(colored_print(
+                    "ERROR: Inspection of {} failed: {}".format(path, e),
+                    "red_bold"))
+                self.finished[path] = self._log_identity(path)
+                self._drop(path)
+                removed = True
+                continue
+
+            if inspector.run_status in ["complete", "aborted"]:
+                self.finished[path] = self._log_identity(path)
+                self._drop(path)
+                removed = True
+
+        return removed
+
+    def get_load(self):
+        """Returns the aggregate load of all runs under inspection.
+
+        Returns
+        -------
+        dict
+            Number of runs and total number of running, failed, retrying
+            and completed tasks.
+        """
+
+        load = {"runs": len(self.runs), "submitted": 0, "failed": 0,
+                "retry": 0, "finished": 0}
+
+        for inspector, _ in self.runs.values():
+            for state, total in inspector.tag_totals.items():
+                load[state] += total
+
+        return load
+
+    def _log_load(self):
+
+        self._last_load = time.time()
+        load = self.get_load()
+
+        logger.info("Runs: {runs}; Running: {submitted}; Failed: {failed}; "
+                    "Retrying: {retry}; Completed: {finished}".format(**load))
+
+    def _get_watcher(self):
+        """Returns a :class:`~flowcraft.generator.watcher.FileWatcher` for
+        the trace and log files of all runs.
+        """
+
+        files = []
+        for inspector, _ in self.runs.values():
+            files.extend([inspector.trace_file, inspector.log_file])
+
+        return FileWatcher(files, poll_interval=self.refresh_rate)
+
+    def run(self):
+        """Inspects the pipeline directories until interrupted."""
+
+        logger.info(colored_print("Starting inspection daemon...",
+                                  "green_bold"))
+
+        try:
+            while True:
+
+                changed = False
+                if time.time() - self._last_discovery >= \
+                        self.DISCOVERY_INTERVAL:
+                    changed = self.discover()
+
+                changed = self.update() or changed
+
+                if changed or not self.watcher:
+                    if self.watcher:
+                        self.watcher.close()
+                    self.watcher = self._get_watcher()
+                    self._log_load()
+                elif time.time() - self._last_load >= self.LOAD_INTERVAL:
+                    self._log_load()
+
+                # Block until the files of any run change. The timeout
+                # allows resending the statuses that the server did not
+                # acknowledge and searching for new runs.
+                self.watcher.wait(timeout=1)
+
+        except Exception:
+            logger.exception("ERROR: Inspection daemon failed")
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the inspection of all runs and closes the transport."""
+
+        if self.watcher:
+            self.watcher.close()
+            self.watcher = None
+
+        for path in list(self.runs):
+            self._drop(path)
+
+        self.transport.close()
@@ -0,0 +1,631 @@
+import sys
+import math
+import base64
+import itertools
+
+from array import array
+from time import gmtime, strftime
+
+NAN = float("nan")
+
+
+def size_compress(s):
+    """Shortens a megabytes value into a string.
+
+    Parameters
+    ----------
+    s : float
+        Size in megabytes.
+
+    Returns
+    -------
+    str
+        Size string in megabytes or gigabytes (e.g.: '100MB', '1.5GB').
+    """
+
+    if s / 1024 > 1:
+        return "{}GB".format(round(s / 1024, 1))
+    else:
+        return "{}MB".format(s)
+
+
+class QuantileSketch:
+    """Bounded memory sketch for the quantiles of a stream of positive values.
+
+    Values are counted in logarithmic buckets, so that the quantile
+    estimates have a bounded relative error (:attr:`relative_accuracy`),
+    regardless of the number of values added. When the number of buckets
+    exceeds :attr:`max_bins`, the lowest buckets are collapsed, which only
+    affects the accuracy of the lowest quantiles.
+
+    Parameters
+    ----------
+    relative_accuracy : float
+        Maximum relative error of the quantile estimates.
+    max_bins : int
+        Maximum number of buckets kept in memory.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_bins=1024):
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins = {}
+        """
+        dict: Maps each bucket index to the number of values in that bucket.
+        """
+
+        self.zero_count = 0
+        """
+        int: Number of values that are zero or negative.
+        """
+
+        self.count = 0
+
+    def add(self, value):
+        """Adds a value to the sketch.
+
+        Parameters
+        ----------
+        value : float
+        """
+
+        self.count += 1
+
+        if value <= 0:
+            self.zero_count += 1
+            return
+
+        key = int(math.ceil(math.log(value) / self._log_gamma))
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+        if len(self.bins) > self.max_bins:
+            keys = sorted(self.bins)
+            self.bins[keys[1]] += self.bins.pop(keys[0])
+
+    def quantile(self, q):
+        """Returns the estimate of a quantile.
+
+        Parameters
+        ----------
+        q : float
+            Quantile between 0 and 1 (e.g.: 0.95).
+
+        Returns
+        -------
+        float or None
+            Estimate of the quantile, or None if the sketch is empty.
+        """
+
+        if not self.count:
+            return None
+
+        # Nearest rank of the quantile
+        rank = max(1, int(math.ceil(q * self.count)))
+
+        if rank <= self.zero_count:
+            return 0
+
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative >= rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def get_state(self):
+        """Returns the JSON serializable state of the sketch."""
+
+        return {"relative_accuracy": self.relative_accuracy,
+                "max_bins": self.max_bins,
+                "bins": list(self.bins.items()),
+                "zero_count": self.zero_count,
+                "count": self.count}
+
+    @classmethod
+    def from_state(cls, state):
+        """Creates a sketch from a state retrieved by :func:`get_state`."""
+
+        sketch = cls(state["relative_accuracy"], state["max_bins"])
+        sketch.bins = dict((k, v) for k, v in state["bins"])
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+
+        return sketch
+
+
+class ProcessStats:
+    """Running statistics of the trace entries of a single process.
+
+    The statistics are updated once for each new trace entry with the
+    resource values already parsed from the trace strings (see
+    :func:`~flowcraft.generator.inspect.NextflowInspector._get_trace_metrics`).
+    Entries of tasks that were not successful can also be removed from the
+    statistics when the task is retried. The formatted strings that are
+    displayed by the inspection views are only computed in
+    :func:`summary`, when the statistics changed.
+
+    The entry metrics are provided as a dictionary with the following
+    keys. The resource keys are absent when the corresponding column is
+    missing from the trace file and None when the value is not available
+    (``-``) for the entry:
+
+        - ``tag``: The tag of the task.
+        - ``good``: Whether the task completed successfully.
+        - ``realtime``: Task real time in seconds.
+        - ``cpuhour``: Task cpu/hour load.
+        - ``rss``, ``rchar``, ``wchar``: Sizes in megabytes.
+        - ``cpu_warning``, ``mem_warning``: Resource warnings for the task.
+    """
+
+    def __init__(self):
+
+        self.count = 0
+        """
+        int: Number of trace entries in the statistics.
+        """
+
+        self.completed = 0
+        """
+        int: Number of trace entries with a successful status.
+        """
+
+        self.columns = set()
+        """
+        set: Resource columns that are present in the trace file.
+        """
+
+        self.realtime_mean = 0.0
+        self._realtime_m2 = 0.0
+        """
+        float: Running mean and sum of squared deviations of the real time,
+        updated with Welford's algorithm.
+        """
+
+        self.cpuhour = 0.0
+
+        self.max_rss = None
+
+        self.rss_counts = {}
+        """
+        dict: Number of entries with each value of rss, so that
+        :attr:`max_rss` can be recomputed when an entry is removed.
+        """
+
+        self.sums = {"rchar": 0.0, "wchar": 0.0}
+        self.counts = {"rchar": 0, "wchar": 0}
+
+        self.cpu_warnings = {}
+        self.mem_warnings = {}
+
+        self.runtime_sketch = QuantileSketch()
+        """
+        :class:`QuantileSketch`: Quantiles of the real time of the successful
+        tasks.
+        """
+
+        self._summary = None
+
+        self.version = next(self._versions)
+        """
+        int: Version of the statistics, which increases whenever an entry
+        is added or removed.
+        """
+
+    _versions = itertools.count()
+    """
+    iterator: Source of the versions of all statistics, so that a version is
+    never repeated, even by a different instance.
+    """
+
+    STATE_ATTRIBUTES = ["count", "completed", "realtime_mean", "_realtime_m2",
+                        "cpuhour", "max_rss", "sums", "counts",
+                        "cpu_warnings", "mem_warnings"]
+    """
+    list: Attributes that are saved in the state of the statistics.
+    """
+
+    def get_state(self):
+        """Returns the JSON serializable state of the statistics."""
+
+        state = dict((x, getattr(self, x)) for x in self.STATE_ATTRIBUTES)
+        state["columns"] = list(self.columns)
+        state["rss_counts"] = list(self.rss_counts.items())
+        state["runtime_sketch"] = self.runtime_sketch.get_state()
+
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Creates the statistics from a state retrieved by
+        :func:`get_state`."""
+
+        stats = cls()
+        for x in cls.STATE_ATTRIBUTES:
+            setattr(stats, x, state[x])
+        stats.columns = set(state["columns"])
+        stats.rss_counts = dict(state["rss_counts"])
+        stats.runtime_sketch = QuantileSketch.from_state(
+            state["runtime_sketch"])
+
+        return stats
+
+    @property
+    def realtime_variance(self):
+        """float: Sample variance of the task real time."""
+
+        if self.count < 2:
+            return 0.0
+        return self._realtime_m2 / (self.count - 1)
+
+    def _update_realtime(self, value, sign):
+
+        if sign > 0:
+            delta = value - self.realtime_mean
+            self.realtime_mean += delta / self.count
+            self._realtime_m2 += delta * (value - self.realtime_mean)
+        elif self.count == 0:
+            self.realtime_mean = 0.0
+            self._realtime_m2 = 0.0
+        else:
+            delta = value - self.realtime_mean
+            self.realtime_mean -= delta / self.count
+            self._realtime_m2 -= delta * (value - self.realtime_mean)
+
+    def add(self, metrics):
+        """Adds the metrics of a trace entry to the statistics.
+
+        Parameters
+        ----------
+        metrics : dict
+            Parsed metrics of the trace entry.
+        """
+
+        self._summary = None
+        self.version = next(self._versions)
+        self.count += 1
+
+        if metrics["good"]:
+            self.completed += 1
+
+        self.columns.update(x for x in ["realtime", "cpuhour", "rss", "rchar",
+                                        "wchar"] if x in metrics)
+
+        if "realtime" in metrics:
+            self._update_realtime(metrics["realtime"], 1)
+            if metrics["good"]:
+                self.runtime_sketch.add(metrics["realtime"])
+
+        if "cpuhour" in metrics:
+            self.cpuhour += metrics["cpuhour"]
+
+        rss = metrics.get("rss")
+        if rss is not None:
+            self.rss_counts[rss] = self.rss_counts.get(rss, 0) + 1
+            self.max_rss = rss if self.max_rss is None else \
+                max(self.max_rss, rss)
+
+        for i in ["rchar", "wchar"]:
+            if metrics.get(i) is not None:
+                self.sums[i] += metrics[i]
+                self.counts[i] += 1
+
+        tag = metrics["tag"]
+        if metrics.get("cpu_warning"):
+            self.cpu_warnings[tag] = metrics["cpu_warning"]
+        if metrics.get("mem_warning"):
+            self.mem_warnings[tag] = metrics["mem_warning"]
+
+    def remove(self, metrics):
+        """Removes the metrics of a trace entry that was previously added.
+
+        The real time quantiles are not affected.
+
+        Parameters
+        ----------
+        metrics : dict
+            Parsed metrics of the trace entry.
+        """
+
+        self._summary = None
+        self.version = next(self._versions)
+        self.count -= 1
+
+        if metrics["good"]:
+            self.completed -= 1
+
+        if "realtime" in metrics:
+            self._update_realtime(metrics["realtime"], -1)
+
+        if "cpuhour" in metrics:
+            self.cpuhour -= metrics["cpuhour"]
+
+        rss = metrics.get("rss")
+        if rss is not None and rss in self.rss_counts:
+            self.rss_counts[rss] -= 1
+            if not self.rss_counts[rss]:
+                del self.rss_counts[rss]
+                if rss == self.max_rss:
+                    self.max_rss = max(self.rss_counts) \
+                        if self.rss_counts else None
+
+        for i in ["rchar", "wchar"]:
+            if metrics.get(i) is not None:
+                self.sums[i] -= metrics[i]
+                self.counts[i] -= 1
+
+        self.cpu_warnings.pop(metrics["tag"], None)
+        self.mem_warnings.pop(metrics["tag"], None)
+
+    def _average_size(self, column):
+
+        if column not in self.columns:
+            return "-"
+        if not self.counts[column]:
+            return "-"
+        return size_compress(
+            round(self.sums[column] / self.counts[column]))
+
+    def summary(self):
+        """Returns the formatted statistics of the process.
+
+        The dictionary is cached until the statistics change.
+
+        Returns
+        -------
+        dict
+            Formatted statistics with the 'completed', 'realtime',
+            'realtime_p50', 'realtime_p95', 'cpuhour', 'maxmem', 'avgread',
+            'avgwrite', 'cpu_warnings' and 'mem_warnings' keys.
+        """
+
+        if self._summary:
+            return self._summary
+
+        inst = {"completed": "{}".format(self.completed)}
+
+        if "realtime" in self.columns and self.count:
+            inst["realtime"] = strftime('%H:%M:%S', gmtime(
+                round(self.realtime_mean, 1)))
+        else:
+            inst["realtime"] = "-"
+
+        for key, q in [("realtime_p50", 0.5), ("realtime_p95", 0.95)]:
+            value = self.runtime_sketch.quantile(q)
+            inst[key] = "-" if value is None else \
+                strftime('%H:%M:%S', gmtime(round(value)))
+
+        inst["cpuhour"] = round(self.cpuhour, 2) if \
+            "cpuhour" in self.columns else "-"
+
+        inst["cpu_warnings"] = self.cpu_warnings
+        inst["mem_warnings"] = self.mem_warnings
+
+        inst["maxmem"] = size_compress(round(self.max_rss)) if \
+            self.max_rss is not None else "-"
+        inst["avgread"] = self._average_size("rchar")
+        inst["avgwrite"] = self._average_size("wchar")
+
+        self._summary = inst
+
+        return inst
+
+
+class TraceColumns:
+    """Compact columnar store of the trace entries of a single process.
+
+    The numeric fields of each entry are parsed only once, when the entry
+    is added, and stored in typed arrays, with NaN when the value is not
+    available. The tag and status of each entry are stored as indexes to
+    tables of interned strings, so that each distinct string is kept only
+    once.
+    """
+
+    NUMERIC_COLUMNS = ["realtime", "cpus", "%cpu", "rss", "memory", "rchar",
+                       "wchar"]
+    """
+    list: Numeric trace columns that are stored. The 'realtime' is in
+    seconds and the sizes are in megabytes.
+    """
+
+    def __init__(self):
+
+        self.columns = dict((x, array("d")) for x in self.NUMERIC_COLUMNS)
+        """
+        dict: Maps each numeric column to its array of values.
+        """
+
+        self.present = set()
+        """
+        set: Numeric columns that are present in the trace file.
+        """
+
+        self.tag_ids = array("I")
+        self.status_ids = array("B")
+        """
+        array: Indexes of the tag and status of each entry in the
+        :attr:`tags` and :attr:`statuses` tables.
+        """
+
+        self.tags = []
+        self.statuses = []
+        self._tag_index = {}
+        self._status_index = {}
+
+    def __len__(self):
+        return len(self.tag_ids)
+
+    @staticmethod
+    def _intern(value, table, index):
+        """Returns the index of a string in a table, adding it when it is
+        not present."""
+
+        try:
+            return index[value]
+        except KeyError:
+            index[value] = len(table)
+            table.append(sys.intern(value))
+            return index[value]
+
+    def append(self, tag, status, values):
+        """Adds a trace entry to the store.
+
+        Parameters
+        ----------
+        tag : str
+            Tag of the task.
+        status : str
+            Trace status of the task (e.g.: 'COMPLETED').
+        values : dict
+            Parsed values of the numeric columns that are present in the
+            trace file.
+
+        Returns
+        -------
+        int
+            Index of the new entry.
+        """
+
+        self.tag_ids.append(self._intern(tag, self.tags, self._tag_index))
+        self.status_ids.append(
+            self._intern(status, self.statuses, self._status_index))
+
+        self.present.update(values)
+        for column, values_array in self.columns.items():
+            values_array.append(values.get(column, NAN))
+
+        return len(self) - 1
+
+    def row(self, i):
+        """Returns a trace entry.
+
+        Parameters
+        ----------
+        i : int
+            Index of the entry.
+
+        Returns
+        -------
+        dict
+            The tag, status and values of the numeric columns that are
+            present in the trace file (None when not available).
+        """
+
+        row = {"tag": self.tags[self.tag_ids[i]],
+               "status": self.statuses[self.status_ids[i]]}
+
+        for column in self.present:
+            value = self.columns[column][i]
+            row[column] = None if math.isnan(value) else value
+
+        return row
+
+    def get_state(self):
+        """Returns the JSON serializable state of the store. The arrays are
+        encoded in base64."""
+
+        def encode(values):
+            return base64.b64encode(values.tobytes()).decode("ascii")
+
+        return {
+            "byteorder": sys.byteorder,
+            "columns": dict((k, encode(v)) for k, v in self.columns.items()),
+            "present": list(self.present),
+            "tag_ids": encode(self.tag_ids),
+            "status_ids": encode(self.status_ids),
+            "tags": self.tags,
+            "statuses": self.statuses
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Creates a store from a state retrieved by :func:`get_state`."""
+
+        swap = state["byteorder"] != sys.byteorder
+
+        def decode(values, data):
+            values.frombytes(base64.b64decode(data))
+            if swap:
+                values.byteswap()
+
+        store = cls()
+        for k, v in state["columns"].items():
+            decode(store.columns[k], v)
+        decode(store.tag_ids, state["tag_ids"])
+        decode(store.status_ids, state["status_ids"])
+        store.present = set(state["present"])
+        for tag in state["tags"]:
+            store._intern(tag, store.tags, store._tag_index)
+        for status in state["statuses"]:
+            store._intern(status, store.statuses, store._status_index)
+
+        return store
+
+    def nbytes(self):
+        """Returns the size in bytes of the arrays of the store."""
+
+        return sum(x.itemsize * len(x) for x in
+                   list(self.columns.values()) +
+                   [self.tag_ids, self.status_ids])
+
+
+class TagInfo:
+    """Information of a process/tag that is displayed by the inspection
+    views.
+
+    It uses ``__slots__`` since one object is kept for each process/tag of
+    the pipeline.
+
+    Parameters
+    ----------
+    workdir : str
+        Work directory of the task.
+    start : str
+        Start time of the task.
+    """
+
+    __slots__ = ["workdir", "start", "realtime", "rss", "rchar", "wchar",
+                 "log"]
+
+    OPTIONAL = ["realtime", "rss", "rchar", "wchar", "log"]
+    """
+    list: Fields that are only available after the task appears in the
+    trace file.
+    """
+
+    def __init__(self, workdir, start):
+
+        self.workdir = workdir
+        self.start = start
+        self.realtime = None
+        self.rss = None
+        self.rchar = None
+        self.wchar = None
+        self.log = None
+
+    @classmethod
+    def from_dict(cls, info):
+        """Creates the tag information from a dictionary retrieved by
+        :func:`as_dict`."""
+
+        tag_info = cls(info["workdir"], info["start"])
+        for field in cls.OPTIONAL:
+            setattr(tag_info, field, info.get(field))
+
+        return tag_info
+
+    def as_dict(self):
+        """Returns the available fields as a dictionary."""
+
+        info = {"workdir": self.workdir, "start": self.start}
+        for field in self.OPTIONAL:
+            value = getattr(self, field)
+            if value is not None:
+                info[field] = value
+
+        return info
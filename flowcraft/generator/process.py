@@ -195,6 +195,11 @@ class Process:
         for a secondary channel. Each dictionary should contain at least
         two key/vals:
         ``{"link": <link string>, "alias":<string for template>}``
+
+        Links with an ``"optional": True`` key/val do not require a
+        corresponding link start. Whether they were linked is available in
+        the template under the alias name (See
+        :func:`Process.set_link_context`).
         """
 
         self.status_channels = ["STATUS_{}".format(template)]
@@ -566,6 +571,27 @@ class Process:
         logger.debug("Setting forks attribute to: {}".format(self.forks))
         self._context = {**self._context, **{"forks": "\n".join(self.forks)}}
 
+    def set_link_context(self, alias, linked):
+        """Sets whether an optional secondary channel is linked to the
+        process
+
+        The template receives a boolean variable with the alias of the
+        secondary channel, so that it only uses the channel when it exists::
+
+            {% if SIDE_channel %}
+            ...
+            {% endif %}
+
+        Parameters
+        ----------
+        alias : str
+            Alias of the secondary channel in the template.
+        linked : bool
+            True if the secondary channel is linked to a link start.
+        """
+
+        self._context = {**self._context, alias: linked}
+
     def update_attributes(self, attr_dict):
         """Updates the directives attribute from a dictionary object.
 
@@ -1,26 +1,41 @@
 import os
 import re
 import sys
+import zlib
 import json
 import uuid
 import signal
 import socket
+import time
 import hashlib
 import logging
-import requests
+import threading
 
-from os.path import join, abspath
+from os.path import join, abspath, dirname
 from time import sleep
-from pympler.asizeof import asizeof
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import generator.error_handling as eh
     from generator.process_details import colored_print
-    from generator.utils import get_nextflow_filepath
+    from generator.utils import get_nextflow_filepath, WorkdirResolver
+    from generator.watcher import FileWatcher
+    from generator.transport import HttpTransport, EncodedPayload
+    from generator.tail import FileTail
+    from generator.checkpoint import file_identity, identity_matches, \
+        read_checkpoint, write_checkpoint
 except ImportError:
     import flowcraft.generator.error_handling as eh
     from flowcraft.generator.process_details import colored_print
-    from flowcraft.generator.utils import get_nextflow_filepath
+    from flowcraft.generator.utils import get_nextflow_filepath, \
+        WorkdirResolver
+    from flowcraft.generator.watcher import FileWatcher
+    from flowcraft.generator.transport import HttpTransport, \
+        EncodedPayload
+    from flowcraft.generator.tail import FileTail
+    from flowcraft.generator.checkpoint import file_identity, \
+        identity_matches, read_checkpoint, write_checkpoint
 
 logger = logging.getLogger("main.{}".format(__name__))
 
@@ -34,10 +49,112 @@ def signal_handler():
     sys.exit(0)
 
 
+class ReportBatch:
+    """Body of a PUT request with a batch of report JSON files.
+
+    The raw contents of the report files are written directly into a gzip
+    compressed JSON body as they are added, so that the reports are neither
+    serialized again nor kept uncompressed in memory.
+
+    Parameters
+    ----------
+    run_id : str
+        Hash of the report JSON as retrieved from
+        :func:`FlowcraftReport._get_report_id`
+    status : str
+        Status of the pipeline execution.
+    """
+
+    def __init__(self, run_id, status):
+
+        self.size = 0
+        """
+        int: Size in bytes of the uncompressed body.
+        """
+
+        self.sent = {}
+        """
+        dict: Paths and md5 hashes of the report JSON files in the batch.
+        """
+
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        self._parts = []
+
+        self._write('{{"run_id": {}, "status": {}, "report_json": ['.format(
+            json.dumps(run_id), json.dumps(status)).encode("utf8"))
+
+    def _write(self, data):
+
+        self.size += len(data)
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self._parts.append(compressed)
+
+    def add(self, path, content_hash, content):
+        """Adds the contents of a report JSON file to the batch.
+
+        Parameters
+        ----------
+        path : str
+            Path to the report JSON file.
+        content_hash : str
+            md5 hash of the report JSON file.
+        content : bytes
+            Contents of the report JSON file.
+        """
+
+        if self.sent:
+            self._write(b",")
+        self._write(content)
+        self.sent[path] = content_hash
+
+    def finish(self):
+        """Closes the body of the batch.
+
+        Returns
+        -------
+        :class:`~flowcraft.generator.transport.EncodedPayload`
+            Compressed body of the request.
+        """
+
+        self._write(b"]}")
+        self._parts.append(self._compressor.flush())
+
+        return EncodedPayload(b"".join(self._parts), True, self.size)
+
+
 class FlowcraftReport:
 
+    STATE_FILE = ".report_watch_state.json.gz"
+    """
+    str: Name of the file, in the directory of the trace file, where the
+    state of the watch mode is saved.
+    """
+
+    STATE_INTERVAL = 60
+    """
+    int: Minimum interval in seconds between saves of the watch mode state.
+    """
+
+    MAX_BATCH_BYTES = 4 * 1024 * 1024
+    """
+    int: Maximum size in bytes of the uncompressed report JSON files sent in
+    the same request. Larger reports are sent alone.
+    """
+
+    READ_WORKERS = 4
+    """
+    int: Number of threads reading the report JSON files ahead of the
+    upload.
+    """
+
+    READ_AHEAD = 64
+    """
+    int: Maximum number of report directories read ahead of the upload.
+    """
+
     def __init__(self, report_file, trace_file=None, log_file=None,
-                 watch=False, ip_addr=None):
+                 watch=False, ip_addr=None, checkpoint=True, max_uploads=4):
 
         self.report_file = report_file
         """
@@ -55,7 +172,23 @@ class FlowcraftReport:
         self.broadcast_address = "{}reports/broadcast/api/reports".format(
             self.app_address)
 
+        self.transport = HttpTransport(workers=max_uploads)
+        """
+        :class:`~flowcraft.generator.transport.HttpTransport`: Transport
+        used to send the reports to the flowcraft service, with up to
+        ``max_uploads`` requests in flight.
+        """
+
+        self._sent_status = None
+        """
+        str: Pipeline status sent with the last batch of reports.
+        """
+
         self.refresh_rate = 1
+        """
+        float: Frequency (in seconds) that the trace and log files are checked
+        for changes in watch mode when file system events are not available.
+        """
 
         self.send = True
         """
@@ -78,10 +211,11 @@ class FlowcraftReport:
         str: Path to .nextflow.log file.
         """
 
-        self.log_sizestamp = None
+        self.log_tail = FileTail(log_file) if log_file else None
         """
-        str: Stores the sizestamp of the last modification of the trace file.
-        This is used to parse the file only when it has changed.
+        :class:`~flowcraft.generator.tail.FileTail`: Incremental reader of
+        the nextflow log file. Only the lines appended since the last parsing
+        are searched for the signatures of the pipeline status.
         """
 
         self.status_info = None
@@ -95,10 +229,18 @@ class FlowcraftReport:
         str: Path to nextflow trace file.
         """
 
-        self.trace_sizestamp = None
+        self.trace_tail = FileTail(trace_file) if trace_file else None
         """
-        str: Stores the sizestamp of the last modification of the trace file.
-        This is used to parse the file only when it has changed.
+        :class:`~flowcraft.generator.tail.FileTail`: Incremental reader of
+        the trace file. Only the lines appended since the last parsing are
+        read in each update.
+        """
+
+        self.trace_header = None
+        """
+        dict: Mapping of the trace column IDs to their position. It is set
+        when the header of the trace file is read and reset when the trace
+        file is replaced.
         """
 
         self.trace_retry = 0
@@ -108,19 +250,70 @@ class FlowcraftReport:
         does it raises a FileNotFoundError.
         """
 
-        self.stored_ids = []
+        self.stored_ids = set()
         """
-        list: Stores the task_ids that have already been parsed. It is used
-        to skip them when parsing the trace files multiple times.
+        set: Stores the task_ids of the current trace file that have already
+        been parsed. It is used to skip duplicate trace entries.
         """
 
         self.report_queue = []
         """
-        list: Stores the paths of the report JSON files that are on queue to
+        list: Stores the paths of the report directories that are on queue to
         be sent to the flowcraft service. This list will be emptied when these
         JSONs are sent.
         """
 
+        self.sent_reports = {}
+        """
+        dict: Ledger of the report JSON files that were accepted by the
+        flowcraft service, mapping their path to the md5 hash of the content
+        that was sent. Reports are only sent again when their content
+        changes.
+        """
+
+        self.unsent_reports = {}
+        """
+        dict: Report JSON files of the batches that are on queue of the
+        transport, mapping their path to the md5 hash of their content.
+        They are moved to :attr:`sent_reports` when the service accepts
+        them.
+        """
+
+        self.failed_reports = []
+        """
+        list: Paths of the report directories with batches that the service
+        did not accept. They are put back on the :attr:`report_queue` by
+        :func:`_requeue_failed_reports`.
+        """
+
+        self._sent_lock = threading.Lock()
+        """
+        :class:`threading.Lock`: Guards :attr:`sent_reports`,
+        :attr:`unsent_reports` and :attr:`failed_reports`, which are
+        updated from the background thread of the transport.
+        """
+
+        self.state_file = join(dirname(abspath(trace_file)),
+                               self.STATE_FILE) \
+            if watch and trace_file and checkpoint else None
+        """
+        str: Path to the file with the state of the watch mode (trace and
+        log cursors and the ledger of sent reports), so that a restarted
+        watch resumes where it stopped. None when the state is not saved.
+        """
+
+        self._last_state = 0
+        """
+        float: Time of the last save of the watch mode state.
+        """
+
+        self.workdir_resolver = WorkdirResolver()
+        """
+        :class:`~flowcraft.generator.utils.WorkdirResolver`: Resolves the
+        abbreviated task hashes into their work directories, caching the
+        listing of the work directory buckets.
+        """
+
         # Checks if report file is available
         self._check_required_files()
 
@@ -152,8 +345,7 @@ class FlowcraftReport:
             (x.strip(), pos) for pos, x in enumerate(header.split("\t"))
         )
 
-    @staticmethod
-    def _expand_path(hash_str):
+    def _expand_path(self, hash_str, workdir=None):
         """Expands the hash string of a process (ae/1dasjdm) into a full
         working directory
 
@@ -161,6 +353,9 @@ class FlowcraftReport:
         ----------
         hash_str : str
             Nextflow process hash with the beggining of the work directory
+        workdir : str, optional
+            Full working directory, when available from the ``workdir``
+            field of the trace file.
 
         Returns
         -------
@@ -168,15 +363,7 @@ class FlowcraftReport:
             Path to working directory of the hash string
         """
 
-        try:
-            first_hash, second_hash = hash_str.split("/")
-            first_hash_path = join(abspath("work"), first_hash)
-
-            for l in os.listdir(first_hash_path):
-                if l.startswith(second_hash):
-                    return join(first_hash_path, l)
-        except FileNotFoundError:
-            return None
+        return self.workdir_resolver.resolve(hash_str, workdir)
 
     def _get_report_id(self):
         """Returns a hash of the reports JSON file
@@ -218,93 +405,348 @@ class FlowcraftReport:
 
     def _update_pipeline_status(self):
         """
-        Parses the .nextflow.log file for signatures of pipeline status and sets
-        the :attr:`status_info` attribute.
+        Parses the new lines of the .nextflow.log file for signatures of
+        pipeline status and sets the :attr:`status_info` attribute.
         """
 
         prev_status = self.status_info
 
-        with open(self.log_file) as fh:
+        lines = self.log_tail.readlines()
 
-            for line in fh:
+        # A new log file means a new (resumed) execution
+        if self.log_tail.rotated or self.status_info is None:
+            self.status_info = "running"
+
+        if self.status_info == "running":
+            for line in lines:
 
                 if "Session aborted" in line:
                     self.status_info = "aborted"
-                    self.send = True if prev_status != self.status_info \
-                        else self.send
-                    return
+                    break
 
                 if "Execution complete -- Goodbye" in line:
                     self.status_info = "complete"
-                    self.send = True if prev_status != self.status_info \
-                        else self.send
-                    return
+                    break
 
-            self.status_info = "running"
-            self.send = True if prev_status != self.status_info \
-                else self.send
+        self.send = True if prev_status != self.status_info else self.send
 
     def update_trace_watch(self):
-        """Parses the nextflow trace file and retrieves the path of report JSON
-        files that have not been sent to the service yet.
+        """Parses the new lines of the nextflow trace file and retrieves the
+        path of report JSON files that have not been sent to the service yet.
         """
 
-        # Check the size stamp of the tracefile. Only proceed with the parsing
-        # if it changed from the previous size.
-        size_stamp = os.path.getsize(self.trace_file)
+        lines = self.trace_tail.readlines()
         self.trace_retry = 0
-        if size_stamp and size_stamp == self.trace_sizestamp:
-            return
-        else:
-            logger.debug("Updating trace size stamp to: {}".format(size_stamp))
-            self.trace_sizestamp = size_stamp
 
-        with open(self.trace_file) as fh:
+        # The trace file was replaced (e.g.: resumed pipeline). Its task ids
+        # start again, while the reports that were already sent are skipped
+        # by the ledger
+        if self.trace_tail.rotated:
+            self.trace_header = None
+            self.stored_ids = set()
 
-            # Skip potential empty lines at the start of file
-            header = next(fh).strip()
-            while not header:
-                header = next(fh).strip()
+        if lines:
+            logger.debug("Parsing {} new trace lines".format(len(lines)))
 
-            # Get header mappings before parsing the file
-            hm = self._header_mapping(header)
+        report_entries = []
+        for line in lines:
+            # Skip empty lines
+            if line.strip() == "":
+                continue
 
-            for line in fh:
-                # Skip empty lines
-                if line.strip() == "":
-                    continue
+            # Get header mappings before parsing the entries
+            if self.trace_header is None:
+                self.trace_header = self._header_mapping(line.strip())
+                continue
 
-                fields = line.strip().split("\t")
+            hm = self.trace_header
+            fields = line.strip().split("\t")
 
-                # Skip if task ID was already processes
-                if fields[hm["task_id"]] in self.stored_ids:
-                    continue
+            # Skip if task ID was already processes
+            if fields[hm["task_id"]] in self.stored_ids:
+                continue
+
+            if fields[hm["process"]] == "report":
+                report_entries.append(fields)
 
-                if fields[hm["process"]] == "report":
-                    self.report_queue.append(
-                        self._expand_path(fields[hm["hash"]])
-                    )
-                    self.send = True
+            # Add the processed trace line to the stored ids. It will be
+            # skipped in future parsers
+            self.stored_ids.add(fields[hm["task_id"]])
 
-                # Add the processed trace line to the stored ids. It will be
-                # skipped in future parsers
-                self.stored_ids.append(fields[hm["task_id"]])
+        if not report_entries:
+            return
+
+        hm = self.trace_header
+
+        # Read the listing of each work directory bucket of the new reports
+        # only once, unless the full work directories are in the trace file.
+        if "workdir" not in hm:
+            self.workdir_resolver.prefetch(
+                fields[hm["hash"]] for fields in report_entries)
+
+        for fields in report_entries:
+            self.report_queue.append(self._expand_path(
+                fields[hm["hash"]],
+                fields[hm["workdir"]] if "workdir" in hm else None))
+            self.send = True
 
     def update_log_watch(self):
         """Parses nextflow log file and updates the run status
         """
 
-        # Check the size stamp of the tracefile. Only proceed with the parsing
-        # if it changed from the previous size.
-        size_stamp = os.path.getsize(self.log_file)
-        self.trace_retry = 0
-        if size_stamp and size_stamp == self.log_sizestamp:
+        self._update_pipeline_status()
+
+    def _get_state(self, report_id):
+        """Returns the state of the watch mode that is saved by
+        :func:`save_state`.
+
+        Parameters
+        ----------
+        report_id : str
+            Hash of the report JSON as retrieved from :func:`~_get_report_hash`
+        """
+
+        # The reports that were not accepted yet are sent again by a
+        # resumed watch, since the trace cursor is already past them
+        with self._sent_lock:
+            sent_reports = dict(self.sent_reports)
+            pending = self.report_queue + self.failed_reports + \
+                [dirname(x) for x in self.unsent_reports]
+
+        return {
+            "report_id": report_id,
+            "trace": file_identity(self.trace_file, self.trace_tail.offset),
+            "log": file_identity(self.log_file, self.log_tail.offset),
+            "trace_header": self.trace_header,
+            "stored_ids": list(self.stored_ids),
+            "status_info": self.status_info,
+            "sent_reports": sent_reports,
+            "report_queue": list(OrderedDict.fromkeys(pending))
+        }
+
+    def load_state(self, report_id):
+        """Restores the state of a previous watch of the same run.
+
+        The ledger of sent reports is always restored, while the trace and
+        log cursors are only restored when the files were not replaced in
+        the meantime.
+
+        Parameters
+        ----------
+        report_id : str
+            Hash of the report JSON as retrieved from :func:`~_get_report_hash`
+
+        Returns
+        -------
+        bool
+            True if a state was restored.
+        """
+
+        if not self.state_file:
+            return False
+
+        state = read_checkpoint(self.state_file)
+        if not state or state.get("report_id") != report_id:
+            return False
+
+        self.sent_reports = state["sent_reports"]
+
+        if identity_matches(self.trace_file, state["trace"]):
+            self.trace_tail.offset = state["trace"]["offset"]
+            self.trace_tail.inode = (state["trace"]["dev"],
+                                     state["trace"]["ino"])
+            self.trace_header = state["trace_header"]
+            self.stored_ids = set(state["stored_ids"])
+            self.report_queue = state.get("report_queue", [])
+            self.send = self.send or bool(self.report_queue)
+
+        if identity_matches(self.log_file, state["log"]):
+            self.log_tail.offset = state["log"]["offset"]
+            self.log_tail.inode = (state["log"]["dev"], state["log"]["ino"])
+            self.status_info = state["status_info"]
+
+        logger.debug("Resuming watch with {} sent reports".format(
+            len(self.sent_reports)))
+
+        return True
+
+    def save_state(self, report_id, force=False):
+        """Saves the state of the watch mode to :attr:`state_file`, at most
+        once every :attr:`STATE_INTERVAL` seconds unless ``force`` is set.
+
+        Parameters
+        ----------
+        report_id : str
+            Hash of the report JSON as retrieved from :func:`~_get_report_hash`
+        force : bool
+            If True, saves the state regardless of the last save.
+        """
+
+        if not self.state_file:
             return
-        else:
-            logger.debug("Updating log size stamp to: {}".format(size_stamp))
-            self.log_sizestamp = size_stamp
 
-        self._update_pipeline_status()
+        if not force and time.time() - self._last_state < self.STATE_INTERVAL:
+            return
+
+        try:
+            state = self._get_state(report_id)
+        except OSError:
+            return
+
+        if write_checkpoint(self.state_file, state):
+            self._last_state = time.time()
+
+    def _read_report(self, report):
+        """Reads the report JSON files of a report directory that were not
+        already sent with the same content.
+
+        A report directory has one report JSON file for each report of the
+        batch of the ``report`` process.
+
+        Parameters
+        ----------
+        report : str
+            Path to the work directory of a report process.
+
+        Returns
+        -------
+        list
+            Path, md5 hash and contents of each report JSON file that was
+            not sent yet. Invalid JSON files are skipped.
+        """
+
+        try:
+            report_files = sorted(x for x in os.listdir(report)
+                                  if x.endswith("_report.json"))
+        except OSError:
+            return []
+
+        reports = []
+        for report_file in report_files:
+
+            path = join(report, report_file)
+            with open(path, "rb") as fh:
+                content = fh.read()
+
+            content_hash = hashlib.md5(content).hexdigest()
+            with self._sent_lock:
+                if self.sent_reports.get(path) == content_hash:
+                    continue
+
+            # The contents are sent as they are, so invalid files would
+            # break the whole batch
+            try:
+                json.loads(content.decode("utf8"))
+            except ValueError:
+                logger.warning(colored_print(
+                    "WARNING: Skipping invalid report JSON file: {}".format(
+                        path), "red_bold"))
+                continue
+
+            reports.append((path, content_hash, content))
+
+        return reports
+
+    def _read_reports(self):
+        """Yields the reports of the :attr:`report_queue`, in order, as
+        retrieved by :func:`_read_report`. The report directories are read
+        by a pool of threads, up to :attr:`READ_AHEAD` directories ahead of
+        the consumer.
+        """
+
+        with ThreadPoolExecutor(self.READ_WORKERS) as pool:
+
+            pending = deque()
+            for report in self.report_queue:
+                pending.append(pool.submit(self._read_report, report))
+                if len(pending) >= self.READ_AHEAD:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+    def _send_batch(self, batch):
+        """Adds a batch of reports to the queue of the transport, which sends
+        it in the background.
+
+        Parameters
+        ----------
+        batch : :class:`ReportBatch`
+            Batch of reports.
+        """
+
+        sent = batch.sent
+        with self._sent_lock:
+            self.unsent_reports.update(sent)
+        self.transport.send(
+            "PUT", self.broadcast_address, batch.finish(),
+            callback=lambda r, _: self._reports_sent(r, sent))
+
+    def _log_upload_stats(self):
+        """Logs the number of requests sent to the flowcraft service, the
+        volume of data and the latency of the requests."""
+
+        stats = self.transport.stats
+        if not stats["requests"]:
+            return
+
+        mb = 1024 * 1024
+        logger.info(
+            "Sent {} requests ({} failed, {} retries) with {}MB of reports "
+            "({}MB compressed). Latency: {}s mean, {}s max. Throughput: "
+            "{}MB/s per request".format(
+                stats["requests"], stats["failed"], stats["retries"],
+                round(stats["raw_bytes"] / mb, 2),
+                round(stats["bytes"] / mb, 2),
+                round(stats["latency"] / stats["requests"], 3),
+                round(stats["max_latency"], 3),
+                round(stats["raw_bytes"] / mb /
+                      max(stats["latency"], 1e-6), 2)))
+
+    def _reports_sent(self, response, sent):
+        """Callback of the transport that adds the reports of a batch to
+        the ledger when the service accepted them, or otherwise adds their
+        report directories to :attr:`failed_reports` so that they are sent
+        again.
+
+        Parameters
+        ----------
+        response : :class:`requests.Response` or None
+            Response of the service.
+        sent : dict
+            Paths and md5 hashes of the report JSON files of the batch.
+        """
+
+        failed = response is None or response.status_code >= 400
+
+        with self._sent_lock:
+            for path in sent:
+                self.unsent_reports.pop(path, None)
+            if failed:
+                self.failed_reports.extend(
+                    x for x in OrderedDict.fromkeys(map(dirname, sent))
+                    if x not in self.failed_reports)
+            else:
+                self.sent_reports.update(sent)
+
+        if failed:
+            logger.warning(colored_print(
+                "WARNING: {} reports were not accepted by the server and "
+                "will be sent again".format(len(sent)), "red_bold"))
+
+    def _requeue_failed_reports(self):
+        """Puts the report directories of :attr:`failed_reports` back on
+        the :attr:`report_queue`, and sets :attr:`send` when there are any.
+        """
+
+        with self._sent_lock:
+            failed, self.failed_reports = self.failed_reports, []
+
+        for report in failed:
+            if report not in self.report_queue:
+                self.report_queue.append(report)
+        if failed:
+            self.send = True
 
     def _send_live_report(self, report_id):
         """Sends a PUT request with the report JSON files currently in the
@@ -316,64 +758,49 @@ class FlowcraftReport:
             Hash of the report JSON as retrieved from :func:`~_get_report_hash`
         """
 
-        # Determines the maximum number of reports sent at the same time in
-        # the same payload
-        buffer_size = 100
-        logger.debug("Report buffer size set to: {}".format(buffer_size))
+        # Batches may be sent in parallel, so the batches with a previous
+        # pipeline status must be sent before those with a new status
+        if self.status_info != self._sent_status:
+            self.transport.flush()
+            self._sent_status = self.status_info
 
-        for i in range(0, len(self.report_queue), buffer_size):
+        batches = 0
+        batch = None
 
-            # Reset the report compilation batch
-            reports_compilation = []
+        for path, content_hash, content in self._read_reports():
 
-            # Iterate over report JSON batches determined by buffer_size
-            for report in self.report_queue[i: i + buffer_size]:
-                try:
-                    report_file = [x for x in os.listdir(report)
-                                   if x.endswith(".json")][0]
-                except IndexError:
-                    continue
-                with open(join(report, report_file)) as fh:
-                    reports_compilation.append(json.loads(fh.read()))
+            # Send the current batch when the new report does not fit
+            if batch and batch.size + len(content) > self.MAX_BATCH_BYTES:
+                self._send_batch(batch)
+                batches += 1
+                batch = None
 
-            logger.debug("Payload sent with size: {}".format(
-                asizeof(json.dumps(reports_compilation))
-            ))
-            logger.debug("status: {}".format(self.status_info))
+            if not batch:
+                batch = ReportBatch(report_id, self.status_info)
+            batch.add(path, content_hash, content)
 
-            try:
-                requests.put(
-                    self.broadcast_address,
-                    json={"run_id": report_id,
-                          "report_json": reports_compilation,
-                          "status": self.status_info}
-                )
-            except requests.exceptions.ConnectionError:
-                logger.error(colored_print(
-                    "ERROR: Could not establish connection with server. The server"
-                    " may be down or there is a problem with your internet "
-                    "connection.", "red_bold"))
-                sys.exit(1)
+        if batch:
+            self._send_batch(batch)
+            batches += 1
+
+        logger.debug("Sent {} report batches with status: {}".format(
+            batches, self.status_info))
 
         # When there is no change in the report queue, but there is a change
         # in the run status of the pipeline
-        if not self.report_queue:
+        if not batches:
 
             logger.debug("status: {}".format(self.status_info))
 
-            try:
-                requests.put(
-                    self.broadcast_address,
-                    json={"run_id": report_id,
-                          "report_json": [],
-                          "status": self.status_info}
-                )
-            except requests.exceptions.ConnectionError:
-                logger.error(colored_print(
-                    "ERROR: Could not establish connection with server. The"
-                    " server may be down or there is a problem with your "
-                    "internet connection.", "red_bold"))
-                sys.exit(1)
+            # Only the latest run status is sent if the previous one is
+            # still on queue
+            self.transport.send(
+                "PUT", self.broadcast_address,
+                {"run_id": report_id,
+                 "report_json": [],
+                 "status": self.status_info},
+                key=("status", report_id)
+            )
 
         # Reset the report queue after sending the request
         self.report_queue = []
@@ -400,13 +827,12 @@ class FlowcraftReport:
             "data": {"results": metadata}
         }
 
-        try:
-            requests.post(
-                self.broadcast_address,
-                json={"run_id": report_id, "report_json": start_json,
-                      "status": self.status_info}
-            )
-        except requests.exceptions.ConnectionError:
+        r = self.transport.request(
+            "POST", self.broadcast_address,
+            {"run_id": report_id, "report_json": start_json,
+             "status": self.status_info}
+        )
+        if r is None:
             logger.error(colored_print(
                 "ERROR: Could not establish connection with server. The server"
                 " may be down or there is a problem with your internet "
@@ -426,35 +852,38 @@ class FlowcraftReport:
             "Closing connection and sending DELETE request to {}".format(
                 self.broadcast_address))
 
-        try:
-            r = requests.delete(self.broadcast_address,
-                                json={"run_id": report_id})
-            if r.status_code != 202:
-                logger.error(colored_print(
-                    "ERROR: There was a problem sending data to the server"
-                    "with reason: {}".format(r.reason)))
-        except requests.exceptions.ConnectionError:
+        # Send the pending reports before closing the connection
+        self.transport.flush(timeout=60)
+
+        r = self.transport.request("DELETE", self.broadcast_address,
+                                   {"run_id": report_id})
+        if r is None:
             logger.error(colored_print(
                 "ERROR: Could not establish connection with server. The server"
                 " may be down or there is a problem with your internet "
                 "connection.", "red_bold"))
-            sys.exit(1)
+        elif r.status_code != 202:
+            logger.error(colored_print(
+                "ERROR: There was a problem sending data to the server"
+                "with reason: {}".format(r.reason)))
+        elif self.state_file:
+            # The service discarded the reports of the run, so they must all
+            # be sent again by the next watch
+            try:
+                os.remove(self.state_file)
+            except FileNotFoundError:
+                pass
 
     def _send_report(self, report_id):
 
         with open(self.report_file) as fh:
             report_json = json.loads(fh.read())
 
-        logger.debug("Unique payload sent with size: {}".format(
-            asizeof(json.dumps(report_json))
-        ))
-
-        try:
-            requests.post(
-                self.broadcast_address,
-                json={"run_id": report_id, "report_json": report_json}
-            )
-        except requests.exceptions.ConnectionError:
+        r = self.transport.request(
+            "POST", self.broadcast_address,
+            {"run_id": report_id, "report_json": report_json}
+        )
+        if r is None:
             logger.error(colored_print(
                 "ERROR: Could not establish connection with server. The server"
                 " may be down or there is a problem with your internet "
@@ -479,6 +908,10 @@ class FlowcraftReport:
 
         # When in watch mode,
         if self.watch:
+            if self.load_state(report_hash):
+                logger.info(colored_print(
+                    "\tResuming from the previous watch of this run",
+                    "green_bold"))
             logger.info(colored_print("\tFetching pipeline run status",
                                       "green_bold"))
             self._update_pipeline_status()
@@ -493,6 +926,12 @@ class FlowcraftReport:
 
         logger.debug("Establishing connection...")
 
+        # In watch mode, the trace and log files are only parsed when they
+        # change
+        watcher = FileWatcher([self.trace_file, self.log_file],
+                              poll_interval=self.refresh_rate) \
+            if self.watch else None
+
         stay_alive = True
         _broadcast_sent = False
         try:
@@ -509,13 +948,20 @@ class FlowcraftReport:
                 if self.watch:
                     self.update_trace_watch()
                     self.update_log_watch()
+                    self._requeue_failed_reports()
                     # When new report JSON files are available, send then
                     # via a PUT request
                     if self.send:
                         self._send_live_report(report_hash)
                         self.send = False
+                    self.save_state(report_hash)
 
-                sleep(self.refresh_rate)
+                    # Block until the trace or log files change. The timeout
+                    # allows saving the state of the reports sent in the
+                    # meantime.
+                    watcher.wait(timeout=self.STATE_INTERVAL)
+                else:
+                    sleep(self.refresh_rate)
 
         except FileNotFoundError as e:
             print(e)
@@ -524,5 +970,19 @@ class FlowcraftReport:
         except Exception as e:
             logger.exception("ERROR: " + e)
         finally:
-            logger.info("Closing connection")
-            self._close_connection(report_hash)
+            if watcher:
+                watcher.close()
+                self.transport.flush(timeout=60)
+                self.save_state(report_hash, force=True)
+            # A watch that is interrupted while the pipeline is running keeps
+            # its connection and state, so that it can be resumed
+            if not self.watch or \
+                    self.status_info in ["complete", "aborted"]:
+                logger.info("Closing connection")
+                self._close_connection(report_hash)
+            else:
+                logger.info(colored_print(
+                    "Watch interrupted. Run the same command to resume it",
+                    "green_bold"))
+            self.transport.close()
+            self._log_upload_stats()
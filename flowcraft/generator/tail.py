@@ -0,0 +1,179 @@
+import io
+import os
+import logging
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class FileTail:
+    """Incremental reader of a file that is being appended to.
+
+    The reader keeps a byte offset into the file and, on each call to
+    :func:`readlines`, only returns the complete lines that were appended
+    since the previous call. A trailing line without a newline character is
+    left in the file and returned once it is complete.
+
+    Truncation of the file (its size drops below the stored offset) or its
+    replacement by a new file (the inode changes, as when nextflow rolls the
+    trace and log files on a ``-resume``) are detected and the reader starts
+    again from the beginning of the new file. When this happens, the
+    :attr:`rotated` attribute is set to True until the next call to
+    :func:`readlines`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file that will be tailed.
+    """
+
+    def __init__(self, path):
+
+        self.path = path
+        """
+        str: Path to the tailed file.
+        """
+
+        self.offset = 0
+        """
+        int: Byte offset in the file up to which complete lines have been
+        returned.
+        """
+
+        self.inode = None
+        """
+        tuple: The (device, inode) identity of the file at the time of the
+        last read. Used to detect the replacement of the file.
+        """
+
+        self.rotated = False
+        """
+        bool: Set to True when the last call to :func:`readlines` detected
+        a truncation or replacement of the file.
+        """
+
+    def reset(self):
+        """Rewinds the reader to the beginning of the file."""
+
+        self.offset = 0
+        self.inode = None
+
+    def _check_rotation(self, st):
+        """Resets the offset when the file was truncated or replaced.
+
+        Parameters
+        ----------
+        st : os.stat_result
+            Current stat of the tailed file.
+        """
+
+        identity = (st.st_dev, st.st_ino)
+
+        if self.inode is not None and identity != self.inode:
+            logger.debug("File {} was replaced. Reading from the "
+                         "start".format(self.path))
+            self.offset = 0
+            self.rotated = True
+        elif st.st_size < self.offset:
+            logger.debug("File {} was truncated. Reading from the "
+                         "start".format(self.path))
+            self.offset = 0
+            self.rotated = True
+
+        self.inode = identity
+
+    def readlines(self):
+        """Returns the complete lines appended to the file since the last
+        call.
+
+        Returns
+        -------
+        list
+            List of the new lines, decoded as strings and without the
+            trailing newline character.
+
+        Raises
+        ------
+        FileNotFoundError
+            When the tailed file does not exist.
+        """
+
+        self.rotated = False
+
+        st = os.stat(self.path)
+        self._check_rotation(st)
+
+        if st.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as fh:
+            fh.seek(self.offset)
+            chunk = fh.read(st.st_size - self.offset)
+
+        # Only consume the bytes up to the last newline. Any incomplete
+        # trailing line is left for the next read.
+        end = chunk.rfind(b"\n")
+        if end == -1:
+            return []
+
+        self.offset += end + 1
+
+        return chunk[:end].decode("utf8", errors="replace").split("\n")
+
+
+def tail_lines(path, n=None, max_bytes=None, block_size=8192, end=None):
+    """Returns the last lines of a file without reading the whole file.
+
+    The file is read backwards from its end, in blocks of ``block_size``
+    bytes, until it has ``n`` complete lines or ``max_bytes`` bytes. When
+    the excerpt does not start at the beginning of the file, its first
+    (partial) line is discarded.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    n : int, optional
+        Maximum number of lines.
+    max_bytes : int, optional
+        Maximum number of bytes read from the end of the file.
+    block_size : int
+        Number of bytes read in each backwards seek.
+    end : int, optional
+        Byte offset where the excerpt ends. By default, the end of the
+        file.
+
+    Returns
+    -------
+    list
+        Last lines of the file, decoded as strings and with their newline
+        characters, as returned by ``readlines``.
+
+    Raises
+    ------
+    FileNotFoundError
+        When the file does not exist.
+    """
+
+    with open(path, "rb") as fh:
+
+        start = fh.seek(0, os.SEEK_END) if end is None else end
+        limit = 0 if max_bytes is None else max(start - max_bytes, 0)
+        chunk = b""
+
+        while start > limit:
+            # A trailing newline does not start a new line, so n lines
+            # need at most n + 1 newline characters
+            if n is not None and chunk.count(b"\n") > n:
+                break
+            size = min(block_size, start - limit)
+            start -= size
+            fh.seek(start)
+            chunk = fh.read(size) + chunk
+
+    # Discard the partial first line
+    if start > 0:
+        chunk = chunk[chunk.find(b"\n") + 1:] if b"\n" in chunk else b""
+
+    lines = io.StringIO(chunk.decode("utf8", errors="replace")).readlines()
+
+    return lines[max(len(lines) - n, 0):] if n is not None else lines
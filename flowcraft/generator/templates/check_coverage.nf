@@ -9,7 +9,6 @@ process integrity_coverage2_{{ pid }} {
     {% include "post.txt" ignore missing %}
 
     tag { sample_id }
-    cpus 1
 
     input:
     set sample_id, file(fastq_pair) from {{ input_channel }}
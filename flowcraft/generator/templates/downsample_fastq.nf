@@ -20,7 +20,12 @@ process downsample_fastq_{{ pid }} {
     publishDir "results/downsample_fastq_{{ pid }}/", pattern: "_ss.*"
 
     input:
+    {% if SIDE_qc_sketch %}
+    set sample_id, file(fastq_pair), file(qc_sketch) from {{ input_channel }}.join(SIDE_qc_sketch_{{ pid }})
+    {% else %}
     set sample_id, file(fastq_pair) from {{ input_channel }}
+    val qc_sketch from Channel.value('')
+    {% endif %}
     val gsize from IN_genome_size_{{ pid }}
     val depth from IN_depth_{{ pid }}
     val seed from IN_seed_{{ pid }}
@@ -10,8 +10,6 @@ process integrity_coverage_{{ pid }} {
     {% include "post.txt" ignore missing %}
 
     tag { sample_id }
-    // This process can only use a single CPU
-    cpus 1
 
     input:
     set sample_id, file(fastq_pair) from {{ input_channel }}
@@ -19,7 +17,7 @@ process integrity_coverage_{{ pid }} {
     val cov from IN_min_coverage_{{ pid }}
     // This channel is for the custom options of the integrity_coverage.py
     // script. See the script's documentation for more information.
-    val opts from Channel.value('')
+    val opts from Channel.value(params.coverageSampling{{ param_id }} ? '-s' : '')
 
     output:
     set sample_id,
@@ -27,7 +25,8 @@ process integrity_coverage_{{ pid }} {
         file('*_encoding'),
         file('*_phred'),
         file('*_coverage'),
-        file('*_max_len') into MAIN_integrity_{{ pid }}
+        file('*_max_len'),
+        file('*_qc_sketch.json') into MAIN_integrity_{{ pid }}
     file('*_report') optional true into LOG_report_coverage1_{{ pid }}
     {% with task_name="integrity_coverage" %}
     {%- include "compiler_channels.txt" ignore missing -%}
@@ -50,14 +49,16 @@ MAIN_integrity_{{ pid }}.choice(LOG_corrupted_{{ pid }}, MAIN_PreCoverageCheck_{
 {{ output_channel }} = Channel.create()
 SIDE_phred_{{ pid }} = Channel.create()
 SIDE_max_len_{{ pid }} = Channel.create()
+SIDE_qc_sketch_{{ pid }} = Channel.create()
 
 MAIN_PreCoverageCheck_{{ pid }}
 // Low coverage samples have the 4th value of the Channel with 'fail'
     .filter{ it[4].text != "fail" }
 // For the channel to proceed with FastQ in 'sample_good' and the
-// Phred scores for each sample in 'SIDE_phred'
-    .separate({{ output_channel }}, SIDE_phred_{{ pid }}, SIDE_max_len_{{ pid }}){
-        a -> [ [a[0], a[1]], [a[0], a[3].text], [a[0], a[5].text]  ]
+// Phred scores for each sample in 'SIDE_phred' and the QC sketch of each
+// sample in 'SIDE_qc_sketch'
+    .separate({{ output_channel }}, SIDE_phred_{{ pid }}, SIDE_max_len_{{ pid }}, SIDE_qc_sketch_{{ pid }}){
+        a -> [ [a[0], a[1]], [a[0], a[3].text], [a[0], a[5].text], [a[0], a[6]] ]
     }
 
 /** REPORT_COVERAGE - PLUG-IN
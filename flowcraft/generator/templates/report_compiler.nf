@@ -1,24 +1,76 @@
 
+/** Buffers the items of a channel in lists of up to `size` items. A list is
+also emitted when it is not full but `interval` seconds passed since the
+last one, so that the items are not held until the end of small or slow
+runs. The remaining items are emitted when the source channel completes.
+*/
+def timedBuffer(source, size, interval) {
+
+    def target = Channel.create()
+    def batch = []
+    def timer = new Timer(true)
+
+    def flush = {
+        synchronized (batch) {
+            if (batch) {
+                target << new ArrayList(batch)
+                batch.clear()
+            }
+        }
+    }
+
+    def period = (interval as long) * 1000
+    timer.schedule({ flush() } as TimerTask, period, period)
+
+    source.subscribe onNext: {
+        synchronized (batch) {
+            batch << it
+            if (batch.size() >= size) flush()
+        }
+    }, onComplete: {
+        timer.cancel()
+        flush()
+        target << Channel.STOP
+    }
+
+    return target
+}
+
 /** Reports
-Compiles the reports from every process
+Compiles the reports from every process. The report tuples are grouped in
+batches of params.reportBatchSize, or of the reports received in the last
+params.reportFlushInterval seconds, and each batch is prepared by a single
+task.
 */
+report_batches = timedBuffer({{ compile_channels }},
+        params.reportBatchSize, params.reportFlushInterval)
+    .map { batch -> batch.transpose() }
+
 process report {
 
-    tag { sample_id }
+    tag { "${sample_ids.size()} reports" }
 
     input:
-    set sample_id,
-            task_name,
-            pid,
-            report_json,
-            version_json,
-            trace from {{ compile_channels }}
+    set val(sample_ids),
+            val(task_names),
+            val(pids),
+            file("report_json_*"),
+            file("version_json_*"),
+            file("trace_*") from report_batches
 
     output:
-    file "*" optional true into master_report
+    file "*_report.json" optional true into master_report
 
+    script:
+    // One line per report with the sample, task name and pid. The report
+    // files of each line are staged with its (1-based) index.
+    manifest = [sample_ids, task_names, pids].transpose().collect {
+        it.join("\t") }.join("\n")
     """
-    prepare_reports.py $report_json $version_json $trace $sample_id $task_name 1 $pid $workflow.scriptId $workflow.runName
+    cat > .report_manifest.tsv <<'MANIFEST'
+${manifest}
+MANIFEST
+    prepare_reports.py --batch .report_manifest.tsv $workflow.scriptId $workflow.runName
     """
 
 }
@@ -32,6 +84,26 @@ forks_channel = forkTree.exists() ?  Channel.fromPath("${workflow.projectDir}/.f
 dag_channel = forkTree.exists() ?  Channel.fromPath("${workflow.projectDir}/.treeDag.json") : Channel.value(null)
 js_channel = forkTree.exists() ?  Channel.fromPath("${workflow.projectDir}/resources/main.js.zip") : Channel.value(null)
 
+/** Merges the report JSON files in buffers of params.reportBufferSize
+reports, or of the reports received in the last params.reportFlushInterval
+seconds (one report per line), while the pipeline is running, so that the
+final compilation only has to concatenate the buffers.
+*/
+process compile_reports_buffer {
+
+    publishDir "pipeline_report/partial/", mode: "copy"
+
+    input:
+    file report from timedBuffer(master_report.flatten(), params.reportBufferSize, params.reportFlushInterval)
+
+    output:
+    file "reports_buffer_*.ndjson" into compile_reports_buffer
+
+    """
+    for r in $report; do cat \$r; echo; done > reports_buffer_${task.index}.ndjson
+    """
+}
+
 process compile_reports {
 
     publishDir "pipeline_report/", mode: "copy"
@@ -42,7 +114,7 @@ process compile_reports {
     }
 
    input:
-   file report from master_report.collect()
+   file report from compile_reports_buffer.collect()
    file forks from forks_channel
    file dag from dag_channel
    file js from js_channel
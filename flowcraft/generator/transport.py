@@ -0,0 +1,370 @@
+import gzip
+import json
+import time
+import logging
+import threading
+import requests
+
+from collections import deque
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+
+class EncodedPayload:
+    """JSON payload that was already serialized, and optionally gzip
+    compressed, by the caller (e.g.: while streaming the contents of several
+    files into a single body).
+
+    Parameters
+    ----------
+    body : bytes
+        Serialized JSON body.
+    compressed : bool
+        Whether the body is gzip compressed.
+    size : int
+        Size of the uncompressed body in bytes.
+    """
+
+    __slots__ = ("body", "compressed", "size")
+
+    def __init__(self, body, compressed, size):
+
+        self.body = body
+        self.compressed = compressed
+        self.size = size
+
+
+class HttpTransport:
+    """HTTP transport shared by the broadcast modes of flowcraft.
+
+    All requests go through a single :class:`requests.Session`, so the
+    connections to the flowcraft service are kept alive and reused. JSON
+    bodies larger than :attr:`compress_min` bytes are gzip compressed. When
+    the server rejects a compressed body, the request is repeated
+    uncompressed and compression is disabled for the remainder of the
+    session.
+
+    Requests can be sent synchronously with :func:`request`, or added to a
+    bounded queue with :func:`send`, which is consumed by a background
+    thread so that the caller never waits for the server. Queued requests
+    with the same ``key`` that were not sent yet are coalesced, either by
+    replacing the pending payload or by merging the two payloads with a
+    custom function.
+
+    Failed requests (connection errors, timeouts and 5xx responses) are
+    retried with exponential backoff.
+
+    The queue is consumed by :attr:`workers` threads, so that up to that
+    number of requests are in flight at the same time. With more than one
+    worker, requests are no longer sent in order.
+
+    The number of requests, bytes sent and their latency are accumulated in
+    :attr:`stats`.
+
+    Parameters
+    ----------
+    max_queue : int
+        Maximum number of requests waiting in the queue. When the queue is
+        full, :func:`send` blocks until there is room for the new request.
+    max_retries : int
+        Maximum number of retries of a failed request.
+    backoff : float
+        Time in seconds before the first retry. It doubles on each retry.
+    max_backoff : float
+        Maximum time in seconds between retries.
+    timeout : float
+        Timeout in seconds of each request.
+    compress_min : int
+        Minimum size in bytes of the body of a request to be compressed.
+    workers : int
+        Number of background threads sending the queued requests. At least
+        one thread is used.
+    """
+
+    def __init__(self, max_queue=1000, max_retries=5, backoff=0.5,
+                 max_backoff=30, timeout=30, compress_min=1024, workers=1):
+
+        self.session = requests.Session()
+        """
+        :class:`requests.Session`: Session with the pool of persistent
+        connections.
+        """
+
+        workers = max(1, workers)
+        adapter = HTTPAdapter(pool_connections=2,
+                              pool_maxsize=max(4, workers + 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.compress_min = compress_min
+        """
+        int: Minimum size of the request body to be compressed. None when
+        compression was disabled.
+        """
+
+        self._queue = deque()
+        """
+        deque: Pending requests. Each entry is a list with the key,
+        method, url, payload, merge function and callback of the request.
+        """
+
+        self.workers = workers
+        """
+        int: Number of background threads sending the queued requests.
+        """
+
+        self.stats = {"requests": 0, "failed": 0, "retries": 0,
+                      "bytes": 0, "raw_bytes": 0, "latency": 0.0,
+                      "max_latency": 0.0}
+        """
+        dict: Number of completed and failed requests, number of retries,
+        bytes sent (``bytes``) and their uncompressed size (``raw_bytes``),
+        and the total and maximum latency in seconds of the completed
+        requests, including retries.
+        """
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._stop = threading.Event()
+        self._workers = []
+
+    def _encode(self, payload):
+        """Serializes a payload into a JSON body, compressing it when it is
+        larger than :attr:`compress_min`.
+
+        Returns
+        -------
+        bytes
+            Request body.
+        dict
+            Request headers.
+        int
+            Size of the uncompressed body.
+        """
+
+        headers = {"Content-Type": "application/json"}
+
+        if isinstance(payload, EncodedPayload):
+            if not payload.compressed:
+                return payload.body, headers, payload.size
+            if self.compress_min is None:
+                return gzip.decompress(payload.body), headers, payload.size
+            headers["Content-Encoding"] = "gzip"
+            return payload.body, headers, payload.size
+
+        body = json.dumps(payload).encode("utf8")
+        size = len(body)
+
+        if self.compress_min is not None and len(body) >= self.compress_min:
+            compressed = gzip.compress(body, compresslevel=6)
+            logger.debug("Request body compressed from {} to {} bytes".format(
+                len(body), len(compressed)))
+            body = compressed
+            headers["Content-Encoding"] = "gzip"
+        else:
+            logger.debug("Request body with {} bytes".format(len(body)))
+
+        return body, headers, size
+
+    def request(self, method, url, payload):
+        """Sends a request and waits for the response.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method (e.g.: 'PUT').
+        url : str
+            Address of the request.
+        payload : dict or :class:`EncodedPayload`
+            JSON payload of the request.
+
+        Returns
+        -------
+        :class:`requests.Response` or None
+            Response of the server, or None if the request could not be
+            completed after :attr:`max_retries` retries.
+        """
+
+        body, headers, size = self._encode(payload)
+        start = time.time()
+
+        for attempt in range(self.max_retries + 1):
+
+            if attempt:
+                self._count(retries=1)
+                wait = min(self.backoff * 2 ** (attempt - 1),
+                           self.max_backoff)
+                logger.debug("Retrying {} request to {} in {}s".format(
+                    method, url, wait))
+                if self._stop.wait(wait):
+                    return None
+
+            try:
+                r = self.session.request(method, url, data=body,
+                                         headers=headers,
+                                         timeout=self.timeout)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                logger.debug("Request to {} failed: {}".format(url, e))
+                continue
+
+            # The server does not accept compressed bodies. Other client
+            # errors are returned, since they are not caused by the
+            # compression.
+            if "Content-Encoding" in headers and r.status_code == 415:
+                logger.debug("Disabling request compression")
+                self.compress_min = None
+                body, headers, size = self._encode(payload)
+                continue
+
+            if r.status_code >= 500:
+                logger.debug("Request to {} failed with status {}".format(
+                    url, r.status_code))
+                continue
+
+            latency = time.time() - start
+            self._count(requests=1, bytes=len(body), raw_bytes=size,
+                        latency=latency)
+            with self._cond:
+                self.stats["max_latency"] = max(self.stats["max_latency"],
+                                                latency)
+
+            return r
+
+        self._count(failed=1)
+        logger.error("Could not complete {} request to {} after {} "
+                     "retries".format(method, url, self.max_retries))
+
+        return None
+
+    def _count(self, **counts):
+        """Adds the provided counts to :attr:`stats`."""
+
+        with self._cond:
+            for k, v in counts.items():
+                self.stats[k] += v
+
+    def send(self, method, url, payload, key=None, merge=None,
+             callback=None):
+        """Adds a request to the background queue.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method (e.g.: 'PUT').
+        url : str
+            Address of the request.
+        payload : dict or :class:`EncodedPayload`
+            JSON payload of the request. It must not be modified after
+            being added to the queue.
+        key : hashable, optional
+            Coalescing key. If a request with the same key is still in the
+            queue, it is updated with the new payload instead of adding a
+            new request.
+        merge : function, optional
+            Function that receives the pending and the new payloads of a
+            coalesced request and returns the payload that is sent. By
+            default, the new payload replaces the pending one.
+        callback : function, optional
+            Function called from the background thread with the response
+            of the server (or None if the request failed) and the payload
+            that was sent.
+        """
+
+        with self._cond:
+
+            if key is not None:
+                for entry in self._queue:
+                    if entry[0] == key:
+                        entry[3] = merge(entry[3], payload) if merge \
+                            else payload
+                        entry[5] = callback
+                        return
+
+            while len(self._queue) >= self.max_queue:
+                logger.debug("Request queue is full")
+                self._cond.wait()
+
+            self._queue.append([key, method, url, payload, merge, callback])
+            self._cond.notify_all()
+
+            if len(self._workers) < self.workers:
+                worker = threading.Thread(target=self._consume, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _consume(self):
+        """Sends the queued requests, in order, until the transport is
+        closed.
+        """
+
+        while True:
+
+            with self._cond:
+                while not self._queue and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                key, method, url, payload, _, callback = \
+                    self._queue.popleft()
+                self._in_flight += 1
+                self._cond.notify_all()
+
+            try:
+                r = self.request(method, url, payload)
+                if callback:
+                    callback(r, payload)
+            except Exception:
+                logger.exception("Unexpected error sending request")
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Waits until all the queued requests were sent.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum number of seconds to wait.
+
+        Returns
+        -------
+        bool
+            True if the queue is empty.
+        """
+
+        deadline = None if timeout is None else time.time() + timeout
+
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else \
+                    deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+        return True
+
+    def close(self, timeout=None):
+        """Sends the pending requests, for at most ``timeout`` seconds, and
+        closes the connections.
+        """
+
+        if not self.flush(timeout):
+            logger.error("{} requests could not be sent".format(
+                len(self._queue)))
+
+        with self._cond:
+            self._stop.set()
+            self._cond.notify_all()
+
+        self.session.close()
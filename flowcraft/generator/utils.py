@@ -1,4 +1,9 @@
 import re
+import os
+import time
+
+from bisect import bisect_left
+from os.path import join, abspath
 
 try:
     import generator.error_handling as eh
@@ -37,3 +42,142 @@ def get_nextflow_filepath(log_file):
                 return pipeline_path
             except AttributeError:
                 continue
+
+
+class WorkdirResolver:
+    """Resolves the abbreviated hash of a nextflow task (e.g.: ae/1dasjdm)
+    into the full path of its work directory.
+
+    The listing of each bucket of the work directory (e.g.: work/ae) is
+    cached and only read again when a hash is not found and the
+    modification time of the bucket changed. When the trace file provides
+    the full work directory of the tasks (``workdir`` field), no listing is
+    needed at all.
+
+    Parameters
+    ----------
+    workdir : str
+        Path to the nextflow work directory.
+    """
+
+    MTIME_RESOLUTION = 2
+    """
+    float: Listings taken less than this number of seconds after the last
+    modification of the bucket may miss new directories on file systems with
+    coarse modification times, so they are read again when a hash is not
+    found.
+    """
+
+    def __init__(self, workdir="work"):
+
+        self.workdir = abspath(workdir)
+        """
+        str: Absolute path to the nextflow work directory.
+        """
+
+        self._buckets = {}
+        """
+        dict: Maps each bucket name to a tuple with its modification time,
+        the time of the listing and the sorted list of its entries.
+        """
+
+    def _refresh(self, bucket):
+        """Reads the listing of a bucket if it may have changed since the
+        cached listing.
+
+        Returns
+        -------
+        bool
+            True if the listing was read.
+        """
+
+        path = join(self.workdir, bucket)
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return False
+
+        cached = self._buckets.get(bucket)
+        if cached and cached[0] == mtime and \
+                cached[1] - mtime > self.MTIME_RESOLUTION:
+            return False
+
+        try:
+            entries = sorted(os.listdir(path))
+        except FileNotFoundError:
+            return False
+
+        self._buckets[bucket] = (mtime, time.time(), entries)
+
+        return True
+
+    def _lookup(self, bucket, prefix):
+        """Searches for an entry starting with ``prefix`` in the cached
+        listing of a bucket.
+        """
+
+        try:
+            entries = self._buckets[bucket][2]
+        except KeyError:
+            return None
+
+        i = bisect_left(entries, prefix)
+        if i < len(entries) and entries[i].startswith(prefix):
+            return join(self.workdir, bucket, entries[i])
+
+        return None
+
+    def prefetch(self, hashes):
+        """Updates the listings of the buckets with hashes that are not yet
+        cached, reading each bucket at most once.
+
+        Parameters
+        ----------
+        hashes : iterable
+            Abbreviated hashes of the tasks.
+        """
+
+        missing = set()
+        for hash_str in hashes:
+            try:
+                bucket, prefix = hash_str.split("/")
+            except ValueError:
+                continue
+            if bucket not in missing and not self._lookup(bucket, prefix):
+                missing.add(bucket)
+
+        for bucket in missing:
+            self._refresh(bucket)
+
+    def resolve(self, hash_str, workdir=None):
+        """Returns the work directory of a task.
+
+        Parameters
+        ----------
+        hash_str : str
+            Abbreviated hash of the task.
+        workdir : str, optional
+            Full work directory of the task, as provided by the ``workdir``
+            field of the trace file.
+
+        Returns
+        -------
+        str or None
+            Path to the work directory of the task, or None if it could
+            not be found.
+        """
+
+        if workdir and workdir != "-":
+            return workdir
+
+        try:
+            bucket, prefix = hash_str.split("/")
+        except ValueError:
+            return None
+
+        path = self._lookup(bucket, prefix)
+        if not path and self._refresh(bucket):
+            path = self._lookup(bucket, prefix)
+
+        return path
@@ -0,0 +1,314 @@
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import logging
+
+from os.path import abspath, basename, dirname
+
+logger = logging.getLogger("main.{}".format(__name__))
+
+# Event masks from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+
+EVENT_HEADER = struct.Struct("iIII")
+"""
+struct.Struct: Layout of the fixed size header of an inotify event (wd,
+mask, cookie and name length). It is followed by the name of the file,
+padded with null bytes.
+"""
+
+
+def _load_inotify():
+    """Loads the inotify functions from the C library.
+
+    Returns
+    -------
+    ctypes.CDLL or None
+        The C library with the inotify functions, or None when inotify is
+        not available (e.g.: non-Linux systems).
+    """
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                           use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    return libc
+
+
+class FileWatcher:
+    """Blocks until there is a change in a set of files or directories.
+
+    When inotify is available, the parent directories of the watched files
+    are registered with the kernel and the watcher only wakes up when one of
+    the watched files is written, created or moved into place. Bursts of
+    events are coalesced for a :attr:`debounce` window before returning.
+    Since inotify does not report changes made by other hosts on network
+    filesystems, the size and modification time of the watched files are
+    also checked every :attr:`INOTIFY_POLL_INTERVAL` seconds.
+
+    When inotify is not available, the watcher falls back to checking the
+    size and modification time of the files every :attr:`poll_interval`
+    seconds.
+
+    Parameters
+    ----------
+    files : list
+        Paths of the files that should be watched.
+    directories : list, optional
+        Paths of directories where the creation of any new entry should
+        be reported.
+    poll_interval : float
+        Interval in seconds between checks of the files stat when falling
+        back to polling.
+    debounce : float
+        Time window in seconds used to coalesce bursts of events.
+    use_inotify : bool
+        If False, always use the polling fallback.
+    """
+
+    INOTIFY_POLL_INTERVAL = 2
+    """
+    float: Interval in seconds between checks of the files stat when inotify
+    is active. These checks catch changes that inotify does not report.
+    """
+
+    def __init__(self, files, directories=None, poll_interval=1,
+                 debounce=0.05, use_inotify=True):
+
+        self.files = [abspath(x) for x in files]
+        """
+        list: Absolute paths of the watched files.
+        """
+
+        self.directories = [abspath(x) for x in directories or []
+                            if os.path.isdir(x)]
+        """
+        list: Absolute paths of the watched directories.
+        """
+
+        self.poll_interval = float(poll_interval)
+        """
+        float: Interval in seconds between checks of the files stat.
+        """
+
+        self.debounce = debounce
+        """
+        float: Time window in seconds used to coalesce bursts of events.
+        """
+
+        self.fd = None
+        """
+        int: File descriptor of the inotify instance. None when falling
+        back to polling.
+        """
+
+        self._watches = {}
+        """
+        dict: Maps each inotify watch descriptor to the set of file names
+        that are relevant in that directory. A value of None means that any
+        name is relevant.
+        """
+
+        self._stamps = self._get_stamps()
+        self._last_poll = time.time()
+
+        if use_inotify:
+            self._init_inotify()
+
+        if self.fd is not None:
+            self.poll_interval = max(self.poll_interval,
+                                     self.INOTIFY_POLL_INTERVAL)
+
+        logger.debug("File watcher started in {} mode".format(
+            "inotify" if self.fd is not None else "polling"))
+
+    def _init_inotify(self):
+        """Registers the parent directory of each watched file, and the
+        watched directories, in a new inotify instance.
+        """
+
+        libc = _load_inotify()
+        if not libc:
+            return
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.debug("Could not initialize inotify: {}".format(
+                os.strerror(ctypes.get_errno())))
+            return
+
+        targets = {}
+        for f in self.files:
+            targets.setdefault(dirname(f), set()).add(basename(f))
+        for d in self.directories:
+            targets[d] = None
+
+        for path, names in targets.items():
+            if names is None:
+                mask = IN_CREATE | IN_MOVED_TO
+            else:
+                mask = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO
+            wd = libc.inotify_add_watch(fd, path.encode("utf8"), mask)
+            if wd < 0:
+                logger.debug("Could not watch {}: {}".format(
+                    path, os.strerror(ctypes.get_errno())))
+                os.close(fd)
+                return
+            self._watches[wd] = names
+
+        self.fd = fd
+
+    def _get_stamps(self):
+        """Returns the size, modification time and inode of each watched
+        file.
+        """
+
+        stamps = []
+        for f in self.files:
+            try:
+                st = os.stat(f)
+                stamps.append((st.st_size, st.st_mtime, st.st_ino))
+            except FileNotFoundError:
+                stamps.append(None)
+
+        return stamps
+
+    def _poll(self):
+        """Checks whether the stat of any watched file changed since the
+        last check.
+
+        Returns
+        -------
+        bool
+            True if there was a change.
+        """
+
+        self._last_poll = time.time()
+        stamps = self._get_stamps()
+
+        if stamps != self._stamps:
+            self._stamps = stamps
+            return True
+
+        return False
+
+    def _read_events(self):
+        """Reads the pending inotify events.
+
+        Returns
+        -------
+        bool
+            True if at least one of the events is relevant for the watched
+            files.
+        """
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        relevant = False
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0").decode(
+                "utf8", errors="replace")
+            pos += length
+
+            if mask & IN_Q_OVERFLOW:
+                relevant = True
+                continue
+
+            names = self._watches.get(wd, ())
+            if names is None or name in names:
+                relevant = True
+
+        return relevant
+
+    def _drain(self):
+        """Coalesces the burst of events that follows a relevant event.
+
+        Events are consumed until no new event arrives for a
+        :attr:`debounce` window, for at most ten of these windows.
+        """
+
+        deadline = time.time() + self.debounce * 10
+        while time.time() < deadline:
+            r, _, _ = select.select([self.fd], [], [], self.debounce)
+            if not r:
+                break
+            self._read_events()
+
+    def wait(self, timeout=None, fds=None):
+        """Blocks until one of the watched files changes, one of the
+        provided file descriptors is ready for reading, or the timeout
+        expires.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum number of seconds to wait. If None, waits until there is
+            a change.
+        fds : list, optional
+            Additional file objects or descriptors (e.g.: sys.stdin) that
+            should wake the watcher when they are ready for reading.
+
+        Returns
+        -------
+        bool
+            True if the watcher was woken by a change or by one of the
+            provided file descriptors, False if the timeout expired.
+        """
+
+        fds = list(fds or [])
+        if self.fd is not None:
+            fds.append(self.fd)
+
+        start = time.time()
+
+        while True:
+
+            now = time.time()
+            next_poll = self._last_poll + self.poll_interval - now
+            if timeout is None:
+                wait_time = next_poll
+            else:
+                remaining = start + timeout - now
+                if remaining <= 0:
+                    return False
+                wait_time = min(next_poll, remaining)
+
+            r, _, _ = select.select(fds, [], [], max(wait_time, 0))
+
+            if self.fd is not None and self.fd in r:
+                if self._read_events():
+                    self._drain()
+                    self._stamps = self._get_stamps()
+                    return True
+                r.remove(self.fd)
+
+            if r:
+                return True
+
+            if time.time() - self._last_poll >= self.poll_interval:
+                if self._poll():
+                    return True
+
+    def close(self):
+        """Closes the inotify instance."""
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
@@ -1,6 +1,5 @@
 #!/usr/bin/python3
 import os
-import sys
 import json
 import zipfile
 import logging
@@ -29,6 +28,76 @@ html_template = """
 """
 
 
+def iter_reports(paths):
+    """Yields the contents of the reports in a list of files.
+
+    Each file is either a report JSON file or, when its name ends with
+    ``.ndjson``, a buffer of reports with one report JSON per line, as
+    written by the ``compile_reports_buffer`` process. Buffers are read one
+    line at a time.
+
+    Parameters
+    ----------
+    paths : list
+        Paths to the report JSON files and report buffers.
+
+    Yields
+    ------
+    bytes
+        Contents of each report.
+    """
+
+    for path in paths:
+        with open(path, "rb") as fh:
+
+            if not path.endswith(".ndjson"):
+                yield fh.read().strip()
+                continue
+
+            for line in fh:
+                if line.strip():
+                    yield line.strip()
+
+
+def write_reports(out_handles, metadata, reports):
+    """Writes the pipeline report JSON into one or more output files.
+
+    The report files are not combined into a single object. Their contents
+    are copied into the outputs one at a time, so that the memory usage is
+    bounded by the largest report instead of the whole pipeline report.
+
+    Parameters
+    ----------
+    out_handles : list
+        File handles, opened in binary mode, where the pipeline report JSON
+        is written.
+    metadata : dict
+        Nextflow metadata of the pipeline, which is the first report.
+    reports : list
+        Paths to the report JSON files or report buffers.
+    """
+
+    def write(data):
+        for fh in out_handles:
+            fh.write(data)
+
+    write(b'{"data":{"results":[')
+    write(json.dumps(metadata, separators=(",", ":")).encode("utf8"))
+
+    for content in iter_reports(reports):
+
+        # Only one report is parsed at a time, to validate it before it is
+        # written
+        rjson = json.loads(content.decode("utf8"))
+        print("{}: {}".format(rjson["processName"], len(content)))
+        del rjson
+
+        write(b",")
+        write(content)
+
+    write(b"]}}")
+
+
 def main(reports, forks, dag, main_js):
 
     metadata = {
@@ -47,9 +116,6 @@ def main(reports, forks, dag, main_js):
         }
     }
 
-    # Add nextflow metadata
-    storage = []
-
     # Add forks dictionary
     try:
         with open(forks) as fh:
@@ -68,31 +134,24 @@ def main(reports, forks, dag, main_js):
         logging.warning("Could not parse versions JSON: {}".format(
             dag))
 
-    storage.append(metadata)
     # Write metadata information to dotfile. This dotfile is then sent to the
     # ReportHTTP, when available in the afterScript process directive.
     with open(".metadata.json", "w") as fh:
         fh.write(json.dumps(metadata, separators=(",", ":")))
 
-    for r in reports:
-        with open(r) as fh:
-            rjson = json.load(fh)
-            storage.append(rjson)
-            print("{}: {}".format(rjson["processName"],
-                                  sys.getsizeof(json.dumps(rjson))))
+    # The report data is written in the placeholder of the HTML template
+    html_start, html_end = html_template.split("{}")
 
-    with open("pipeline_report.html", "w") as html_fh:
-        html_fh.write(html_template.format(
-            json.dumps({"data": {"results": storage}}, separators=(",", ":"))))
+    with open("pipeline_report.html", "wb") as html_fh:
+        with open("pipeline_report.json", "wb") as rep_fh:
+            html_fh.write(html_start.encode("utf8"))
+            write_reports([html_fh, rep_fh], metadata, reports)
+            html_fh.write(html_end.encode("utf8"))
 
     with zipfile.ZipFile(main_js) as zf:
         os.mkdir("src")
         zf.extractall("./src")
 
-    with open("pipeline_report.json", "w") as rep_fh:
-        rep_fh.write(json.dumps({"data": {"results": storage}},
-                                separators=(",", ":")))
-
 
 if __name__ == "__main__":
     main(REPORTS, FORKS, DAG, MAIN_JS)
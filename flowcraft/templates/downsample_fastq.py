@@ -7,6 +7,12 @@ Purpose
 This module is intended to sub-sample FastQ files to a certain coverage, based
 on the expected genome size.
 
+The number of bases of the FastQ files is taken from their QC sketch, when it
+is provided by the ``integrity_coverage`` component for the same files.
+Otherwise, the bases are counted in a first pass over the files. The read
+pairs are then sampled in a single pass, reading both files in lockstep so
+that both reads of a pair are always kept or discarded together.
+
 Expected input
 --------------
 
@@ -24,6 +30,10 @@ The following variables are expected whether using NextFlow or the
     - e.g.: ``100``
 - ``clear`` : If 'true', remove the input fastq files at the end of the
     component run, IF THE FILES ARE IN THE WORK DIRECTORY
+- ``seed`` : Seed of the read sampling.
+    - e.g.: ``100``
+- ``qc_sketch`` : QC sketch of the FastQ files, or an empty string.
+    - e.g.: ``'SampleA_qc_sketch.json'``
 
 Generated output
 ----------------
@@ -36,16 +46,22 @@ Code documentation
 
 """
 
-__version__ = "1.0.0"
-__build__ = "30072018"
+__version__ = "2.0.0"
+__build__ = "18102026"
 __template__ = "sample_fastq-nf"
 
 import os
 import re
+import gzip
 import json
+import math
+import random
+import shutil
 import subprocess
 
 from os.path import basename
+from itertools import islice
+from subprocess import PIPE
 
 from flowcraft_utils.flowcraft_base import get_logger, MainWrapper
 
@@ -59,6 +75,8 @@ if __file__.endswith(".command.sh"):
     DEPTH = float('$depth'.strip())
     CLEAR = '$clear'
     SEED = '$seed'
+    QC_SKETCH = '$qc_sketch'
+    CPUS = int('$task.cpus')
     logger.debug("Running {} with parameters:".format(
         os.path.basename(__file__)))
     logger.debug("SAMPLE_ID: {}".format(SAMPLE_ID))
@@ -67,84 +85,312 @@ if __file__.endswith(".command.sh"):
     logger.debug("DEPTH: {}".format(DEPTH))
     logger.debug("CLEAR: {}".format(CLEAR))
     logger.debug("SEED: {}".format(SEED))
+    logger.debug("QC_SKETCH: {}".format(QC_SKETCH))
+    logger.debug("CPUS: {}".format(CPUS))
 
+GZIP_MAGIC = b"\\x1f\\x8b"
+"""
+bytes: Binary signature of gzip files.
+"""
 
-def __get_version_spades():
+DECOMPRESSORS = [["pigz", "-dc"]]
+"""
+list: Command lines of the external decompressors of gzip files, by order of
+preference. When none of them is available, the files are decompressed with
+the :py:mod:`gzip` module.
+"""
+
+COMPRESSORS = [["pigz", "--fast", "-c", "-p", "{}"], ["gzip", "--fast", "-c"]]
+"""
+list: Command lines of the compressors of the subsampled files, by order of
+preference. The ``{}`` placeholder is replaced by the number of threads. When
+none of them is available, the files are compressed with the
+:py:mod:`gzip` module.
+"""
+
+
+def __get_version_pigz():
 
     try:
 
-        cli = ["seqtk"]
-        p = subprocess.Popen(cli, stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE)
-        _, stderr = p.communicate()
+        cli = ["pigz", "--version"]
+        p = subprocess.Popen(cli, stdout=PIPE, stderr=PIPE)
+        stdout, stderr = p.communicate()
 
-        _version = stderr.splitlines()[2]
-        try:
-            version = re.match(
-                "Version: (.*)", _version.decode("utf8")).group(1)
-        except AttributeError:
-            version = "undefined"
+        # Older versions of pigz write the version to stderr
+        version = (stdout or stderr).decode("utf8").split()[1]
 
     except Exception as e:
         logger.debug(e)
         version = "undefined"
 
     return {
-        "program": "seqtk",
+        "program": "pigz",
         "version": version,
     }
 
 
+def open_fastq(fastq):
+    """Opens a FastQ file for reading in binary mode.
+
+    Gzip files are decompressed by the first external decompressor in
+    :py:data:`DECOMPRESSORS` that is found in the PATH, through a pipe.
+
+    Parameters
+    ----------
+    fastq : str
+        Path to the FastQ file.
+
+    Returns
+    -------
+    fh : file object
+        FastQ file object.
+    p : subprocess.Popen or None
+        Decompressor process, if an external decompressor is used.
+    """
+
+    with open(fastq, "rb") as fh:
+        compressed = fh.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+    if not compressed:
+        return open(fastq, "rb"), None
+
+    for cli in DECOMPRESSORS:
+        if shutil.which(cli[0]):
+            p = subprocess.Popen(cli + [fastq], stdout=PIPE)
+            return p.stdout, p
+
+    return gzip.open(fastq, "rb"), None
+
+
+def open_compressor(path, threads=1):
+    """Opens a gzip file for writing through the first compressor in
+    :py:data:`COMPRESSORS` that is found in the PATH.
+
+    Parameters
+    ----------
+    path : str
+        Path to the output file.
+    threads : int
+        Number of threads of the compressor.
+
+    Returns
+    -------
+    fh : file object
+        File object that receives the uncompressed data.
+    p : subprocess.Popen or None
+        Compressor process, if an external compressor is used.
+    """
+
+    for cli in COMPRESSORS:
+        if shutil.which(cli[0]):
+            cli = [x.format(threads) for x in cli]
+            with open(path, "wb") as out:
+                p = subprocess.Popen(cli, stdin=PIPE, stdout=out)
+            return p.stdin, p
+
+    return gzip.open(path, "wb", compresslevel=1), None
+
+
+def close_stream(fh, p):
+    """Closes a file object returned by :py:func:`open_fastq` or
+    :py:func:`open_compressor` and waits for its process.
+
+    Parameters
+    ----------
+    fh : file object
+        File object to close.
+    p : subprocess.Popen or None
+        Process of the file object.
+
+    Returns
+    -------
+    int
+        Return code of the process, or 0 if there is no process.
+    """
+
+    fh.close()
+
+    return p.wait() if p else 0
+
+
+def get_sketch_bases(qc_sketch, fastq_pair):
+    """Returns the number of bases of the FastQ files in their QC sketch.
+
+    The sketch is only used when it was created for files with the same name
+    and size as the provided FastQ files, and when its number of bases is
+    exact, i.e., it was not estimated from a sample of the reads.
+
+    Parameters
+    ----------
+    qc_sketch : str
+        Path to the QC sketch, or an empty string.
+    fastq_pair : list
+        Paths to the FastQ files.
+
+    Returns
+    -------
+    int or None
+        Number of bases, or None if there is no valid QC sketch.
+    """
+
+    if not qc_sketch or not os.path.isfile(qc_sketch):
+        return None
+
+    try:
+        with open(qc_sketch) as fh:
+            sketch = json.load(fh)
+    except ValueError:
+        logger.warning("Could not parse QC sketch: {}".format(qc_sketch))
+        return None
+
+    files = dict((basename(x), os.path.getsize(x)) for x in fastq_pair)
+    if sketch.get("files") != files:
+        logger.info("QC sketch was created for different files: {}".format(
+            sketch.get("files")))
+        return None
+
+    if sketch.get("relativeError", 0):
+        logger.info("QC sketch was created from a sample of the reads, with "
+                    "a relative error of {}".format(sketch["relativeError"]))
+        return None
+
+    return sketch["bases"]
+
+
+def count_bases(fastq):
+    """Counts the bases of a FastQ file.
+
+    Parameters
+    ----------
+    fastq : str
+        Path to the FastQ file.
+
+    Returns
+    -------
+    int
+        Number of bases.
+    """
+
+    fh, p = open_fastq(fastq)
+
+    try:
+        # The sequence is the 2nd line of each record
+        bases = sum(map(len, map(bytes.rstrip, islice(fh, 1, None, 4))))
+    finally:
+        returncode = close_stream(fh, p)
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, p.args)
+
+    return bases
+
+
+def sample_pairs(fastq_pair, ratio, seed, out_paths, threads=1):
+    """Samples the read pairs of a pair of FastQ files.
+
+    Both files are read in lockstep and each read pair is kept with a
+    probability of ``ratio`` (Bernoulli sampling). Instead of drawing a
+    random number for each pair, the number of pairs skipped before the next
+    kept pair is drawn from the corresponding geometric distribution, so that
+    the skipped pairs are consumed without being handled one by one. The
+    kept pairs are written through the compressors of
+    :py:func:`open_compressor`, which run in parallel.
+
+    Parameters
+    ----------
+    fastq_pair : list
+        Paths to the FastQ files.
+    ratio : float
+        Probability of keeping each read pair, between 0 and 1.
+    seed : str or int
+        Seed of the random number generator.
+    out_paths : list
+        Paths to the compressed output file of each FastQ file.
+    threads : int
+        Number of threads of each compressor.
+
+    Returns
+    -------
+    int
+        Number of kept read pairs.
+    """
+
+    rng = random.Random(seed)
+    readers = [open_fastq(x) for x in fastq_pair]
+    writers = [open_compressor(x, threads) for x in out_paths]
+
+    # Records of both files, as tuples with their four lines
+    pairs = zip(*[zip(*[fh] * 4) for fh, _ in readers])
+    log_skip = math.log(1 - ratio) if ratio < 1 else None
+    kept = 0
+
+    try:
+        while ratio > 0:
+
+            skip = int(math.log(1 - rng.random()) / log_skip) \
+                if log_skip else 0
+            pair = next(islice(pairs, skip, None), None)
+            if pair is None:
+                break
+
+            for (fh, _), record in zip(writers, pair):
+                fh.write(b"".join(record))
+            kept += 1
+
+        # Both files should end at the same record
+        if any(next(iter(fh), None) for fh, _ in readers):
+            logger.warning("The FastQ files have a different number of "
+                           "reads. The extra reads were ignored")
+
+    finally:
+        returncodes = [close_stream(*x) for x in readers + writers]
+
+    for (_, p), returncode in zip(readers + writers, returncodes):
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, p.args)
+
+    return kept
+
+
 @MainWrapper
-def main(sample_id, fastq_pair, genome_size, depth, clear, seed):
+def main(sample_id, fastq_pair, genome_size, depth, clear, seed, qc_sketch="",
+         cpus=1):
 
-    genome_size = genome_size
     target_depth = depth
     p1 = fastq_pair[0]
     p2 = fastq_pair[1]
     bn1 = ".".join(basename(p1).split('.')[:-2])
     bn2 = ".".join(basename(p2).split('.')[:-2])
 
-    R1_fqchk = subprocess.Popen(['seqtk', 'fqchk', p1], stdout=subprocess.PIPE)
-    R1_stdout, R1_stderr = R1_fqchk.communicate()
-    B_P1 = int(R1_stdout.splitlines()[2].split()[1])
-    logger.debug("Bases p1: {}".format(B_P1))
-
-    R2_fqchk = subprocess.Popen(['seqtk', 'fqchk', p2], stdout=subprocess.PIPE)
-    R2_stdout, R2_stderr = R2_fqchk.communicate()
-    B_P2= int(R2_stdout.splitlines()[2].split()[1])
-    logger.debug("Bases p2: {}".format(B_P2))
+    bases = get_sketch_bases(qc_sketch, fastq_pair)
+    if bases is not None:
+        logger.info("Bases from the QC sketch: {}".format(bases))
+    else:
+        bases = 0
+        for fq in fastq_pair:
+            fq_bases = count_bases(fq)
+            logger.debug("Bases {}: {}".format(fq, fq_bases))
+            bases += fq_bases
 
-    estimated_coverage = (B_P1 + B_P2) / (genome_size * 1E6)
+    estimated_coverage = bases / (genome_size * 1E6)
     logger.debug("Estimated coverage: {}".format(estimated_coverage))
     ratio = target_depth/estimated_coverage
     logger.debug("Estimated ration: {}".format(ratio))
 
-    # if seed param is specified then use it, otherwise use the default -s100
+    # if seed param is specified then use it, otherwise use the default 100
     if seed:
         # through flowcraft everything should pass through here
-        parsed_seed = "-s{}".format(str(seed))
-        logger.info("Using seed parameter: {}.".format(parsed_seed))
+        logger.info("Using seed parameter: {}.".format(seed))
     else:
-        logger.debug("Seed parameter not specified. Using default value -s100.")
-        parsed_seed = "-s100"
+        logger.debug("Seed parameter not specified. Using default value 100.")
+        seed = 100
 
     if ratio < 1:
-        # print ("Writing R1.fq.gz")
-        ps = subprocess.Popen(('seqtk', 'sample', parsed_seed, p1, str(ratio)),
-                              stdout=subprocess.PIPE)
-        with open('{}_ss.fq.gz'.format(bn1), 'w') as outfile:
-            subprocess.Popen(('gzip', '--fast', '-c'),
-                             stdin=ps.stdout, stdout=outfile )
-        ps.wait()
-
-        # print ("Writing R2.fq.gz")
-        ps = subprocess.Popen(('seqtk', 'sample', parsed_seed, p2, str(ratio)),
-                              stdout=subprocess.PIPE)
-        with open('{}_ss.fq.gz'.format(bn2), 'w') as outfile:
-            subprocess.Popen(('gzip', '--fast', '-c'),
-                             stdin=ps.stdout, stdout=outfile)
-        ps.wait()
+        out_paths = ["{}_ss.fq.gz".format(bn1), "{}_ss.fq.gz".format(bn2)]
+        kept = sample_pairs(fastq_pair, ratio, seed, out_paths,
+                            max(1, cpus // len(out_paths)))
+        logger.info("Kept {} read pairs".format(kept))
 
         if clear == "true":
             # Get real path of the symlink
@@ -177,4 +423,4 @@ def main(sample_id, fastq_pair, genome_size, depth, clear, seed):
 
 
 if __name__ == "__main__":
-        main(SAMPLE_ID, FASTQ_PAIR, GSIZE, DEPTH, CLEAR, SEED)
+        main(SAMPLE_ID, FASTQ_PAIR, GSIZE, DEPTH, CLEAR, SEED, QC_SKETCH, CPUS)
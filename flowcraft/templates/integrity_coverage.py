@@ -34,6 +34,12 @@ The following variables are expected whether using NextFlow or the
     The arguments should be a string of command line arguments, such as \
     '-e'. The accepted arguments are:*
     - ``'-e'`` : Skip encoding guess.
+    - ``'-s'`` : Estimate the coverage from a sample of the reads. See \
+    :py:func:`sample_fastq_file`.
+
+- ``cpus`` : *Number of CPUs of the task. The FastQ files are parsed in up \
+    to this number of worker processes*
+    - e.g.: ``'2'``
 
 Generated output
 ----------------
@@ -62,6 +68,10 @@ The generated output are output files that contain an object, usually a string.
     sample.
     - ``'152'``
 
+- ``${sample_id}_qc_sketch.json`` : Stores the QC sketch of the sample, with \
+    the read and base totals, the read length histogram and the per-cycle \
+    quality means and base composition. See :py:func:`finish_sketch`.
+
 Notes
 -----
 
@@ -74,20 +84,31 @@ Code documentation
 
 """
 
-__version__ = "1.0.1"
-__build__ = "03082018"
+__version__ = "1.4.0"
+__build__ = "18102026"
 __template__ = "integrity_coverage-nf"
 
 import os
 import bz2
 import gzip
 import json
+import math
+import shutil
 import zipfile
+import subprocess
 
-from itertools import chain
+from collections import Counter
+from itertools import repeat, zip_longest
+from subprocess import PIPE
+from concurrent.futures import ProcessPoolExecutor
 
 from flowcraft_utils.flowcraft_base import get_logger, MainWrapper
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 logger = get_logger(__file__)
 
 # Set constants when running from Nextflow
@@ -98,6 +119,7 @@ if __file__.endswith(".command.sh"):
     GSIZE = float('$gsize')
     MINIMUM_COVERAGE = float('$cov')
     OPTS = '$opts'.split()
+    CPUS = int('$task.cpus')
 
     logger.debug("Running {} with parameters:".format(
         os.path.basename(__file__)))
@@ -106,6 +128,7 @@ if __file__.endswith(".command.sh"):
     logger.debug("GSIZE: {}".format(GSIZE))
     logger.debug("MINIMUM_COVERAGE: {}".format(MINIMUM_COVERAGE))
     logger.debug("OPTS: {}".format(OPTS))
+    logger.debug("CPUS: {}".format(CPUS))
 
 RANGES = {
     'Sanger': [33, (33, 73)],
@@ -136,6 +159,56 @@ dict: Dictionary containing the binary signatures for three compression formats
 (gzip, bzip2 and zip).
 """
 
+DECOMPRESSORS = {
+    "gz": [["igzip", "-dc"], ["pigz", "-dc", "-p", "{}"]],
+    "bz2": [["pbzip2", "-dc", "-p{}"]]
+}
+"""
+dict: Command lines of the external decompressors of each compression format,
+by order of preference. The ``{}`` placeholder is replaced by the number of
+threads. When none of them is available, the files are decompressed with the
+modules in :py:data:`COPEN`.
+"""
+
+CHUNK_SIZE = 8 * 1024 * 1024
+"""
+int: Number of bytes of the FastQ files that are parsed at a time.
+"""
+
+
+SAMPLE_SIZE = 128 * 1024 * 1024
+"""
+int: Minimum number of (uncompressed) bytes of each FastQ file that are parsed
+in the sampling mode.
+"""
+
+SAMPLE_CHUNK_SIZE = 4 * 1024 * 1024
+"""
+int: Number of bytes of the FastQ files that are parsed at a time in the
+sampling mode. The variation of the bases per byte between chunks sets the
+error of the estimate.
+"""
+
+MIN_SAMPLE_ERROR = 0.02
+"""
+float: Minimum relative error of the estimates of the sampling mode, which
+accounts for the variation of the reads along the file, since only the start
+of the file is sampled.
+"""
+
+
+SKETCH_BASES = b"ACGT"
+"""
+bytes: Bases counted in the base composition of the QC sketch. Any other
+character is counted as an ``N``.
+"""
+
+SKETCH_STRIDE = 50
+"""
+int: Only one in every ``SKETCH_STRIDE`` reads is used for the per-cycle
+statistics of the QC sketch, which are means and fractions.
+"""
+
 
 def guess_file_compression(file_path, magic_dict=None):
     """Guesses the compression of an input file.
@@ -201,6 +274,630 @@ def get_qual_range(qual_str):
     return min(vals), max(vals)
 
 
+def get_chunk_qual_range(quals, qual_range=None):
+    """ Get the range of the encodings of a list of quality strings.
+
+    When the range of the previous quality strings is provided, the values
+    within that range are first removed with :py:meth:`bytes.translate`, so
+    that only the values that expand the range are compared. Otherwise, uses
+    NumPy when it is available.
+
+    Parameters
+    ----------
+    quals : list
+        List of quality strings, as bytes.
+    qual_range : tuple, optional
+        (Minimum encoding, Maximum encoding) of the previous quality strings.
+
+    Returns
+    -------
+    x : tuple or None
+        (Minimum encoding, Maximum encoding), including the previous range,
+        or ``None`` if there are no quality values.
+    """
+
+    vals = b"".join(quals)
+
+    if qual_range:
+        vals = vals.translate(None, bytes(range(qual_range[0],
+                                                qual_range[1] + 1)))
+        if not vals:
+            return qual_range
+        return min(min(vals), qual_range[0]), max(max(vals), qual_range[1])
+
+    if not vals:
+        return None
+
+    if np is not None:
+        arr = np.frombuffer(vals, dtype=np.uint8)
+        return int(arr.min()), int(arr.max())
+
+    return min(vals), max(vals)
+
+
+def new_sketch():
+    """ Returns an empty QC sketch, to be updated by
+    :py:func:`update_sketch`.
+
+    Returns
+    -------
+    sketch : dict
+        Totals of reads and bases, read length histogram, the number of each
+        base (A, C, G, T and N) of each cycle, as a flat list with five
+        values per cycle, and the sum and number of the quality encodings of
+        each cycle.
+    """
+
+    return {
+        "reads": 0,
+        "bases": 0,
+        "lengths": Counter(),
+        "cycle_reads": 0,
+        "cycle_bases": [],
+        "cycle_quals": [],
+        "cycle_qual_reads": []
+    }
+
+
+def _add_cycles(totals, values):
+    """ Adds a list of per-cycle values to the totals, in place. """
+
+    totals.extend([0] * (len(values) - len(totals)))
+    for i, x in enumerate(values):
+        totals[i] += x
+
+
+def update_sketch(sketch, seqs, quals, seq_lens):
+    """ Adds the reads of a block to a QC sketch.
+
+    The totals and read length histogram are exact, while the per-cycle
+    statistics are computed for one in every :py:data:`SKETCH_STRIDE` reads.
+
+    Parameters
+    ----------
+    sketch : dict
+        QC sketch, as returned by :py:func:`new_sketch`.
+    seqs : list
+        Sequence strings, as bytes.
+    quals : list
+        Quality strings, as bytes. May be empty.
+    seq_lens : list
+        Length of each sequence string.
+    """
+
+    sketch["reads"] += len(seqs)
+    sketch["bases"] += sum(seq_lens)
+    sketch["lengths"].update(seq_lens)
+
+    seqs = seqs[::SKETCH_STRIDE]
+    sketch["cycle_reads"] += len(seqs)
+
+    # Each column has the bases of a cycle, padded with 0 for the shorter
+    # reads
+    cycle_bases = []
+    for col in zip_longest(*seqs, fillvalue=0):
+        col = bytes(col)
+        counts = [col.count(x) for x in SKETCH_BASES]
+        counts.append(len(col) - col.count(0) - sum(counts))
+        cycle_bases.extend(counts)
+    _add_cycles(sketch["cycle_bases"], cycle_bases)
+
+    cycle_quals = []
+    cycle_qual_reads = []
+    for col in zip_longest(*quals[::SKETCH_STRIDE], fillvalue=0):
+        col = bytes(col)
+        cycle_quals.append(sum(col))
+        cycle_qual_reads.append(len(col) - col.count(0))
+    _add_cycles(sketch["cycle_quals"], cycle_quals)
+    _add_cycles(sketch["cycle_qual_reads"], cycle_qual_reads)
+
+
+def merge_sketches(sketches):
+    """ Merges the QC sketches of several files.
+
+    Parameters
+    ----------
+    sketches : list
+        QC sketches, as returned by :py:func:`new_sketch`.
+
+    Returns
+    -------
+    sketch : dict
+        The merged QC sketch.
+    """
+
+    merged = new_sketch()
+
+    for sketch in sketches:
+        merged["reads"] += sketch["reads"]
+        merged["bases"] += sketch["bases"]
+        merged["cycle_reads"] += sketch["cycle_reads"]
+        merged["lengths"].update(sketch["lengths"])
+        _add_cycles(merged["cycle_bases"], sketch["cycle_bases"])
+        _add_cycles(merged["cycle_quals"], sketch["cycle_quals"])
+        _add_cycles(merged["cycle_qual_reads"], sketch["cycle_qual_reads"])
+
+    return merged
+
+
+def finish_sketch(sketch, phred=None):
+    """ Converts a QC sketch into its compact JSON representation.
+
+    Parameters
+    ----------
+    sketch : dict
+        QC sketch, as returned by :py:func:`new_sketch`.
+    phred : int, optional
+        Phred offset of the quality encodings. If provided, the quality
+        means are phred scores. Otherwise, they are the means of the
+        encodings.
+
+    Returns
+    -------
+    sketch_json : dict
+        With the keys:
+
+            - ``reads`` and ``bases``: Total number of reads and bases.
+            - ``phred``: Phred offset of the quality means.
+            - ``readLengths``: Number of reads of each length.
+            - ``gc``: GC content of the reads used for the per-cycle
+              statistics.
+            - ``cycleReads``: Number of reads used for the per-cycle
+              statistics.
+            - ``cycleQualityMean``: Mean quality of each cycle.
+            - ``cycleBaseComposition``: Fraction of each base in each cycle.
+
+        :py:func:`main` also adds the size of the ``files`` that were
+        parsed and the ``relativeError`` of the coverage estimate. In the
+        sampling mode, the totals are those of the sampled reads, and the
+        estimated totals of the files are set in ``estimatedReads`` and
+        ``estimatedBases``.
+    """
+
+    cycle_bases = [sketch["cycle_bases"][i:i + 5]
+                   for i in range(0, len(sketch["cycle_bases"]), 5)]
+    coverage = [sum(x) for x in cycle_bases]
+
+    # Convert the quality encoding sums of each cycle into means
+    offset = phred or 0
+    quality_means = [round(x / n - offset, 2) for x, n in
+                     zip(sketch["cycle_quals"], sketch["cycle_qual_reads"])
+                     if n]
+
+    composition = {}
+    for i, base in enumerate(SKETCH_BASES.decode() + "N"):
+        composition[base] = [round(x[i] / n, 4) if n else 0
+                             for x, n in zip(cycle_bases, coverage)]
+
+    totals = [sum(x[i] for x in cycle_bases) for i in range(5)]
+    gc = round((totals[1] + totals[2]) / sum(totals), 4) \
+        if sum(totals) else 0
+
+    return {
+        "reads": sketch["reads"],
+        "bases": sketch["bases"],
+        "phred": phred,
+        "readLengths": dict((str(x), y) for x, y in
+                            sorted(sketch["lengths"].items())),
+        "gc": gc,
+        "cycleReads": sketch["cycle_reads"],
+        "cycleQualityMean": quality_means,
+        "cycleBaseComposition": composition
+    }
+
+
+def iter_fastq_blocks(fh, chunk_size=CHUNK_SIZE):
+    """ Reads a FastQ file in binary chunks of complete lines.
+
+    The incomplete last line of each chunk is kept for the next one, so that
+    every yielded block only has complete lines.
+
+    Parameters
+    ----------
+    fh : file object
+        FastQ file object opened in binary mode.
+    chunk_size : int
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    x : generator
+        Blocks of lines, as bytes without the last newline.
+    """
+
+    leftover = b""
+
+    while True:
+
+        chunk = fh.read(chunk_size)
+        data = leftover + chunk
+
+        if chunk:
+            # Keep the incomplete last line for the next chunk
+            end = data.rfind(b"\\n")
+            if end == -1:
+                leftover = data
+                continue
+            leftover = data[end + 1:]
+            data = data[:end]
+        elif not data:
+            return
+
+        yield data
+
+        if not chunk:
+            return
+
+
+def scan_block(data, line_pos=0, skip_encoding=False, qual_range=None,
+               sketch=None):
+    """ Counts the reads and bases and gets the quality range of a block of
+    FastQ lines.
+
+    The block is split into lines, so that the sequence and quality lines of
+    all reads in the block are processed at once.
+
+    Parameters
+    ----------
+    data : bytes
+        Block of FastQ lines, as yielded by :py:func:`iter_fastq_blocks`.
+    line_pos : int
+        Index of the first line of the block within its FastQ record.
+    skip_encoding : bool
+        If True, the quality lines are not parsed.
+    qual_range : tuple, optional
+        (Minimum encoding, Maximum encoding) of the previous blocks.
+    sketch : dict, optional
+        QC sketch that is updated with the reads of the block.
+
+    Returns
+    -------
+    chars : int
+        Number of bases.
+    nreads : int
+        Number of reads.
+    max_read_length : int
+        Maximum read length.
+    qual_range : tuple or None
+        (Minimum encoding, Maximum encoding), including the previous range.
+    line_pos : int
+        Index of the line after the block within its FastQ record.
+    """
+
+    lines = data.split(b"\\n")
+
+    # Sequence lines are the 2nd and quality lines the 4th line of each
+    # record
+    seqs = lines[(1 - line_pos) % 4::4]
+    quals = [] if skip_encoding else lines[(3 - line_pos) % 4::4]
+
+    # Only strip the lines when they may end with whitespace (e.g.: Windows
+    # line endings)
+    if b"\\r" in data or b" \\n" in data or data.endswith(b" "):
+        seqs = [x.strip() for x in seqs]
+        quals = [x.strip() for x in quals]
+
+    seq_lens = list(map(len, seqs))
+
+    if sketch is not None:
+        update_sketch(sketch, seqs, quals, seq_lens)
+
+    return sum(seq_lens), len(seqs), max(seq_lens or [0]), \
+        get_chunk_qual_range(quals, qual_range), \
+        (line_pos + len(lines)) % 4
+
+
+def scan_fastq(fastq_handles, skip_encoding=False, chunk_size=CHUNK_SIZE,
+               sketch=None):
+    """ Counts the reads and bases and gets the quality range of FastQ files.
+
+    The files are read in binary chunks of ``chunk_size`` bytes with
+    :py:func:`iter_fastq_blocks`, and each chunk is processed by
+    :py:func:`scan_block`. The position of each line within a FastQ record
+    continues from one file to the next, as if the files were concatenated.
+
+    Parameters
+    ----------
+    fastq_handles : list
+        List of FastQ file objects opened in binary mode.
+    skip_encoding : bool
+        If True, the quality lines are not parsed.
+    chunk_size : int
+        Number of bytes read at a time.
+    sketch : dict, optional
+        QC sketch that is updated with the reads of the files.
+
+    Returns
+    -------
+    chars : int
+        Number of bases.
+    nreads : int
+        Number of reads.
+    max_read_length : int
+        Maximum read length.
+    qual_range : tuple or None
+        (Minimum encoding, Maximum encoding) of the quality strings, or
+        ``None`` if no quality strings were parsed.
+    """
+
+    chars = 0
+    nreads = 0
+    max_read_length = 0
+    qual_range = None
+
+    # Index of the next line within its FastQ record
+    line_pos = 0
+
+    for fh in fastq_handles:
+        for data in iter_fastq_blocks(fh, chunk_size):
+            block_chars, block_reads, block_len, qual_range, line_pos = \
+                scan_block(data, line_pos, skip_encoding, qual_range,
+                           sketch)
+            chars += block_chars
+            nreads += block_reads
+            max_read_length = max(max_read_length, block_len)
+
+    return chars, nreads, max_read_length, qual_range
+
+
+def open_fastq(fastq, threads=1):
+    """ Opens a FastQ file for reading in binary mode.
+
+    Compressed files are decompressed by the first external decompressor in
+    :py:data:`DECOMPRESSORS` that is found in the PATH, through a pipe.
+    Otherwise, they are decompressed with the modules in :py:data:`COPEN`.
+
+    Parameters
+    ----------
+    fastq : str
+        Path to the FastQ file.
+    threads : int
+        Number of threads of the external decompressor.
+
+    Returns
+    -------
+    fh : file object
+        FastQ file object.
+    p : subprocess.Popen or None
+        Decompressor process, if an external decompressor is used.
+    """
+
+    logger.info("[{}] Guessing file compression".format(fastq))
+    ftype = guess_file_compression(fastq)
+
+    # This can guess the compression of gz, bz2 and zip. If it cannot
+    # find the compression type, it tries to open a regular file
+    if not ftype:
+        logger.info("[{}] File compression not found. Assuming an "
+                    "uncompressed file".format(fastq))
+        return open(fastq, "rb"), None
+
+    logger.info("[{}] Found file compression: {}".format(fastq, ftype))
+
+    for cli in DECOMPRESSORS.get(ftype, []):
+        if shutil.which(cli[0]):
+            cli = [x.format(threads) for x in cli] + [fastq]
+            logger.info("[{}] Decompressing with: {}".format(
+                fastq, " ".join(cli)))
+            p = subprocess.Popen(cli, stdout=PIPE, stderr=PIPE)
+            return p.stdout, p
+
+    return COPEN[ftype](fastq, "rb"), None
+
+
+def scan_fastq_file(fastq, skip_encoding=False, threads=1):
+    """ Scans a single FastQ file with :py:func:`scan_fastq`.
+
+    Parameters
+    ----------
+    fastq : str
+        Path to the FastQ file.
+    skip_encoding : bool
+        If True, the quality lines are not parsed.
+    threads : int
+        Number of threads of the external decompressor.
+
+    Returns
+    -------
+    x : tuple
+        The results of :py:func:`scan_fastq`, followed by the QC sketch of
+        the file.
+
+    Raises
+    ------
+    EOFError
+        If the external decompressor fails (e.g.: corrupted file).
+    """
+
+    logger.info("Processing file {}".format(fastq))
+
+    fh, p = open_fastq(fastq, threads)
+    sketch = new_sketch()
+
+    try:
+        scan = scan_fastq([fh], skip_encoding, sketch=sketch)
+    finally:
+        fh.close()
+        if p:
+            stderr = p.stderr.read()
+            p.stderr.close()
+            p.wait()
+
+    if p and p.returncode != 0:
+        raise EOFError("Decompression of {} failed: {}".format(
+            fastq, stderr.decode("utf8", "replace").strip()))
+
+    return scan + (sketch,)
+
+
+def sample_fastq_file(fastq, skip_encoding=False, sample_size=SAMPLE_SIZE,
+                      chunk_size=SAMPLE_CHUNK_SIZE):
+    """ Estimates the results of :py:func:`scan_fastq` from a sample of the
+    reads at the start of a FastQ file.
+
+    The file is parsed until at least ``sample_size`` bytes were read and,
+    unless ``skip_encoding`` is set, the quality strings match a single phred
+    score. The numbers of bases and reads are then extrapolated to the whole
+    file from the fraction of the (compressed) file that was read. The
+    relative error of the estimate is three times the standard error of the
+    bases per (compressed) byte of each chunk, with a minimum of
+    :py:data:`MIN_SAMPLE_ERROR`. The maximum read length is the one of the
+    sampled reads.
+
+    Parameters
+    ----------
+    fastq : str
+        Path to the FastQ file.
+    skip_encoding : bool
+        If True, the quality lines are not parsed.
+    sample_size : int
+        Minimum number of bytes that are parsed.
+    chunk_size : int
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    x : tuple or None
+        The results of :py:func:`scan_fastq_file`, followed by the absolute
+        error of the number of bases (0 if the whole file was parsed). The QC
+        sketch only has the sampled reads. ``None`` if the compression of the
+        file does not allow sampling.
+    """
+
+    logger.info("Sampling file {}".format(fastq))
+
+    ftype = guess_file_compression(fastq)
+    if ftype not in [None, "gz", "bz2"]:
+        logger.info("[{}] Sampling is not supported for {} files".format(
+            fastq, ftype))
+        return None
+
+    chars = 0
+    nreads = 0
+    max_read_length = 0
+    qual_range = None
+    line_pos = 0
+    sketch = new_sketch()
+
+    # Bases per compressed byte of each chunk
+    ratios = []
+    ratio_chars = 0
+    last_pos = 0
+
+    # The files are decompressed in this process, so that the position in
+    # the compressed file is known
+    with open(fastq, "rb") as raw:
+
+        total_size = os.fstat(raw.fileno()).st_size
+        fh = gzip.GzipFile(fileobj=raw) if ftype == "gz" else \
+            bz2.BZ2File(raw) if ftype == "bz2" else raw
+
+        read_size = 0
+        for data in iter_fastq_blocks(fh, chunk_size):
+
+            block_chars, block_reads, block_len, qual_range, line_pos = \
+                scan_block(data, line_pos, skip_encoding, qual_range,
+                           sketch)
+            chars += block_chars
+            nreads += block_reads
+            max_read_length = max(max_read_length, block_len)
+            read_size += len(data)
+
+            # The compressed position only moves when the decompressor
+            # reads a new buffer
+            ratio_chars += block_chars
+            if raw.tell() > last_pos:
+                ratios.append(ratio_chars / (raw.tell() - last_pos))
+                ratio_chars = 0
+                last_pos = raw.tell()
+
+            if read_size < sample_size:
+                continue
+
+            if skip_encoding or (qual_range and len(set(
+                    get_encodings_in_range(*qual_range)[1])) == 1):
+                break
+
+        else:
+            logger.info("[{}] Parsed the whole file".format(fastq))
+            return chars, nreads, max_read_length, qual_range, sketch, 0
+
+        read_fraction = raw.tell() / total_size
+
+    mean = sum(ratios) / len(ratios)
+    if len(ratios) > 1 and mean:
+        std = math.sqrt(sum((x - mean) ** 2 for x in ratios) /
+                        (len(ratios) - 1))
+        error = max(3 * std / mean / math.sqrt(len(ratios)),
+                    MIN_SAMPLE_ERROR)
+    else:
+        error = 1
+
+    chars = int(round(chars / read_fraction))
+    nreads = int(round(nreads / read_fraction))
+
+    logger.info("[{}] Estimated {} bases from {:.1%} of the file, with a "
+                "relative error of {:.1%}".format(
+                    fastq, chars, read_fraction, error))
+
+    return chars, nreads, max_read_length, qual_range, sketch, error * chars
+
+
+def map_files(func, fastq_pair, workers, *args):
+    """ Applies a function to each FastQ file, in up to ``workers``
+    processes.
+
+    Parameters
+    ----------
+    func : function
+        Function that receives the path to a FastQ file, followed by
+        ``args``.
+    fastq_pair : list
+        Paths to the FastQ files.
+    workers : int
+        Maximum number of worker processes.
+
+    Returns
+    -------
+    x : list
+        Results of the function for each file.
+    """
+
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(func, fastq_pair,
+                                 *[repeat(x) for x in args]))
+
+    return [func(x, *args) for x in fastq_pair]
+
+
+def merge_scans(scans):
+    """ Merges the results of :py:func:`scan_fastq_file` for several files.
+
+    Parameters
+    ----------
+    scans : list
+        List with the results of :py:func:`scan_fastq_file` for each file.
+
+    Returns
+    -------
+    x : tuple
+        The merged results, as returned by :py:func:`scan_fastq_file`.
+    """
+
+    chars = sum(x[0] for x in scans)
+    nreads = sum(x[1] for x in scans)
+    max_read_length = max([x[2] for x in scans] or [0])
+
+    qual_ranges = [x[3] for x in scans if x[3]]
+    qual_range = (min(x[0] for x in qual_ranges),
+                  max(x[1] for x in qual_ranges)) if qual_ranges else None
+
+    sketch = merge_sketches([x[4] for x in scans])
+
+    return chars, nreads, max_read_length, qual_range, sketch
+
+
 def get_encodings_in_range(rmin, rmax):
     """ Returns the valid encodings for a given encoding range.
 
@@ -238,7 +935,7 @@ def get_encodings_in_range(rmin, rmax):
 
 
 @MainWrapper
-def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
+def main(sample_id, fastq_pair, gsize, minimum_coverage, opts, cpus=1):
     """ Main executor of the integrity_coverage template.
 
     Parameters
@@ -253,6 +950,9 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
         Minimum coverage required for a sample to pass the coverage check
     opts : list
         List of arbitrary options. See `Expected input`_.
+    cpus : int
+        Number of CPUs. Each FastQ file is parsed in its own worker process,
+        up to this number of processes.
 
     """
 
@@ -264,6 +964,8 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
     else:
         skip_encoding = False
 
+    sample_mode = "-s" in opts
+
     # Information for encoding guess
     gmin, gmax = 99, 0
     encoding = []
@@ -272,29 +974,16 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
     # Information for coverage estimation
     chars = 0
     nreads = 0
+    # Relative error of the estimated coverage in the sampling mode
+    cov_error = 0
 
     # Information on maximum read length
     max_read_length = 0
 
-    # Get compression of each FastQ pair file
-    file_objects = []
-    for fastq in fastq_pair:
-
-        logger.info("Processing file {}".format(fastq))
-
-        logger.info("[{}] Guessing file compression".format(fastq))
-        ftype = guess_file_compression(fastq)
-
-        # This can guess the compression of gz, bz2 and zip. If it cannot
-        # find the compression type, it tries to open a regular file
-        if ftype:
-            logger.info("[{}] Found file compression: {}".format(
-                fastq, ftype))
-            file_objects.append(COPEN[ftype](fastq, "rt"))
-        else:
-            logger.info("[{}] File compression not found. Assuming an "
-                        "uncompressed file".format(fastq))
-            file_objects.append(open(fastq))
+    # The FastQ files are parsed in parallel, and the remaining CPUs are
+    # used by the external decompressors
+    workers = min(cpus, len(fastq_pair))
+    threads = max(1, cpus // len(fastq_pair))
 
     logger.info("Starting FastQ file parsing")
 
@@ -305,49 +994,61 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
     # The '*_coverage' file stores the estimated coverage ('88')
     # The '*_report' file stores a csv report of the file
     # The '*_max_len' file stores a string with the maximum contig len ('155')
+    # The '*_qc_sketch.json' file stores the QC sketch of the sample
     with open("{}_encoding".format(sample_id), "w") as enc_fh, \
             open("{}_phred".format(sample_id), "w") as phred_fh, \
             open("{}_coverage".format(sample_id), "w") as cov_fh, \
             open("{}_report".format(sample_id), "w") as cov_rep, \
             open("{}_max_len".format(sample_id), "w") as len_fh, \
+            open("{}_qc_sketch.json".format(sample_id), "w") as sketch_fh, \
             open(".report.json", "w") as json_report, \
             open(".status", "w") as status_fh, \
             open(".fail", "w") as fail_fh:
 
         try:
-            # Iterate over both pair files sequentially using itertools.chain
-            for i, line in enumerate(chain(*file_objects)):
-
-                # Parse only every 4th line of the file for the encoding
-                # e.g.: AAAA/EEEEEEEEEEE<EEEEEEEEEEEEEEEEEEEEEEEEE (...)
-                if (i + 1) % 4 == 0 and not skip_encoding:
-                    # It is important to strip() the line so that any newline
-                    # character is removed and not accounted for in the
-                    # encoding guess
-                    lmin, lmax = get_qual_range(line.strip())
-
-                    # Guess new encoding if the range expands the previously
-                    # set boundaries of gmin and gmax
-                    if lmin < gmin or lmax > gmax:
-                        gmin, gmax = min(lmin, gmin), max(lmax, gmax)
-                        encoding, phred = get_encodings_in_range(gmin, gmax)
-                        logger.debug(
-                            "Updating estimates at line {} with range {} to"
-                            " '{}' (encoding) and '{}' (phred)".format(
-                                i, [lmin, lmax], encoding, phred))
-
-                # Parse only every 2nd line of the file for the coverage
-                # e.g.: GGATAATCTACCTTGACGATTTGTACTGGCGTTGGTTTCTTA (...)
-                if (i + 3) % 4 == 0:
-                    read_len = len(line.strip())
-                    chars += read_len
-                    nreads += 1
-
-                    # Evaluate maximum read length for sample
-                    if read_len > max_read_length:
-                        logger.debug("Updating maximum read length at line "
-                                     "{} to {}".format(i, read_len))
-                        max_read_length = read_len
+            scans = None
+
+            # Estimate the coverage from a sample of the reads of each file
+            if sample_mode:
+                samples = map_files(sample_fastq_file, fastq_pair, workers,
+                                    skip_encoding)
+
+                if all(samples):
+                    sample_chars = sum(x[0] for x in samples)
+                    cov_error = sum(x[5] for x in samples) / sample_chars \
+                        if sample_chars else 0
+                    sample_cov = sample_chars / (gsize * 1e6)
+
+                    # Only rely on the estimate when the minimum coverage
+                    # is outside its error bounds
+                    if sample_cov * (1 - cov_error) <= minimum_coverage <= \
+                            sample_cov * (1 + cov_error):
+                        logger.info("Estimated coverage is within the error "
+                                    "bounds of the minimum coverage. "
+                                    "Parsing the whole files")
+                        cov_error = 0
+                    else:
+                        scans = [x[:5] for x in samples]
+
+            # Parse both pair files, in binary chunks
+            if scans is None:
+                scans = map_files(scan_fastq_file, fastq_pair, workers,
+                                  skip_encoding, threads)
+
+            chars, nreads, max_read_length, qual_range, sketch = \
+                merge_scans(scans)
+            logger.debug("Maximum read length set to {}".format(
+                max_read_length))
+
+            # Guess the encoding from the range of the quality strings
+            # e.g.: AAAA/EEEEEEEEEEE<EEEEEEEEEEEEEEEEEEEEEEEEE (...)
+            if qual_range:
+                gmin, gmax = min(qual_range[0], gmin), \
+                    max(qual_range[1], gmax)
+                encoding, phred = get_encodings_in_range(gmin, gmax)
+                logger.debug(
+                    "Setting estimates with range {} to '{}' (encoding) "
+                    "and '{}' (phred)".format([gmin, gmax], encoding, phred))
 
             # End of FastQ parsing
             logger.info("Finished FastQ file parsing")
@@ -454,15 +1155,49 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
                     "value": [fail_msg]
                 }]
 
+            if cov_error:
+                json_dic.setdefault("warnings", []).append({
+                    "sample": sample_id,
+                    "table": "qc",
+                    "value": ["Coverage estimated from a sample of the reads, "
+                              "with a relative error of {:.1%}".format(
+                                  cov_error)]
+                })
+                json_dic["coverageEstimate"] = [{
+                    "sample": sample_id,
+                    "table": "qc",
+                    "value": {
+                        "relativeError": round(cov_error, 4),
+                        "coverageRange": [
+                            round(exp_coverage * (1 - cov_error), 2),
+                            round(exp_coverage * (1 + cov_error), 2)]
+                    }
+                }]
+
             json_report.write(json.dumps(json_dic, separators=(",", ":")))
             # Maximum read length
             len_fh.write("{}".format(max_read_length))
 
+            # QC sketch. In the sampling mode, its totals are those of the
+            # sampled reads, as the read length histogram, and the totals of
+            # the report are added as estimates
+            sketch_json = finish_sketch(
+                sketch, int(phred) if phred and phred.isdigit() else None)
+            sketch_json["relativeError"] = round(cov_error, 4)
+            if cov_error:
+                sketch_json.update({"estimatedReads": nreads,
+                                    "estimatedBases": chars})
+            # Size of the FastQ files, so that the sketch is only used for
+            # the same files downstream
+            sketch_json["files"] = dict(
+                (os.path.basename(x), os.path.getsize(x)) for x in fastq_pair)
+            sketch_fh.write(json.dumps(sketch_json, separators=(",", ":")))
+
         # This exception is raised when the input FastQ files are corrupted
         except EOFError:
             logger.error("The FastQ files could not be correctly "
                          "parsed. They may be corrupt")
-            for fh in [enc_fh, phred_fh, cov_fh, cov_rep, len_fh]:
+            for fh in [enc_fh, phred_fh, cov_fh, cov_rep, len_fh, sketch_fh]:
                 fh.write("corrupt")
                 status_fh.write("fail")
                 fail_fh.write("Could not read/parse FastQ. "
@@ -471,4 +1206,4 @@ def main(sample_id, fastq_pair, gsize, minimum_coverage, opts):
 
 if __name__ == "__main__":
 
-    main(SAMPLE_ID, FASTQ_PAIR, GSIZE, MINIMUM_COVERAGE, OPTS)
+    main(SAMPLE_ID, FASTQ_PAIR, GSIZE, MINIMUM_COVERAGE, OPTS, CPUS)
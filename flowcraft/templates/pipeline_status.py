@@ -7,6 +7,12 @@ Purpose
 This module is intended to collect pipeline run statistics (such as
 time, cpu, RAM for each tasks) into a report JSON
 
+The statistics of all samples are kept in a shared index in the project
+directory, with one append-only file per sample. Each run of this module
+only parses the rows of the trace file that were added since the last
+update of the index, while holding a lock on the index, and then reads the
+statistics of its own sample.
+
 Expected input
 --------------
 
@@ -18,13 +24,14 @@ Code documentation
 
 """
 
-__version__ = "1.0.0"
-__build__ = "16012018"
+__version__ = "1.1.0"
+__build__ = "18102026"
 __template__ = "pipeline_status-nf"
 
 
 import os
 import json
+import fcntl
 import traceback
 
 from os.path import join
@@ -36,8 +43,18 @@ logger = get_logger(__file__)
 
 LOG_STATS = ".pipeline_status.json"
 
+STATS_TAG = " getStats"
+"""
+str: Substring of the tag of the trace rows with the statistics of a sample.
+"""
+
+INDEX_DIR = ".pipeline_stats_index"
+"""
+str: Directory, relative to the project directory, of the statistics index.
+"""
+
 if __file__.endswith(".command.sh"):
-    fastq_id = 'sample_id'
+    fastq_id = '$sample_id'
     TRACE_FILE = 'pipeline_stats.txt'
     WORKDIR = '${workflow.projectDir}'
 
@@ -59,36 +76,145 @@ def get_json_info(fields, header):
     return json_dic
 
 
-def get_previous_stats(stats_path):
-    """
+def get_index_state(index_dir, trace_path):
+    """Returns the state of the statistics index for the trace file.
+
+    The state has the device, inode and header of the trace file and the
+    byte offset up to which it was parsed. When the trace file was replaced
+    or truncated, the state is reset so that the file is parsed from the
+    start.
 
     Parameters
     ----------
-    workdir
+    index_dir : str
+        Path to the statistics index.
+    trace_path : str
+        Path to the nextflow trace file.
 
     Returns
     -------
-
+    dict
     """
 
-    logger.debug("Path to pipeline status data set to: {}".format(stats_path))
-    if os.path.exists(stats_path):
-        logger.debug("Existing pipeline status data found. Loading JSON.")
-        with open(stats_path) as fh:
-            stats_json = json.load(fh)
+    st = os.stat(trace_path)
+    state = {"dev": st.st_dev, "ino": st.st_ino, "offset": 0, "header": None}
+
+    try:
+        with open(join(index_dir, "trace.offset")) as fh:
+            previous = json.load(fh)
+    except (OSError, ValueError):
+        logger.debug("No previous statistics index state found")
+        return state
 
+    if (previous.get("dev"), previous.get("ino")) == \
+            (st.st_dev, st.st_ino) and previous["offset"] <= st.st_size:
+        state = previous
     else:
+        logger.debug("Trace file was replaced. Parsing it from the start")
+
+    return state
+
+
+def update_index(index_dir, trace_path):
+    """Adds the statistics rows appended to the trace file since the last
+    update to the index.
+
+    Must be called while holding the lock of the index. Only complete lines
+    of the trace file are parsed, and the rows of each sample are appended
+    to its own file in the index.
+
+    Parameters
+    ----------
+    index_dir : str
+        Path to the statistics index.
+    trace_path : str
+        Path to the nextflow trace file.
+    """
+
+    state = get_index_state(index_dir, trace_path)
+    logger.debug("Index state set to: {}".format(state))
+
+    with open(trace_path, "rb") as fh:
+        fh.seek(state["offset"])
+        data = fh.read()
+
+    # Leave the last line for the next update if it is still being written
+    data = data[:data.rfind(b"\\n") + 1]
+    lines = data.decode("utf8").splitlines()
+
+    if state["header"] is None and lines:
+        state["header"] = lines.pop(0).strip().split()
+        logger.debug("Header set to: {}".format(state["header"]))
+
+    header = state["header"]
+    rows = {}
+
+    if header:
+        tag_idx = header.index("tag")
+        status_idx = header.index("status")
+        for line in lines:
+            fields = line.strip().split("\t")
+            if len(fields) != len(header):
+                continue
+            # Check if tag substring is in the tag field of the nextflow trace
+            if STATS_TAG in fields[tag_idx] and \
+                    fields[status_idx] == "COMPLETED":
+                sample = fields[tag_idx].split(STATS_TAG)[0].strip()
+                rows.setdefault(sample, []).append(
+                    get_json_info(fields, header))
+
+    for sample, sample_rows in rows.items():
+        logger.debug("Adding {} rows of sample {} to the index".format(
+            len(sample_rows), sample))
+        with open(join(index_dir, sample + ".ndjson"), "a") as fh:
+            fh.writelines(json.dumps(x, separators=(",", ":")) + "\\n"
+                          for x in sample_rows)
+
+    state["offset"] += len(data)
+    offset_path = join(index_dir, "trace.offset")
+    with open(offset_path + ".tmp", "w") as fh:
+        json.dump(state, fh)
+    os.replace(offset_path + ".tmp", offset_path)
+
+
+def get_sample_stats(index_dir, sample_id):
+    """Returns the statistics of a sample stored in the index.
+
+    Parameters
+    ----------
+    index_dir : str
+        Path to the statistics index.
+    sample_id : str
+        Sample identification string.
+
+    Returns
+    -------
+    dict
+        Maps the task_id of each statistics row of the sample to the row.
+    """
+
+    stats = {}
+
+    try:
+        with open(join(index_dir, sample_id + ".ndjson")) as fh:
+            for line in fh:
+                row = json.loads(line)
+                stats[row["task_id"]] = row
+    except FileNotFoundError:
         logger.debug("No pipeline status data found.")
-        stats_json = {}
 
-    return stats_json
+    return stats
 
 
 @MainWrapper
 def main(sample_id, trace_file, workdir):
     """
     Parses a nextflow trace file, searches for processes with a specific tag
-    and sends a JSON report with the relevant information
+    and sends a JSON report with the relevant information of the sample
+
+    The new rows of the trace file are added to the statistics index while
+    holding an exclusive lock, so that concurrent tasks never parse the same
+    rows twice or overwrite each other's results.
 
     The expected fields for the trace file are::
 
@@ -110,50 +236,35 @@ def main(sample_id, trace_file, workdir):
 
     Parameters
     ----------
+    sample_id : str
+        Sample identification string.
     trace_file : str
         Path to the nextflow trace file
+    workdir : str
+        Path to the project directory, where the trace file and the
+        statistics index are stored.
     """
 
-    # Determine the path of the stored JSON for the sample_id
-    stats_suffix = ".stats.json"
-    stats_path = join(workdir, sample_id + stats_suffix)
     trace_path = join(workdir, trace_file)
+    index_dir = join(workdir, INDEX_DIR)
 
     logger.info("Starting pipeline status routine")
+    os.makedirs(index_dir, exist_ok=True)
+
+    with open(join(index_dir, ".lock"), "a") as lock_fh:
+        logger.debug("Acquiring lock of the statistics index")
+        fcntl.lockf(lock_fh, fcntl.LOCK_EX)
+        try:
+            logger.info("Updating statistics index from trace file: "
+                        "{}".format(trace_path))
+            update_index(index_dir, trace_path)
+            stats_array = get_sample_stats(index_dir, sample_id)
+        finally:
+            fcntl.lockf(lock_fh, fcntl.LOCK_UN)
 
-    logger.debug("Checking for previous pipeline status data")
-    stats_array = get_previous_stats(stats_path)
     logger.info("Stats JSON object set to : {}".format(stats_array))
 
-    # Search for this substring in the tags field. Only lines with this
-    # tag will be processed for the reports
-    tag = " getStats"
-    logger.debug("Tag variable set to: {}".format(tag))
-
-    logger.info("Starting parsing of trace file: {}".format(trace_path))
-    with open(trace_path) as fh:
-
-        header = next(fh).strip().split()
-        logger.debug("Header set to: {}".format(header))
-
-        for line in fh:
-            fields = line.strip().split("\t")
-            # Check if tag substring is in the tag field of the nextflow trace
-            if tag in fields[2] and fields[3] == "COMPLETED":
-                logger.debug(
-                    "Parsing trace line with COMPLETED status: {}".format(
-                        line))
-                current_json = get_json_info(fields, header)
-
-                stats_array[fields[0]] = current_json
-            else:
-                logger.debug(
-                    "Ignoring trace line without COMPLETED status"
-                    " or stats specific tag: {}".format(
-                        line))
-
-    with open(join(stats_path), "w") as fh, open(".report.json", "w") as rfh:
-        fh.write(json.dumps(stats_array, separators=(",", ":")))
+    with open(".report.json", "w") as rfh:
         rfh.write(json.dumps(stats_array, separators=(",", ":")))
 
 
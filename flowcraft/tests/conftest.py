@@ -0,0 +1,128 @@
+import re
+import sys
+import gzip
+import json
+import types
+import pytest
+import threading
+
+from os.path import join, dirname, abspath
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+TEMPLATES_DIR = join(dirname(dirname(abspath(__file__))), "templates")
+
+TEMPLATE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", "'": "'",
+                    '"': '"', "$": "$"}
+"""
+dict: Backslash escapes of the templates that are processed by Nextflow.
+"""
+
+
+class BroadcastHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body=None):
+        self.send_response(code)
+        if body is not None:
+            data = json.dumps(body).encode("utf8")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self.end_headers()
+
+    def _handle(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            if not server.gzip:
+                return self._reply(415)
+            body = gzip.decompress(body)
+        payload = json.loads(body.decode("utf8")) if body else None
+        server.received.append((self.command, encoding, payload))
+        server.release.wait(5)
+
+        if server.codes:
+            return self._reply(server.codes.pop(0))
+        self._reply(*server.respond(self.command, payload))
+
+    do_POST = do_PUT = do_DELETE = _handle
+
+
+class BroadcastServer(HTTPServer):
+    """Stand-in for the flowcraft broadcast server, which records the
+    requests it receives.
+
+    The replies can be set with :attr:`codes`, which are used first, or by
+    replacing :meth:`respond`. Requests are held while :attr:`release` is
+    cleared, and gzip bodies are refused with 415 when :attr:`gzip` is
+    False.
+    """
+
+    CODES = {"POST": 201, "PUT": 200, "DELETE": 202}
+
+    def __init__(self):
+
+        super().__init__(("127.0.0.1", 0), BroadcastHandler)
+        self.received = []
+        self.codes = []
+        self.gzip = True
+        self.release = threading.Event()
+        self.release.set()
+        self.url = "http://127.0.0.1:{}/".format(self.server_port)
+
+    def respond(self, method, payload):
+        """Returns the status code and JSON body of the reply to a
+        request."""
+        return self.CODES[method], None
+
+    def payloads(self, method="PUT"):
+        """Returns the payloads of the requests with a given method."""
+        return [p for m, _, p in self.received if m == method]
+
+
+@pytest.fixture
+def broadcast_server():
+
+    server = BroadcastServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,),
+                              daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def load_template(monkeypatch):
+    """Returns a function that loads a Python template as a module, after
+    processing its backslash escapes as Nextflow does. The Nextflow
+    variables of the templates are not set, since the module is not loaded
+    from a ``.command.sh`` file.
+    """
+
+    monkeypatch.syspath_prepend(TEMPLATES_DIR)
+
+    def load(name):
+
+        path = join(TEMPLATES_DIR, name + ".py")
+        with open(path) as fh:
+            source = re.sub(
+                r"\\(.)", lambda m: TEMPLATE_ESCAPES.get(m.group(1),
+                                                         m.group(0)),
+                fh.read())
+
+        module = types.ModuleType(name)
+        module.__file__ = path
+        # Registered so that its functions can be sent to worker processes
+        monkeypatch.setitem(sys.modules, name, module)
+        exec(compile(source, path, "exec"), module.__dict__)
+
+        return module
+
+    return load
@@ -76,3 +76,14 @@ def test_build_recipe_innuendo(tmp):
     args = af.get_args(["build", "-r", "innuendo", "-o",
                         "{}".format(p), "--pipeline-only"])
     af.build(args)
+
+
+def test_report_max_uploads():
+
+    sys.argv.append(1)
+    args = af.get_args(["report", "--max-uploads", "2"])
+    assert args.max_uploads == 2
+
+    for value in ["0", "-1", "a"]:
+        with pytest.raises(SystemExit):
+            af.get_args(["report", "--max-uploads", value])
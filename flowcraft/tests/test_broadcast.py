@@ -29,3 +29,27 @@ def test_regex_in_log():
         os.path.join(os.getcwd(), "flowcraft/tests/broadcast_tests/log_with_command_regex.txt"))
 
     assert filepath != ""
+
+
+def test_workdir_resolver(tmpdir, monkeypatch):
+
+    tmpdir.mkdir("ab").mkdir("cdef1234567")
+    resolver = utils.WorkdirResolver(str(tmpdir))
+
+    calls = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda p: calls.append(p) or listdir(p))
+
+    resolver.prefetch(["ab/cdef12", "ab/cdef12", "12/345678"])
+    assert calls == [str(tmpdir.join("ab"))]
+
+    assert resolver.resolve("ab/cdef12") == \
+        str(tmpdir.join("ab", "cdef1234567"))
+    assert resolver.resolve("ab/cdef12", "/full/workdir") == "/full/workdir"
+    assert resolver.resolve("12/345678") is None
+    assert len(calls) == 1
+
+    # New directories are found once the bucket changes
+    tmpdir.join("ab").mkdir("ffff1234567")
+    assert resolver.resolve("ab/ffff12") == \
+        str(tmpdir.join("ab", "ffff1234567"))
@@ -0,0 +1,104 @@
+import gzip
+import json
+import pytest
+
+
+def write_fastq(path, names, compress=False):
+
+    records = "".join("@{}\nACGTACGTAC\n+\nIIIIIIIIII\n".format(x)
+                      for x in names)
+    opener = gzip.open if compress else open
+    with opener(str(path), "wt") as fh:
+        fh.write(records)
+
+    return str(path)
+
+
+def read_names(path):
+
+    with gzip.open(str(path), "rt") as fh:
+        return [x.rstrip()[1:] for i, x in enumerate(fh) if i % 4 == 0]
+
+
+@pytest.fixture
+def downsample_fastq(load_template):
+
+    return load_template("downsample_fastq")
+
+
+@pytest.fixture
+def fastq_pair(tmpdir):
+
+    names = ["r{}".format(i) for i in range(2000)]
+    return [write_fastq(tmpdir.join("s_1.fq.gz"), names, True),
+            write_fastq(tmpdir.join("s_2.fq.gz"), names, True)]
+
+
+def test_sketch_bases(downsample_fastq, fastq_pair, tmpdir):
+
+    files = dict((x.split("/")[-1], tmpdir.join(x.split("/")[-1]).size())
+                 for x in fastq_pair)
+    sketch = tmpdir.join("s_qc_sketch.json")
+
+    sketch.write(json.dumps({"bases": 40000, "files": files}))
+    assert downsample_fastq.get_sketch_bases(str(sketch), fastq_pair) == \
+        40000
+
+    sketch.write(json.dumps({"bases": 40000, "files": files,
+                             "relativeError": 0}))
+    assert downsample_fastq.get_sketch_bases(str(sketch), fastq_pair) == \
+        40000
+
+    # The totals of a sketch of the sampling mode are not used
+    sketch.write(json.dumps({"bases": 4000, "files": files,
+                             "relativeError": 0.05,
+                             "estimatedBases": 40000}))
+    assert downsample_fastq.get_sketch_bases(str(sketch), fastq_pair) is None
+
+    files["s_1.fq.gz"] += 1
+    sketch.write(json.dumps({"bases": 40000, "files": files}))
+    assert downsample_fastq.get_sketch_bases(str(sketch), fastq_pair) is None
+
+    assert downsample_fastq.get_sketch_bases("", fastq_pair) is None
+
+
+def test_count_bases(downsample_fastq, fastq_pair, tmpdir):
+
+    plain = write_fastq(tmpdir.join("p_1.fq"), ["a", "b", "c"])
+
+    assert downsample_fastq.count_bases(fastq_pair[0]) == 20000
+    assert downsample_fastq.count_bases(plain) == 30
+
+
+def test_sample_pairs(downsample_fastq, fastq_pair, tmpdir):
+
+    def sample(seed, name, pair=fastq_pair):
+        out_paths = [str(tmpdir.join("{}_{}.fq.gz".format(name, i)))
+                     for i in (1, 2)]
+        kept = downsample_fastq.sample_pairs(pair, 0.25, seed, out_paths)
+        names = [read_names(x) for x in out_paths]
+        assert len(names[0]) == kept
+        return names
+
+    names = sample(100, "a")
+    # The mates of each kept pair are kept together
+    assert names[0] == names[1]
+    assert 400 < len(names[0]) < 600
+    assert names[0] == sorted(names[0], key=lambda x: int(x[1:]))
+
+    # A fixed seed keeps the same pairs, for plain files too
+    plain = [write_fastq(tmpdir.join("p_{}.fq".format(i)),
+                         ["r{}".format(x) for x in range(2000)])
+             for i in (1, 2)]
+    assert sample(100, "b") == names
+    assert sample(100, "c", plain) == names
+    assert sample(7, "d") != names
+
+
+def test_sample_pairs_ratio(downsample_fastq, fastq_pair, tmpdir):
+
+    out_paths = [str(tmpdir.join("o_{}.fq.gz".format(i))) for i in (1, 2)]
+
+    assert downsample_fastq.sample_pairs(fastq_pair, 1, 1, out_paths) == 2000
+    assert read_names(out_paths[1])[-1] == "r1999"
+    assert downsample_fastq.sample_pairs(fastq_pair, 0, 1, out_paths) == 0
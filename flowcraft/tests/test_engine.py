@@ -320,6 +320,25 @@ def test_set_channels_secondary_chanels_link(multi_forks):
            [[], ["SIDE_max_len_4_5"], ["SIDE_max_len_6_7"]]
 
 
+def test_set_channels_optional_link():
+
+    con = [{"input": {"process": "__init__", "lane": 1},
+            "output": {"process": "integrity_coverage", "lane": 1}},
+           {"input": {"process": "integrity_coverage", "lane": 1},
+            "output": {"process": "downsample_fastq", "lane": 1}}]
+    linked = eg.NextflowGenerator(con, "teste.nf", process_map)
+    linked._set_channels()
+
+    con = [{"input": {"process": "__init__", "lane": 1},
+            "output": {"process": "downsample_fastq", "lane": 1}}]
+    unlinked = eg.NextflowGenerator(con, "teste.nf", process_map)
+    unlinked._set_channels()
+
+    assert [linked.processes[2]._context["SIDE_qc_sketch"],
+            unlinked.processes[1]._context["SIDE_qc_sketch"]] == \
+        [True, False]
+
+
 def test_set_secondary_inputs_raw_forks(raw_forks):
 
     raw_forks._set_channels()
@@ -0,0 +1,422 @@
+import os
+import json
+import pytest
+
+from flowcraft.generator.inspect import NextflowInspector, apply_status_delta
+from flowcraft.generator.inspect_daemon import InspectDaemon
+from flowcraft.generator.tail import tail_lines
+
+LOG = """\
+Apr-19 19:07:30.100 [main] DEBUG nextflow.cli.Launcher - $> nextflow run pipe.nf -profile docker
+Apr-19 19:07:30.300 [main] INFO  nextflow.cli.CmdRun - Launching `pipe.nf` [tiny_turing] - revision: abc
+Apr-19 19:07:30.400 [main] DEBUG nextflow.cli.CmdRun - Starting
+Apr-19 19:07:30.401 [main] DEBUG nextflow.Session - Version: 0.32.0 build 4897
+Apr-19 19:07:32.660 [main] DEBUG nextflow.processor.TaskProcessor - Creating operator > integrity_coverage_1_1 -- maxForks: 4
+Apr-19 19:07:32.670 [main] DEBUG nextflow.processor.TaskProcessor - Creating operator > spades_1_2 -- maxForks: 4
+Apr-19 19:07:32.680 [main] DEBUG nextflow.processor.TaskProcessor - Creating operator > report -- maxForks: 4
+Apr-19 19:07:33.000 [Task submitter] INFO  nextflow.Session - [ab/cdef12] Submitted process > integrity_coverage_1_1 (SampleA)
+Apr-19 19:07:33.100 [Task submitter] INFO  nextflow.Session - [12/345678] Submitted process > integrity_coverage_1_1 (SampleB)
+"""
+
+TRACE_HEADER = "\t".join([
+    "task_id", "hash", "process", "tag", "status", "exit", "start",
+    "container", "cpus", "time", "disk", "memory", "duration", "realtime",
+    "queue", "%cpu", "%mem", "rss", "vmem", "rchar", "wchar"]) + "\n"
+
+
+def trace_line(task_id, hs, tag, status, realtime="8s", rss="100 MB"):
+
+    return "\t".join([
+        task_id, hs, "integrity_coverage_1_1", tag, status, "0",
+        "2018-04-19 19:07:33.000", "-", "1", "-", "-", "1 GB", "10s",
+        realtime, "-", "95.0%", "0.1%", rss, "200 MB", "1 GB",
+        "20 MB"]) + "\n"
+
+
+@pytest.fixture
+def pipeline_dir(tmpdir, monkeypatch):
+
+    tmpdir.join(".nextflow.log").write(LOG)
+    tmpdir.join("pipeline_stats.txt").write(TRACE_HEADER)
+    tmpdir.join("pipe.nf").write("")
+    tmpdir.mkdir("work")
+    monkeypatch.chdir(tmpdir)
+
+    return tmpdir
+
+
+@pytest.fixture
+def inspector(pipeline_dir):
+
+    return NextflowInspector("pipeline_stats.txt", 0.01)
+
+
+def test_log_init(inspector):
+
+    assert list(inspector.processes) == ["integrity_coverage_1_1",
+                                         "spades_1_2"]
+    assert inspector.pipeline_tag == "tiny_turing"
+    assert inspector.execution_command == "pipe.nf -profile docker"
+    assert inspector.nextflow_version == "0.32.0 build 4897"
+    assert inspector.run_status == "running"
+
+
+def test_empty_log(pipeline_dir):
+
+    from flowcraft.generator.error_handling import InspectionError
+
+    pipeline_dir.join(".nextflow.log").write("")
+    with pytest.raises(InspectionError):
+        NextflowInspector("pipeline_stats.txt", 0.01)
+
+
+def test_submission_status(inspector):
+
+    inspector.update_inspection()
+    p = inspector.processes["integrity_coverage_1_1"]
+
+    assert p["submitted"] == {"SampleA", "SampleB"}
+    assert p["barrier"] == "R"
+
+
+def test_trace_status(inspector, pipeline_dir):
+
+    inspector.update_inspection()
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("1", "ab/cdef12", "SampleA", "COMPLETED"), mode="a")
+    inspector.update_inspection()
+
+    p = inspector.processes["integrity_coverage_1_1"]
+    assert p["submitted"] == {"SampleB"}
+    assert p["finished"] == {"SampleA"}
+    assert inspector.tag_totals == {"submitted": 1, "finished": 1,
+                                    "failed": 0, "retry": 0}
+
+
+def test_barrier_and_abort(inspector, pipeline_dir):
+
+    pipeline_dir.join(".nextflow.log").write(
+        "Apr-19 19:07:40.000 [main] DEBUG nextflow.processor.TaskProcessor - "
+        "<<< barrier arrive (process: spades_1_2)\n"
+        "Apr-19 19:07:42.100 [main] DEBUG nextflow.Session - Session "
+        "aborted -- Cause: boom\n"
+        "Apr-19 19:07:43.000 [main] DEBUG nextflow.processor.TaskProcessor - "
+        "<<< barrier arrive (process: integrity_coverage_1_1)\n", mode="a")
+    inspector.update_inspection()
+
+    assert inspector.processes["spades_1_2"]["barrier"] == "C"
+    assert inspector.processes["integrity_coverage_1_1"]["barrier"] == "R"
+    assert inspector.run_status == "aborted"
+    assert inspector.abort_cause == "boom"
+
+
+def test_log_replacement(inspector, pipeline_dir):
+
+    inspector.update_inspection()
+
+    new_log = pipeline_dir.join("new_log")
+    new_log.write(LOG.split("Apr-19 19:07:33.000")[0])
+    os.rename(str(new_log), str(pipeline_dir.join(".nextflow.log")))
+    inspector.update_inspection()
+
+    assert inspector.processes["integrity_coverage_1_1"]["submitted"] == \
+        set()
+    assert inspector.run_status == "running"
+
+
+def test_retry_stats(inspector, pipeline_dir):
+
+    inspector.update_inspection()
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("1", "ab/cdef12", "SampleA", "COMPLETED") +
+        trace_line("2", "12/345678", "SampleB", "FAILED", realtime="4s"),
+        mode="a")
+    inspector.update_inspection()
+
+    stats = inspector.process_stats["integrity_coverage_1_1"].summary()
+    assert stats["completed"] == "1"
+    assert stats["realtime"] == "00:00:06"
+
+    pipeline_dir.join(".nextflow.log").write(
+        "Apr-19 19:07:41.100 [Task submitter] INFO  nextflow.Session - "
+        "[34/567890] Re-submitted process > integrity_coverage_1_1 "
+        "(SampleB)\n", mode="a")
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("3", "34/567890", "SampleB", "COMPLETED", realtime="2s"),
+        mode="a")
+    inspector.update_inspection()
+
+    p = inspector.processes["integrity_coverage_1_1"]
+    assert p["finished"] == {"SampleA", "SampleB"}
+    stats = inspector.process_stats["integrity_coverage_1_1"].summary()
+    assert stats["completed"] == "2"
+    assert stats["realtime"] == "00:00:05"
+
+
+def status_reply(server, method, payload):
+    """Keeps the status of a single run in the broadcast server and applies
+    the status deltas."""
+
+    if method == "POST":
+        return 201, {"status_delta": True}
+    if method != "PUT":
+        return server.CODES[method], None
+
+    if "status_json" in payload:
+        server.status = payload["status_json"]
+    elif payload["base_version"] != server.version:
+        return 409, None
+    else:
+        apply_status_delta(server.status, payload["status_delta"])
+
+    server.version = payload["version"]
+    return 200, None
+
+
+def normalize(status):
+
+    status = json.loads(json.dumps(status))
+    for row in status["tableData"]:
+        for k in ["running", "complete", "error"]:
+            row[k] = sorted(row[k])
+    for info in status["processInfo"].values():
+        for k in ["submitted", "finished", "failed", "retry"]:
+            info[k] = sorted(info[k])
+
+    return status
+
+
+@pytest.fixture
+def status_server(broadcast_server):
+
+    broadcast_server.status = None
+    broadcast_server.version = None
+    broadcast_server.respond = lambda method, payload: status_reply(
+        broadcast_server, method, payload)
+
+    return broadcast_server
+
+
+def test_status_deltas(inspector, pipeline_dir, status_server):
+
+    inspector.broadcast_address = status_server.url
+    inspector._establish_connection("run", {})
+
+    inspector.update_inspection()
+    inspector._send_status_info("run")
+    inspector.transport.flush()
+    assert "status_json" in status_server.payloads()[-1]
+
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("1", "ab/cdef12", "SampleA", "COMPLETED") +
+        trace_line("2", "12/345678", "SampleB", "FAILED"), mode="a")
+    inspector.update_inspection()
+    inspector._send_status_info("run")
+    inspector.transport.flush()
+
+    delta = status_server.payloads()[-1]["status_delta"]
+    assert [x["process"] for x in delta["tableData"]] == \
+        ["integrity_coverage_1_1"]
+    assert delta["tagStatus"]["integrity_coverage_1_1"] == {
+        "SampleA": ["finished"], "SampleB": ["failed"]}
+    assert normalize(status_server.status) == \
+        normalize(inspector._get_status_json())
+
+    pipeline_dir.join(".nextflow.log").write(
+        "Apr-19 19:07:40.000 [main] DEBUG nextflow.processor.TaskProcessor - "
+        "<<< barrier arrive (process: spades_1_2)\n"
+        "Apr-19 19:07:41.100 [Task submitter] INFO  nextflow.Session - "
+        "[34/567890] Re-submitted process > integrity_coverage_1_1 "
+        "(SampleB)\n", mode="a")
+    inspector.update_inspection()
+    inspector._send_status_info("run")
+    inspector.transport.flush()
+
+    assert "status_delta" in status_server.payloads()[-1]
+    assert normalize(status_server.status) == \
+        normalize(inspector._get_status_json())
+
+    # A delta with an unknown base version forces a full resync
+    status_server.version = None
+    inspector._send_status_info("run")
+    inspector.transport.flush()
+    assert inspector.send
+    inspector._send_status_info("run")
+    inspector.transport.flush()
+    assert "status_json" in status_server.payloads()[-1]
+    assert normalize(status_server.status) == \
+        normalize(inspector._get_status_json())
+
+
+def test_status_without_deltas(inspector, pipeline_dir, broadcast_server):
+
+    inspector.broadcast_address = broadcast_server.url
+    inspector._establish_connection("run", {})
+
+    for task_id in ["1", "2"]:
+        pipeline_dir.join("pipeline_stats.txt").write(
+            trace_line(task_id, "ab/cdef12", "SampleA", "COMPLETED"),
+            mode="a")
+        inspector.update_inspection()
+        inspector._send_status_info("run")
+        inspector.transport.flush()
+
+    assert len(broadcast_server.payloads()) == 2
+    assert all("status_json" in x for x in broadcast_server.payloads())
+
+
+def test_retrieve_log(inspector, pipeline_dir, monkeypatch):
+
+    monkeypatch.setattr(NextflowInspector, "LOG_EXCERPT_LINES", 3)
+    monkeypatch.setattr(NextflowInspector, "LOG_EXCERPT_BYTES", 20)
+    log = pipeline_dir.join("task.log")
+    log.write("line1\nline2\nline3\nlin")
+    path = str(log)
+
+    assert inspector._retrieve_log(path) == ["line2\n", "line3\n", "lin"]
+
+    # Only the appended bytes are read for a log that grows
+    log.write("e4\nline5\n", mode="a")
+    assert inspector._log_cache[path][1] == 21
+    assert inspector._retrieve_log(path) == \
+        ["line3\n", "line4\n", "line5\n"] == tail_lines(path, 3, 20)
+    assert inspector._log_cache[path][1] == 30
+
+    log.write("x" * 10 + "\n", mode="a")
+    assert inspector._retrieve_log(path) == tail_lines(path, 3, 20)
+
+    # A replaced log is read again
+    log.remove()
+    log.write("new\n")
+    assert inspector._retrieve_log(path) == ["new\n"]
+
+
+def test_checkpoint(inspector, pipeline_dir):
+
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("1", "ab/cdef12", "SampleA", "COMPLETED") +
+        trace_line("2", "12/345678", "SampleB", "FAILED"), mode="a")
+    inspector.update_inspection()
+    inspector.save_checkpoint()
+    assert pipeline_dir.join(inspector.CHECKPOINT_FILE).check()
+
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("3", "34/567890", "SampleC", "COMPLETED"), mode="a")
+    inspector.update_inspection()
+
+    resumed = NextflowInspector("pipeline_stats.txt", 0.01)
+    assert resumed.trace_tail.offset > 0
+    resumed.update_inspection()
+
+    for attr in ["processes", "samples", "stored_ids", "pipeline_tag",
+                 "run_status"]:
+        assert getattr(resumed, attr) == getattr(inspector, attr)
+    assert resumed._get_status_json()["tableData"] == \
+        inspector._get_status_json()["tableData"]
+    assert len(resumed.trace_store["integrity_coverage_1_1"]) == 3
+
+
+def test_checkpoint_replaced_trace(inspector, pipeline_dir):
+
+    pipeline_dir.join("pipeline_stats.txt").write(
+        trace_line("1", "ab/cdef12", "SampleA", "COMPLETED"), mode="a")
+    inspector.update_inspection()
+    inspector.save_checkpoint()
+
+    new_trace = pipeline_dir.join("new_trace")
+    new_trace.write(TRACE_HEADER)
+    os.rename(str(new_trace), str(pipeline_dir.join("pipeline_stats.txt")))
+
+    resumed = NextflowInspector("pipeline_stats.txt", 0.01)
+    resumed.update_inspection()
+
+    assert resumed.trace_tail.offset == len(TRACE_HEADER)
+    assert resumed.processes["integrity_coverage_1_1"]["finished"] == set()
+
+
+def test_daemon(tmpdir, status_server):
+
+    for name in ["run1", "run2"]:
+        run_dir = tmpdir.mkdir(name)
+        run_dir.join(".nextflow.log").write(LOG)
+        run_dir.join("pipeline_stats.txt").write(TRACE_HEADER)
+        run_dir.join("pipe.nf").write(name)
+    # Not a pipeline directory
+    tmpdir.mkdir("other")
+
+    daemon = InspectDaemon([str(tmpdir.join("*"))], "pipeline_stats.txt",
+                           0.01, ip_addr=status_server.url)
+
+    assert daemon.discover()
+    assert sorted(daemon.runs) == [str(tmpdir.join("run1")),
+                                   str(tmpdir.join("run2"))]
+    hashes = [run_hash for _, run_hash in daemon.runs.values()]
+    assert len(set(hashes)) == 2
+
+    daemon.update()
+    daemon.transport.flush()
+    assert sorted(x["run_id"] for x in status_server.payloads()) == \
+        sorted(hashes)
+    assert daemon.get_load() == {"runs": 2, "submitted": 4, "failed": 0,
+                                 "retry": 0, "finished": 0}
+
+    run1 = str(tmpdir.join("run1"))
+    run1_hash = daemon.runs[run1][1]
+    tmpdir.join("run1", ".nextflow.log").write(
+        "Apr-19 19:08:00.000 [main] DEBUG nextflow.Session - Execution "
+        "complete -- Goodbye\n", mode="a")
+    assert daemon.update()
+    assert list(daemon.runs) == [str(tmpdir.join("run2"))]
+    assert [x["run_id"] for x in status_server.payloads("DELETE")] == \
+        [run1_hash]
+
+    # Finished runs are not inspected again until the log is replaced
+    assert not daemon.discover()
+    tmpdir.join("run1", ".nextflow.log").rename(
+        tmpdir.join("run1", ".nextflow.log.1"))
+    tmpdir.join("run1", ".nextflow.log").write(LOG)
+    assert daemon.discover()
+    assert run1 in daemon.runs
+
+    daemon.close()
+    assert not daemon.runs
+    assert len(status_server.payloads("DELETE")) == 3
+
+
+def test_daemon_failed_run(tmpdir, status_server, monkeypatch):
+
+    for name in ["run1", "run2"]:
+        run_dir = tmpdir.mkdir(name)
+        run_dir.join(".nextflow.log").write(LOG)
+        run_dir.join("pipeline_stats.txt").write(TRACE_HEADER)
+        run_dir.join("pipe.nf").write(name)
+    run1 = str(tmpdir.join("run1"))
+    run2 = str(tmpdir.join("run2"))
+
+    update_inspection = NextflowInspector.update_inspection
+
+    def fail_run1(self):
+        if self.workdir == run1:
+            raise ValueError("Corrupt log")
+        update_inspection(self)
+
+    daemon = InspectDaemon([str(tmpdir.join("*"))], "pipeline_stats.txt",
+                           0.01, ip_addr=status_server.url)
+
+    # A run that fails to start does not prevent the others from starting
+    monkeypatch.setattr(NextflowInspector, "update_inspection", fail_run1)
+    assert daemon.discover()
+    assert list(daemon.runs) == [run2]
+
+    monkeypatch.setattr(NextflowInspector, "update_inspection",
+                        update_inspection)
+    assert daemon.discover()
+    assert sorted(daemon.runs) == [run1, run2]
+
+    # A run that fails is removed while the others are still inspected
+    monkeypatch.setattr(NextflowInspector, "update_inspection", fail_run1)
+    assert daemon.update()
+    assert list(daemon.runs) == [run2]
+    assert not daemon.discover()
+
+    daemon.close()
@@ -0,0 +1,115 @@
+import pytest
+
+from flowcraft.generator.inspect_stats import QuantileSketch, ProcessStats, \
+    TraceColumns, TagInfo, NAN
+
+
+def metrics(tag, realtime, good=True, rss=100.0):
+
+    return {"tag": tag, "good": good, "realtime": realtime, "cpuhour": 0.5,
+            "rss": rss, "rchar": 1024.0, "wchar": None}
+
+
+def test_sketch_quantiles():
+
+    sketch = QuantileSketch()
+    for i in range(1, 1001):
+        sketch.add(i)
+
+    assert sketch.quantile(0.5) == pytest.approx(500, rel=0.01)
+    assert sketch.quantile(0.95) == pytest.approx(950, rel=0.01)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_sketch_max_bins():
+
+    sketch = QuantileSketch(max_bins=10)
+    for i in range(1, 10001):
+        sketch.add(i)
+
+    assert len(sketch.bins) == 10
+    assert sketch.quantile(0.99) == pytest.approx(9900, rel=0.01)
+
+
+def test_process_stats_summary():
+
+    stats = ProcessStats()
+    stats.add(metrics("A", 10))
+    stats.add(metrics("B", 20, rss=2048.0))
+
+    summary = stats.summary()
+    assert summary["completed"] == "2"
+    assert summary["realtime"] == "00:00:15"
+    assert summary["cpuhour"] == 1.0
+    assert summary["maxmem"] == "2.0GB"
+    assert summary["avgread"] == "1024MB"
+    assert summary["avgwrite"] == "-"
+    assert stats.summary() is summary
+
+
+def test_process_stats_remove():
+
+    stats = ProcessStats()
+    failed = metrics("B", 100, good=False, rss=2048.0)
+    stats.add(metrics("A", 10))
+    stats.add(failed)
+    stats.remove(failed)
+    stats.add(metrics("B", 20))
+
+    summary = stats.summary()
+    assert summary["completed"] == "2"
+    assert summary["realtime"] == "00:00:15"
+    assert stats.realtime_variance == pytest.approx(50)
+    assert summary["realtime_p95"] == "00:00:20"
+    assert summary["maxmem"] == "100MB"
+
+    restored = ProcessStats.from_state(stats.get_state())
+    restored.remove(metrics("B", 20))
+    restored.remove(metrics("A", 10))
+    assert restored.summary()["maxmem"] == "-"
+
+
+def test_process_stats_version():
+
+    stats = ProcessStats()
+    versions = [stats.version]
+    entry = metrics("A", 10)
+    stats.add(entry)
+    versions.append(stats.version)
+    stats.remove(entry)
+    versions.append(stats.version)
+    versions.append(ProcessStats().version)
+
+    assert versions == sorted(set(versions))
+
+
+def test_trace_columns():
+
+    store = TraceColumns()
+    store.append("A", "COMPLETED", {"realtime": 10.0, "rss": NAN})
+    store.append("B", "FAILED", {"realtime": 20.0, "rss": 100.0})
+    store.append("A", "COMPLETED", {"realtime": 30.0, "rss": 50.0})
+
+    assert len(store) == 3
+    assert store.tags == ["A", "B"]
+    assert list(store.tag_ids) == [0, 1, 0]
+    assert store.row(0) == {"tag": "A", "status": "COMPLETED",
+                            "realtime": 10.0, "rss": None}
+    assert store.row(1)["status"] == "FAILED"
+    assert list(store.columns["realtime"]) == [10.0, 20.0, 30.0]
+    assert store.nbytes() < 3 * 8 * (len(TraceColumns.NUMERIC_COLUMNS) + 1)
+
+
+def test_tag_info():
+
+    info = TagInfo("work/ab/cdef", "19:07:33.000")
+    assert info.as_dict() == {"workdir": "work/ab/cdef",
+                              "start": "19:07:33.000"}
+
+    info.realtime = "8s"
+    info.rss = 100.0
+    assert info.as_dict() == {"workdir": "work/ab/cdef",
+                              "start": "19:07:33.000", "realtime": "8s",
+                              "rss": 100.0}
+    with pytest.raises(AttributeError):
+        info.other = 1
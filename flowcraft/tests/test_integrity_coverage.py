@@ -0,0 +1,171 @@
+import io
+import os
+import bz2
+import gzip
+import json
+import random
+import pytest
+
+
+def make_fastq(nreads, seed=1):
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(nreads):
+        length = rng.randint(50, 150)
+        records.append("@r{} 1:N:0\n{}\n+\n{}\n".format(
+            i, "".join(rng.choices("ACGTN", k=length)),
+            "".join(rng.choices("#,:FI", k=length))))
+
+    return "".join(records).encode()
+
+
+def write_fastq(path, data, opener=open):
+
+    with opener(str(path), "wb") as fh:
+        fh.write(data)
+
+    return str(path)
+
+
+@pytest.fixture
+def integrity_coverage(load_template):
+
+    return load_template("integrity_coverage")
+
+
+@pytest.fixture
+def fastq_data():
+
+    return make_fastq(300)
+
+
+def test_fastq_blocks(integrity_coverage, fastq_data):
+
+    # The records are split across the chunks at every position
+    for chunk_size in [1, 7, 100, 4096, len(fastq_data) + 1]:
+        blocks = list(integrity_coverage.iter_fastq_blocks(
+            io.BytesIO(fastq_data), chunk_size))
+        assert b"\n".join(blocks) + b"\n" == fastq_data
+        assert all(not x.endswith(b"\n") for x in blocks)
+
+    # The last line of a file may not end with a newline
+    blocks = integrity_coverage.iter_fastq_blocks(
+        io.BytesIO(b"@r0\nAC\n+\nII"), 3)
+    assert b"\n".join(blocks) == b"@r0\nAC\n+\nII"
+
+
+def test_scan_fastq_chunks(integrity_coverage, fastq_data):
+
+    lines = fastq_data.split(b"\n")
+    nreads = len(lines) // 4
+    chars = sum(len(x) for x in lines[1::4])
+    max_len = max(len(x) for x in lines[1::4])
+
+    for chunk_size in [1, 5, 333, 8192]:
+        sketch = integrity_coverage.new_sketch()
+        scan = integrity_coverage.scan_fastq(
+            [io.BytesIO(fastq_data)], chunk_size=chunk_size, sketch=sketch)
+        assert scan == (chars, nreads, max_len, (35, 73))
+        assert sketch["reads"] == nreads
+        assert sketch["bases"] == chars
+
+    # Windows line endings are not counted as bases
+    assert integrity_coverage.scan_fastq(
+        [io.BytesIO(fastq_data.replace(b"\n", b"\r\n"))],
+        chunk_size=333)[:3] == (chars, nreads, max_len)
+
+    # The records continue from one file to the next
+    split = fastq_data.index(b"\n+\n", len(fastq_data) // 2) + 1
+    assert integrity_coverage.scan_fastq(
+        [io.BytesIO(fastq_data[:split]), io.BytesIO(fastq_data[split:])],
+        chunk_size=100) == (chars, nreads, max_len, (35, 73))
+
+
+def test_scan_compressed_files(integrity_coverage, fastq_data, tmpdir,
+                               monkeypatch):
+
+    paths = [write_fastq(tmpdir.join("a.fq"), fastq_data),
+             write_fastq(tmpdir.join("a.fq.gz"), fastq_data, gzip.open),
+             write_fastq(tmpdir.join("a.fq.bz2"), fastq_data, bz2.open)]
+
+    expected = integrity_coverage.scan_fastq([io.BytesIO(fastq_data)])
+    for path in paths:
+        scan = integrity_coverage.scan_fastq_file(path)
+        assert scan[:4] == expected
+        assert integrity_coverage.finish_sketch(scan[4]) == \
+            integrity_coverage.finish_sketch(
+                integrity_coverage.scan_fastq_file(paths[0])[4])
+
+    # Through an external decompressor
+    monkeypatch.setitem(integrity_coverage.DECOMPRESSORS, "gz",
+                        [["gzip", "-dc"]])
+    assert integrity_coverage.scan_fastq_file(paths[1])[:4] == expected
+
+    corrupt = tmpdir.join("c.fq.gz")
+    corrupt.write_binary(tmpdir.join("a.fq.gz").read_binary()[:200])
+    with pytest.raises(EOFError):
+        integrity_coverage.scan_fastq_file(str(corrupt))
+
+
+def test_sample_fastq_file(integrity_coverage, tmpdir):
+
+    data = make_fastq(10000, seed=2)
+    scan = integrity_coverage.scan_fastq([io.BytesIO(data)])
+
+    for opener, name in [(open, "s.fq"), (gzip.open, "s.fq.gz")]:
+        path = write_fastq(tmpdir.join(name), data, opener)
+        sample = integrity_coverage.sample_fastq_file(
+            path, sample_size=len(data) // 5, chunk_size=16384)
+
+        # The estimate is within its error bounds, which are at least the
+        # minimum error
+        chars, nreads, max_len, qual_range, sketch, error = sample
+        assert integrity_coverage.MIN_SAMPLE_ERROR <= error / chars < 0.1
+        assert abs(chars - scan[0]) <= error
+        assert abs(nreads - scan[1]) <= nreads * error / chars
+        assert qual_range == scan[3]
+
+        # The sketch only has the sampled reads
+        assert 0 < sketch["reads"] < scan[1]
+        assert sum(sketch["lengths"].values()) == sketch["reads"]
+
+    # A file smaller than the sample is parsed as a whole
+    sample = integrity_coverage.sample_fastq_file(path)
+    assert sample[:4] == scan
+    assert sample[5] == 0
+
+
+def test_sampling_mode_sketch(integrity_coverage, tmpdir, monkeypatch):
+
+    monkeypatch.chdir(tmpdir)
+    fastq_pair = [write_fastq(tmpdir.join("s_{}.fq.gz".format(i)),
+                              make_fastq(5000, seed=i), gzip.open)
+                  for i in (1, 2)]
+    monkeypatch.setattr(integrity_coverage.sample_fastq_file, "__defaults__",
+                        (False, 100000, 8192))
+
+    integrity_coverage.main.f("s", fastq_pair, 0.001, 1, ["-s"])
+
+    sketch = json.loads(tmpdir.join("s_qc_sketch.json").read())
+    report = json.loads(tmpdir.join(".report.json").read())
+    totals = dict((x["header"], x["value"])
+                  for x in report["tableRow"][0]["data"])
+
+    # The sketch totals are those of the sampled reads, and the estimates
+    # are those of the report
+    assert sketch["relativeError"] > 0
+    assert sketch["reads"] == sum(sketch["readLengths"].values())
+    assert sketch["bases"] == sum(int(x) * y for x, y in
+                                  sketch["readLengths"].items())
+    assert sketch["estimatedReads"] == totals["Reads"]
+    assert sketch["estimatedBases"] == totals["Raw BP"]
+    assert sketch["files"] == dict(
+        (os.path.basename(x), os.path.getsize(x)) for x in fastq_pair)
+
+    # Without sampling, the sketch has the exact totals only
+    integrity_coverage.main.f("s", fastq_pair, 0.001, 1, [])
+    sketch = json.loads(tmpdir.join("s_qc_sketch.json").read())
+    assert sketch["relativeError"] == 0
+    assert "estimatedBases" not in sketch
+    assert sketch["reads"] == 10000
@@ -0,0 +1,57 @@
+import json
+import pytest
+
+TRACE_HEADER = "task_id\thash\tprocess\ttag\tstatus\trealtime\n"
+
+
+def trace_line(task_id, tag, status="COMPLETED"):
+
+    return "\t".join([task_id, "ab/cdef12", "status", tag, status, "1s"]) + \
+        "\n"
+
+
+@pytest.fixture
+def pipeline_status(load_template):
+
+    return load_template("pipeline_status")
+
+
+def test_sample_stats(pipeline_status, tmpdir):
+
+    trace = tmpdir.join("pipeline_stats.txt")
+    index_dir = str(tmpdir.mkdir("index"))
+    trace.write(TRACE_HEADER +
+                trace_line("1", "SampleA getStats") +
+                trace_line("2", "SampleB getStats") +
+                trace_line("3", "SampleA getStats", "FAILED") +
+                trace_line("4", "SampleA"))
+
+    pipeline_status.update_index(index_dir, str(trace))
+    # A partial line is only parsed once it is complete
+    trace.write(trace_line("5", "SampleA getStats")[:-3], mode="a")
+    pipeline_status.update_index(index_dir, str(trace))
+
+    assert list(pipeline_status.get_sample_stats(index_dir, "SampleA")) == \
+        ["1"]
+    assert list(pipeline_status.get_sample_stats(index_dir, "SampleB")) == \
+        ["2"]
+
+    trace.write(trace_line("5", "SampleA getStats")[-3:], mode="a")
+    pipeline_status.update_index(index_dir, str(trace))
+    stats = pipeline_status.get_sample_stats(index_dir, "SampleA")
+    assert sorted(stats) == ["1", "5"]
+    assert stats["5"]["tag"] == "SampleA getStats"
+
+
+def test_main(pipeline_status, tmpdir, monkeypatch):
+
+    tmpdir.join("pipeline_stats.txt").write(
+        TRACE_HEADER + trace_line("1", "SampleA getStats") +
+        trace_line("2", "SampleB getStats"))
+    task_dir = tmpdir.mkdir("task")
+    monkeypatch.chdir(task_dir)
+
+    pipeline_status.main.f("SampleB", "pipeline_stats.txt", str(tmpdir))
+
+    report = json.loads(task_dir.join(".report.json").read())
+    assert list(report) == ["2"]
@@ -0,0 +1,33 @@
+from flowcraft.bin.prepare_reports import parse_trace
+
+
+def test_parse_trace_v2(tmpdir):
+
+    trace = tmpdir.join(".command.trace")
+    trace.write("nextflow.trace/v2\nrealtime=1500\n%cpu=1234\n%mem=56\n"
+                "rss=2048\npeak_rss=4096\nrchar=1000\nstate=-\n")
+
+    assert parse_trace(str(trace)) == {
+        "realtime": 1.5, "%cpu": 123.4, "%mem": 5.6, "rss": 2097152,
+        "peak_rss": 4194304, "rchar": 1000}
+
+
+def test_parse_trace_legacy(tmpdir):
+
+    trace = tmpdir.join(".command.trace")
+    trace.write("pid state %cpu %mem vmem rss peak_vmem peak_rss\n"
+                "123 S 995 12 1024 512 2048 1024\n"
+                "2500\n")
+
+    assert parse_trace(str(trace)) == {
+        "pid": 123, "%cpu": 99.5, "%mem": 1.2, "vmem": 1048576,
+        "rss": 524288, "peak_vmem": 2097152, "peak_rss": 1048576,
+        "realtime": 2.5}
+
+
+def test_parse_trace_empty(tmpdir):
+
+    trace = tmpdir.join(".command.trace")
+    trace.write("")
+
+    assert parse_trace(str(trace)) == {}
@@ -0,0 +1,194 @@
+import json
+import pytest
+
+from flowcraft.generator.report import FlowcraftReport
+from flowcraft.generator.watcher import FileWatcher
+
+LOG = """\
+Apr-19 19:07:30.100 [main] DEBUG nextflow.cli.Launcher - $> nextflow run pipe.nf -profile docker
+"""
+
+TRACE_HEADER = "task_id\thash\tprocess\ttag\tstatus\n"
+
+
+@pytest.fixture
+def pipeline_dir(tmpdir, monkeypatch):
+
+    tmpdir.join(".nextflow.log").write(LOG)
+    tmpdir.join("pipeline_stats.txt").write(TRACE_HEADER)
+    monkeypatch.chdir(tmpdir)
+
+    return tmpdir
+
+
+def add_report(pipeline_dir, task_id, hs, content):
+
+    pipeline_dir.join("work", "ab", hs + "1234", "task_A_report.json").write(
+        json.dumps(content), ensure=True)
+    pipeline_dir.join("pipeline_stats.txt").write(
+        "\t".join([task_id, "ab/" + hs, "report", "A", "COMPLETED"]) + "\n",
+        mode="a")
+
+
+def get_report(broadcast_server):
+
+    report = FlowcraftReport("report.json", "pipeline_stats.txt",
+                             ".nextflow.log", watch=True,
+                             ip_addr=broadcast_server.url)
+    report.load_state("run")
+    report.update_log_watch()
+
+    return report
+
+
+def sent_reports(broadcast_server):
+
+    return [r for p in broadcast_server.payloads() for r in p["report_json"]]
+
+
+def test_watch_resume(pipeline_dir, broadcast_server):
+
+    add_report(pipeline_dir, "1", "cd", {"task": 1})
+    add_report(pipeline_dir, "2", "ef", {"task": 2})
+
+    report = get_report(broadcast_server)
+    assert report.status_info == "running"
+    report.update_trace_watch()
+    report._send_live_report("run")
+    report.transport.flush()
+
+    assert sent_reports(broadcast_server) == [{"task": 1}, {"task": 2}]
+    assert len(report.sent_reports) == 2
+    assert not report.report_queue
+    report.save_state("run", force=True)
+
+    # A restarted watch only sends the new reports
+    add_report(pipeline_dir, "3", "ab", {"task": 3})
+    report = get_report(broadcast_server)
+    report.update_trace_watch()
+    assert len(report.report_queue) == 1
+    report._send_live_report("run")
+    report.transport.flush()
+    assert sent_reports(broadcast_server)[2:] == [{"task": 3}]
+    report.save_state("run", force=True)
+
+    # A replaced trace file is parsed again, but only the reports with a
+    # different content are sent
+    pipeline_dir.join("pipeline_stats.txt").rename(
+        pipeline_dir.join("pipeline_stats.txt.1"))
+    pipeline_dir.join("pipeline_stats.txt").write(TRACE_HEADER)
+    pipeline_dir.join("work", "ab", "cd1234", "task_A_report.json").write(
+        json.dumps({"task": 1, "new": True}))
+    for task_id, hs in [("1", "cd"), ("2", "ef")]:
+        pipeline_dir.join("pipeline_stats.txt").write(
+            "\t".join([task_id, "ab/" + hs, "report", "A", "COMPLETED"]) +
+            "\n", mode="a")
+
+    report = get_report(broadcast_server)
+    report.update_trace_watch()
+    report._send_live_report("run")
+    report.transport.flush()
+    assert sent_reports(broadcast_server)[3:] == [{"task": 1, "new": True}]
+    report.transport.close()
+
+
+def test_broadcast_resume(pipeline_dir, broadcast_server, monkeypatch):
+
+    pipeline_dir.join("pipe.nf").write("pipe")
+    state_file = pipeline_dir.join(FlowcraftReport.STATE_FILE)
+
+    # Stands for the exit of the SIGINT handler while the watch is waiting
+    def interrupt(*args, **kwargs):
+        raise SystemExit(0)
+    monkeypatch.setattr(FileWatcher, "wait", interrupt)
+
+    def broadcast():
+        report = FlowcraftReport("report.json", "pipeline_stats.txt",
+                                 ".nextflow.log", watch=True,
+                                 ip_addr=broadcast_server.url)
+        with pytest.raises(SystemExit):
+            report.broadcast_report()
+
+    add_report(pipeline_dir, "1", "cd", {"task": 1})
+    broadcast()
+    assert sent_reports(broadcast_server) == [{"task": 1}]
+    assert not broadcast_server.payloads("DELETE")
+    assert state_file.check()
+
+    # The restarted watch only sends the new report, and closes the
+    # connection once the pipeline is complete
+    add_report(pipeline_dir, "2", "ef", {"task": 2})
+    pipeline_dir.join(".nextflow.log").write(
+        "Apr-19 19:08:00.000 [main] DEBUG nextflow.Session - Execution "
+        "complete -- Goodbye\n", mode="a")
+    broadcast()
+    assert sent_reports(broadcast_server) == [{"task": 1}, {"task": 2}]
+    assert len(broadcast_server.payloads("DELETE")) == 1
+    assert not state_file.check()
+
+
+def test_report_batches(pipeline_dir, broadcast_server, monkeypatch):
+
+    monkeypatch.setattr(FlowcraftReport, "MAX_BATCH_BYTES", 30)
+    for i, hs in enumerate(["aa", "bb", "cc", "dd", "ee"]):
+        add_report(pipeline_dir, str(i), hs, {"task": i, "data": "x" * 5})
+    pipeline_dir.join("work", "ab", "ff1234", "task_A_report.json").write(
+        "{", ensure=True)
+    # Report task with a batch of reports
+    pipeline_dir.join("work", "ab", "ff1234", "task_B_report.json").write(
+        json.dumps({"task": 5}))
+    pipeline_dir.join("pipeline_stats.txt").write(
+        "\t".join(["5", "ab/ff", "report", "A", "COMPLETED"]) + "\n",
+        mode="a")
+
+    report = get_report(broadcast_server)
+    report.update_trace_watch()
+    report._send_live_report("run")
+    report.transport.close()
+
+    # Each report exceeds half of the batch size, and the invalid report is
+    # skipped
+    assert len(broadcast_server.payloads()) == 6
+    assert sorted(x["task"] for x in sent_reports(broadcast_server)) == \
+        list(range(6))
+    assert all(p["status"] == "running" for p in broadcast_server.payloads())
+    assert len(report.sent_reports) == 6
+    assert report.transport.stats["requests"] == 6
+
+
+def test_failed_reports_resent(pipeline_dir, broadcast_server):
+
+    add_report(pipeline_dir, "1", "cd", {"task": 1})
+    add_report(pipeline_dir, "2", "ef", {"task": 2})
+
+    # The first batch is refused, and its reports are put back on queue
+    broadcast_server.codes = [400]
+    report = get_report(broadcast_server)
+    report.update_trace_watch()
+    report._send_live_report("run")
+    report.transport.flush()
+    assert not report.sent_reports
+    assert not report.unsent_reports
+    assert len(report.failed_reports) == 2
+
+    # A restarted watch would send them again
+    report.save_state("run", force=True)
+    assert len(report._get_state("run")["report_queue"]) == 2
+
+    report.send = False
+    report._requeue_failed_reports()
+    assert report.send
+    assert len(report.report_queue) == 2
+    report._send_live_report("run")
+    report.transport.flush()
+
+    assert sent_reports(broadcast_server)[2:] == [{"task": 1}, {"task": 2}]
+    assert len(report.sent_reports) == 2
+    assert not report.failed_reports
+    report.transport.close()
+
+    # The state that was saved while the reports were failed restores them
+    restored = get_report(broadcast_server)
+    assert len(restored.report_queue) == 2
+    assert restored.send
+    restored.transport.close()
@@ -0,0 +1,75 @@
+import os
+
+from flowcraft.generator.tail import FileTail, tail_lines
+
+
+def test_new_lines_only(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("header\nline1\n")
+
+    tail = FileTail(str(p))
+    assert tail.readlines() == ["header", "line1"]
+
+    p.write("line2\nline3\n", mode="a")
+    assert tail.readlines() == ["line2", "line3"]
+    assert tail.readlines() == []
+
+
+def test_partial_line(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("line1\nline")
+
+    tail = FileTail(str(p))
+    assert tail.readlines() == ["line1"]
+
+    p.write("2\n", mode="a")
+    assert tail.readlines() == ["line2"]
+
+
+def test_truncation(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("line1\nline2\n")
+
+    tail = FileTail(str(p))
+    tail.readlines()
+
+    p.write("new\n")
+    assert tail.readlines() == ["new"]
+    assert tail.rotated
+
+
+def test_replacement(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("line1\n")
+
+    tail = FileTail(str(p))
+    tail.readlines()
+
+    other = tmpdir.join("other.txt")
+    other.write("line1\nline2\n")
+    os.rename(str(other), str(p))
+
+    assert tail.readlines() == ["line1", "line2"]
+    assert tail.rotated
+    assert not (tail.readlines() or tail.rotated)
+
+
+def test_tail_lines(tmpdir):
+
+    p = tmpdir.join("log.txt")
+    p.write("".join("line{}\n".format(i) for i in range(1000)))
+
+    assert tail_lines(str(p), 3, block_size=7) == \
+        ["line997\n", "line998\n", "line999\n"]
+    assert len(tail_lines(str(p))) == 1000
+    assert tail_lines(str(p), 0) == []
+
+    # The partial first line of a byte limited excerpt is discarded
+    assert tail_lines(str(p), max_bytes=12) == ["line999\n"]
+
+    p.write("line1\nno newline")
+    assert tail_lines(str(p), 5) == ["line1\n", "no newline"]
@@ -0,0 +1,80 @@
+from flowcraft.generator.transport import HttpTransport
+
+
+def test_compression(broadcast_server):
+
+    transport = HttpTransport(compress_min=10)
+    r = transport.request("PUT", broadcast_server.url, {"data": "x" * 100})
+
+    assert r.status_code == 200
+    assert broadcast_server.received == \
+        [("PUT", "gzip", {"data": "x" * 100})]
+
+
+def test_compression_fallback(broadcast_server):
+
+    broadcast_server.gzip = False
+    transport = HttpTransport(compress_min=10, backoff=0)
+    r = transport.request("PUT", broadcast_server.url, {"data": "x" * 100})
+
+    assert r.status_code == 200
+    assert broadcast_server.received == \
+        [("PUT", None, {"data": "x" * 100})]
+    assert transport.compress_min is None
+
+
+def test_compression_bad_request(broadcast_server):
+
+    broadcast_server.codes = [400]
+    transport = HttpTransport(compress_min=10, backoff=0)
+    r = transport.request("PUT", broadcast_server.url, {"data": "x" * 100})
+
+    assert r.status_code == 400
+    assert transport.compress_min == 10
+
+
+def test_retry(broadcast_server):
+
+    broadcast_server.codes = [500, 503]
+    transport = HttpTransport(backoff=0)
+
+    r = transport.request("PUT", broadcast_server.url, {})
+    assert r.status_code == 200
+    assert len(broadcast_server.received) == 3
+
+    transport = HttpTransport(backoff=0, max_retries=1)
+    assert transport.request("PUT", "http://127.0.0.1:1/", {}) is None
+
+
+def test_coalesce(broadcast_server):
+
+    responses = []
+    transport = HttpTransport()
+
+    # Hold the first request in the server while the others are queued
+    broadcast_server.release.clear()
+    transport.send("PUT", broadcast_server.url, {"v": 1}, key="status")
+    while not broadcast_server.received:
+        pass
+    for i in range(2, 5):
+        transport.send("PUT", broadcast_server.url, {"v": i}, key="status",
+                       merge=lambda a, b: {"v": a["v"] + b["v"]},
+                       callback=lambda r, p: responses.append(p))
+    transport.send("PUT", broadcast_server.url, {"v": 0})
+    broadcast_server.release.set()
+
+    assert transport.flush(5)
+    transport.close()
+
+    assert broadcast_server.payloads() == [{"v": 1}, {"v": 9}, {"v": 0}]
+    assert responses == [{"v": 9}]
+
+
+def test_min_workers(broadcast_server):
+
+    transport = HttpTransport(workers=0)
+    transport.send("PUT", broadcast_server.url, {"v": 1})
+
+    assert transport.flush(5)
+    transport.close()
+    assert broadcast_server.payloads() == [{"v": 1}]
@@ -0,0 +1,62 @@
+import time
+import threading
+
+from flowcraft.generator.watcher import FileWatcher
+
+
+def _append_later(path, delay=0.1):
+
+    def append():
+        time.sleep(delay)
+        with open(path, "a") as fh:
+            fh.write("new line\n")
+
+    t = threading.Thread(target=append)
+    t.start()
+    return t
+
+
+def test_timeout_without_changes(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("header\n")
+
+    watcher = FileWatcher([str(p)])
+    assert not watcher.wait(timeout=0.1)
+    watcher.close()
+
+
+def test_wakes_on_append(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("header\n")
+
+    watcher = FileWatcher([str(p)])
+    t = _append_later(str(p))
+    assert watcher.wait(timeout=5)
+    t.join()
+    watcher.close()
+
+
+def test_polling_fallback(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("header\n")
+
+    watcher = FileWatcher([str(p)], poll_interval=0.05, use_inotify=False)
+    assert watcher.fd is None
+    t = _append_later(str(p))
+    assert watcher.wait(timeout=5)
+    t.join()
+
+
+def test_ignores_other_files(tmpdir):
+
+    p = tmpdir.join("trace.txt")
+    p.write("header\n")
+
+    watcher = FileWatcher([str(p)])
+    t = _append_later(str(tmpdir.join("other.txt")), delay=0)
+    t.join()
+    assert not watcher.wait(timeout=0.2)
+    watcher.close()